@@ -0,0 +1,22 @@
+"""Conditional GET helpers: strong ETags derived from data version tokens."""
+
+from __future__ import annotations
+
+import hashlib
+
+# Clients must revalidate, which is cheap when the ETag still matches.
+CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+def make_etag(*parts: object) -> str:
+    """Build a strong ETag from the values a response is derived from."""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Apply the ``If-None-Match`` comparison (weak, per RFC 9110) against ``etag``."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
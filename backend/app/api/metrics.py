@@ -0,0 +1,156 @@
+"""Prometheus instrumentation: per-route HTTP metrics, GC pauses and admission gauges.
+
+Process metrics (RSS, open fds, CPU) come from ``prometheus_client``'s default
+process collector.
+"""
+
+from __future__ import annotations
+
+import gc
+import time
+from collections.abc import Mapping
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, SummaryMetricFamily
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.admission import AdmissionController
+
+# Requests that matched no route share one label so bad paths cannot explode cardinality.
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route and status.",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route.",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+# Only touched on the event loop thread, so a plain int avoids the gauge's lock per request.
+_in_flight = [0]
+HTTP_IN_FLIGHT.set_function(lambda: _in_flight[0])
+# (method, route, status) -> bound children; ``labels()`` lookups are the costly part.
+_series: dict[tuple[str, str, int], tuple] = {}
+
+
+def _bound_series(method: str, route: str, status: int) -> tuple:
+    key = (method, route, status)
+    series = _series.get(key)
+    if series is None:
+        series = (
+            HTTP_REQUESTS.labels(method, route, str(status)),
+            HTTP_LATENCY.labels(method, route),
+        )
+        _series[key] = series
+    return series
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; labels by route template, read after routing has run."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_flight[0] += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_flight[0] -= 1
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            requests, latency = _bound_series(scope["method"], route, status)
+            requests.inc()
+            latency.observe(elapsed)
+
+
+class GCPauseCollector:
+    """Times collector runs via ``gc.callbacks`` and exports them as a summary.
+
+    The callback only touches plain lists: metric objects take a non-reentrant lock,
+    and a collection can start while the same thread is inside one.
+    """
+
+    def __init__(self):
+        self._started = 0.0
+        self.count = [0, 0, 0]
+        self.seconds = [0.0, 0.0, 0.0]
+
+    def __call__(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+        else:
+            generation = info["generation"]
+            self.count[generation] += 1
+            self.seconds[generation] += time.perf_counter() - self._started
+
+    def collect(self):
+        pauses = SummaryMetricFamily(
+            "python_gc_pause_seconds",
+            "Stop-the-world garbage collection pauses by generation.",
+            labels=["generation"],
+        )
+        for generation in range(3):
+            pauses.add_metric([str(generation)], self.count[generation], self.seconds[generation])
+        yield pauses
+
+
+_gc_pauses = GCPauseCollector()
+
+
+def install_gc_timer() -> None:
+    """Start timing collections; safe to call more than once."""
+    if _gc_pauses not in gc.callbacks:
+        gc.callbacks.append(_gc_pauses)
+        REGISTRY.register(_gc_pauses)
+
+
+class AdmissionCollector:
+    """Exports admission controller snapshots at scrape time."""
+
+    def __init__(self, controllers: Mapping[str, AdmissionController]):
+        self.controllers = controllers
+
+    def collect(self):
+        in_flight = GaugeMetricFamily(
+            "harv_admission_in_flight", "Admitted inferences running.", labels=["pool"]
+        )
+        waiting = GaugeMetricFamily(
+            "harv_admission_waiting", "Requests waiting for an inference slot.", labels=["pool"]
+        )
+        admitted = CounterMetricFamily(
+            "harv_admission_admitted", "Requests admitted to inference.", labels=["pool"]
+        )
+        shed = CounterMetricFamily(
+            "harv_admission_shed", "Requests shed by reason.", labels=["pool", "reason"]
+        )
+        for pool, controller in self.controllers.items():
+            snapshot = controller.snapshot()
+            in_flight.add_metric([pool], snapshot["in_flight"])
+            waiting.add_metric([pool], snapshot["waiting"])
+            admitted.add_metric([pool], snapshot["admitted"])
+            shed.add_metric([pool, "queue_full"], snapshot["shed_queue_full"])
+            shed.add_metric([pool, "wait_timeout"], snapshot["shed_wait_timeout"])
+        yield from (in_flight, waiting, admitted, shed)
+
+
+def register_admission(controllers: Mapping[str, AdmissionController]) -> None:
+    REGISTRY.register(AdmissionCollector(controllers))
@@ -2,25 +2,100 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import binascii
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlmodel import Session
 
 from ...config.settings import settings
-from ...repositories.attendance import AttendanceRepository
+from ...models.attendance import AttendanceEvent
+from ...repositories.attendance import AttendanceRepository, persisted_id
+from ...repositories.jobs import VisionJobRepository
 from ...schemas.checkin import (
     CheckInResponse,
+    CheckInStatusResponse,
+    CombinedCheckInRequest,
     GPSCheckInRequest,
     VisionCheckInRequest,
 )
+from ...services.admission import AdmissionController
 from ...services.checkin import CheckInService
+from ...services.events import EventBroker
+from ...services.fences import FenceIndex
 from ...services.gps import GPSFence
 from ...services.vision import VisionService
+from ...services.vision_jobs import QUEUED_NOTE, VisionWorkerPool
 from ..deps import get_db_session
 
 router = APIRouter(prefix="/checkin", tags=["check-in"])
 
-gps_fence = GPSFence(settings.lecture_hall_bounds)
+fence_index = FenceIndex(
+    default=GPSFence(settings.lecture_hall_bounds),
+    refresh_interval_s=settings.fence_refresh_interval_s,
+)
 vision_service = VisionService()
+event_broker = EventBroker(max_queue=settings.stream_queue_size)
+vision_admission = AdmissionController(
+    max_in_flight=settings.vision_max_in_flight,
+    max_queue=settings.vision_max_queue,
+    max_wait_s=settings.vision_max_wait_s,
+)
+vision_workers = VisionWorkerPool(
+    vision_service,
+    image_dir=settings.vision_job_dir,
+    events=event_broker,
+    workers=settings.vision_workers,
+    max_attempts=settings.vision_job_max_attempts,
+)
+
+
+@router.post("", response_model=CheckInResponse)
+def checkin(
+    payload: CombinedCheckInRequest, session: Session = Depends(get_db_session)
+) -> CheckInResponse:
+    """Single round trip: GPS check, falling back to the attached image when needed."""
+    repository = AttendanceRepository(session)
+    service = CheckInService(
+        repository=repository,
+        fence_index=fence_index,
+        vision_service=vision_service,
+        events=event_broker,
+        admission=vision_admission,
+    )
+    try:
+        event, gps_result, vision_result = service.handle_checkin(
+            student_id=payload.student_id,
+            course_id=payload.course_id,
+            instructor_id=payload.instructor_id,
+            latitude=payload.latitude,
+            longitude=payload.longitude,
+            image_b64=payload.image_b64,
+            timestamp=payload.timestamp,
+        )
+    except binascii.Error as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Image payload is not valid base64"
+        ) from exc
+
+    if vision_result is None:
+        return CheckInResponse(
+            status=event.status,
+            message=gps_result.message,
+            record_id=persisted_id(event),
+            requires_visual_verification=gps_result.requires_visual_verification,
+        )
+    return CheckInResponse(
+        status=event.status,
+        message=(
+            "Visual verification accepted"
+            if vision_result.is_match
+            else "Scan did not match professor"
+        ),
+        record_id=persisted_id(event),
+        requires_visual_verification=not vision_result.is_match,
+        confidence=vision_result.confidence,
+    )
 
 
 @router.post("/gps", response_model=CheckInResponse)
@@ -31,8 +106,9 @@ def gps_checkin(
     repository = AttendanceRepository(session)
     service = CheckInService(
         repository=repository,
-        gps_fence=gps_fence,
+        fence_index=fence_index,
         vision_service=vision_service,
+        events=event_broker,
     )
     event, gps_result = service.handle_gps_checkin(
         student_id=payload.student_id,
@@ -53,18 +129,49 @@ def gps_checkin(
 
 @router.post("/vision", response_model=CheckInResponse)
 def vision_checkin(
-    payload: VisionCheckInRequest, session: Session = Depends(get_db_session)
+    payload: VisionCheckInRequest,
+    response: Response,
+    mode: Literal["sync", "async"] = Query(default="sync"),
+    session: Session = Depends(get_db_session),
 ) -> CheckInResponse:
-    """Fallback endpoint that verifies a student-provided capture."""
+    """Fallback endpoint that verifies a student-provided capture.
+
+    With ``mode=async`` the capture is queued and 202 is returned right away; poll
+    ``GET /checkin/{record_id}`` or follow the instructor stream for the outcome.
+    """
     if not payload.image_b64:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Image payload missing")
 
     repository = AttendanceRepository(session)
     service = CheckInService(
         repository=repository,
-        gps_fence=gps_fence,
+        fence_index=fence_index,
         vision_service=vision_service,
+        events=event_broker,
+        vision_jobs=vision_workers,
+        admission=vision_admission,
     )
+    if mode == "async":
+        try:
+            event = service.submit_vision_checkin(
+                student_id=payload.student_id,
+                course_id=payload.course_id,
+                instructor_id=payload.instructor_id,
+                image_b64=payload.image_b64,
+                timestamp=payload.timestamp,
+            )
+        except binascii.Error as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Image payload is not valid base64"
+            ) from exc
+        response.status_code = status.HTTP_202_ACCEPTED
+        return CheckInResponse(
+            status=event.status,
+            message=QUEUED_NOTE,
+            record_id=persisted_id(event),
+            requires_visual_verification=False,
+        )
+
     event, vision_result = service.handle_vision_checkin(
         student_id=payload.student_id,
         course_id=payload.course_id,
@@ -78,7 +185,27 @@ def vision_checkin(
     return CheckInResponse(
         status=event.status,
         message=message,
-        record_id=event.id,
+        record_id=persisted_id(event),
         requires_visual_verification=not vision_result.is_match,
         confidence=vision_result.confidence,
     )
+
+
+@router.get("/{record_id}", response_model=CheckInStatusResponse)
+def checkin_status(
+    record_id: int, session: Session = Depends(get_db_session)
+) -> CheckInStatusResponse:
+    """Report where a check-in stands, including its vision job if one was queued."""
+    event = session.get(AttendanceEvent, record_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail=f"Attendance event {record_id} not found")
+    job = VisionJobRepository(session).latest_for_event(record_id)
+    return CheckInStatusResponse(
+        record_id=record_id,
+        status=event.status,
+        verification_method=event.verification_method,
+        confidence=event.confidence,
+        requires_manual_review=event.requires_manual_review,
+        notes=event.notes,
+        job_status=job.status if job else None,
+    )
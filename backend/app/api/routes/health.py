@@ -0,0 +1,97 @@
+"""Liveness and readiness probes."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from backend.ml.model_loader import get_model_info
+
+from ...config.settings import settings
+from ...database import ping_db
+from .checkin import vision_admission, vision_service
+
+router = APIRouter(tags=["health"])
+
+# Static part of the liveness payload, built once per process.
+_LIVENESS = {
+    "ok": True,
+    "app": settings.app_name,
+    "version": settings.app_version,
+    "lecture_hall_bounds": settings.lecture_hall_bounds.model_dump(),
+    "demo_courses": [course["code"] for course in settings.default_courses],
+}
+
+# Bounded so a hung dependency cannot pile up probe threads.
+_probe_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="health-deep")
+
+
+def _timed(check: Callable[[], dict]) -> dict:
+    started = time.perf_counter()
+    try:
+        result = {"ok": True, **check()}
+    except Exception as exc:
+        result = {"ok": False, "error": str(exc)}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def _check_database() -> dict:
+    ping_db()
+    return {}
+
+
+def _check_vision_model() -> dict:
+    return {"loaded": vision_service.model.warmup()}
+
+
+def _run_checks(checks: dict[str, Callable[[], dict]], timeout: float) -> dict[str, dict]:
+    """Run checks concurrently, giving all of them one shared deadline."""
+    deadline = time.perf_counter() + timeout
+    futures = {name: _probe_executor.submit(_timed, check) for name, check in checks.items()}
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except TimeoutError:
+            results[name] = {"ok": False, "error": f"timed out after {timeout}s"}
+    return results
+
+
+@router.get("/health", response_model=dict)
+async def health() -> dict:
+    """Cheap liveness endpoint; model details come from the mtime-validated cache."""
+    model_info = get_model_info()
+    return {
+        **_LIVENESS,
+        "vision_model": (
+            {
+                "name": model_info.get("model_name"),
+                "accuracy": model_info.get("accuracy"),
+                "last_updated": model_info.get("last_updated"),
+            }
+            if model_info
+            else None
+        ),
+    }
+
+
+@router.get("/health/deep")
+def health_deep() -> JSONResponse:
+    """Readiness check that pings the database and runs a dummy inference."""
+    checks = _run_checks(
+        {"database": _check_database, "vision_model": _check_vision_model},
+        timeout=settings.health_deep_timeout_s,
+    )
+    ok = all(check["ok"] for check in checks.values())
+    return JSONResponse(status_code=200 if ok else 503, content={"ok": ok, "checks": checks})
+
+
+@router.get("/health/admission", response_model=dict)
+def health_admission() -> dict:
+    """Inference admission gauges and shed counters."""
+    return {"vision": vision_admission.snapshot()}
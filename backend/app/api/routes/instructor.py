@@ -4,15 +4,49 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlmodel import Session
 
+from ...config.settings import settings
+from ...models.attendance import AttendanceEvent
+from ...repositories.archive import AttendanceArchive
 from ...repositories.attendance import AttendanceRepository
-from ...schemas.instructor import AttendanceEventResponse, CourseResponse, OverrideRequest
+from ...schemas.instructor import (
+    AttendanceEventResponse,
+    BulkOverrideRequest,
+    CourseResponse,
+    FenceRequest,
+    FenceResponse,
+    OverrideRequest,
+)
+from ...services.gps import box_polygon
+from ..caching import CACHE_HEADERS, etag_matches, make_etag
 from ..deps import get_db_session
+from .checkin import event_broker, fence_index
 
 router = APIRouter(prefix="/instructor", tags=["instructor"])
 
+attendance_archive = AttendanceArchive(settings.archive_dir)
+
+# Columns projected by the attendance listing, in response field order.
+_EVENT_COLUMNS = tuple(AttendanceEventResponse.model_fields)
+
+
+def _event_response(event: AttendanceEvent) -> AttendanceEventResponse:
+    return AttendanceEventResponse(
+        id=event.id,
+        student_id=event.student_id,
+        course_id=event.course_id,
+        instructor_id=event.instructor_id,
+        timestamp=event.timestamp,
+        verification_method=event.verification_method,
+        status=event.status,
+        confidence=event.confidence,
+        requires_manual_review=event.requires_manual_review,
+        notes=event.notes,
+    )
+
 
 @router.get("/courses", response_model=list[CourseResponse])
 def list_courses(
@@ -25,39 +59,74 @@ def list_courses(
     return [CourseResponse(id=c.id, code=c.code, name=c.name) for c in courses]
 
 
-@router.get("/attendance", response_model=list[AttendanceEventResponse])
+@router.get(
+    "/attendance",
+    response_model=list[AttendanceEventResponse],
+    response_class=ORJSONResponse,
+)
 def list_attendance(
+    request: Request,
     course_id: int,
     verification_method: str | None = Query(default=None),
     status: str | None = Query(default=None),
     start: datetime | None = Query(default=None),
     end: datetime | None = Query(default=None),
     session: Session = Depends(get_db_session),
-) -> list[AttendanceEventResponse]:
-    """Return attendance entries filtered by query params."""
-    repository = AttendanceRepository(session)
-    events = repository.list_events(
+) -> Response:
+    """Return attendance entries filtered by query params.
+
+    Rows are selected as column tuples and serialized straight to JSON, bypassing ORM
+    instances and response-model validation; ``response_model`` only documents the shape.
+    The ETag comes from a count/newest-update query, so unchanged listings are answered
+    with 304 before any rows are read.
+    """
+    repository = AttendanceRepository(session, archive=attendance_archive)
+    version = repository.events_version(
         course_id=course_id,
         verification_method=verification_method,
         status=status,
         start=start,
         end=end,
     )
-    return [
-        AttendanceEventResponse(
-            id=event.id,
-            student_id=event.student_id,
-            course_id=event.course_id,
-            instructor_id=event.instructor_id,
-            timestamp=event.timestamp,
-            verification_method=event.verification_method,
-            status=event.status,
-            confidence=event.confidence,
-            requires_manual_review=event.requires_manual_review,
-            notes=event.notes,
-        )
-        for event in events
-    ]
+    filters = {
+        "course_id": course_id,
+        "verification_method": verification_method,
+        "status": status,
+        "start": start,
+        "end": end,
+    }
+    etag = make_etag(filters, version)
+    headers = {"ETag": etag, **CACHE_HEADERS}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    rows = repository.list_event_rows(
+        columns=_EVENT_COLUMNS,
+        course_id=course_id,
+        verification_method=verification_method,
+        status=status,
+        start=start,
+        end=end,
+    )
+    return ORJSONResponse(
+        [dict(zip(_EVENT_COLUMNS, row, strict=True)) for row in rows], headers=headers
+    )
+
+
+@router.get("/attendance/stream")
+async def stream_attendance(course_id: int) -> StreamingResponse:
+    """Push new and overridden events for a course as server-sent events.
+
+    Pair with one ``/attendance`` fetch: after that, changes arrive here instead of
+    being polled for. A ``resync`` event means the client fell behind and should
+    refetch the listing.
+    """
+    return StreamingResponse(
+        event_broker.stream(course_id, heartbeat_s=settings.stream_heartbeat_s),
+        media_type="text/event-stream",
+        # An explicit encoding keeps GZipMiddleware from buffering the stream.
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity"},
+    )
 
 
 @router.post("/attendance/{event_id}/override", response_model=AttendanceEventResponse)
@@ -73,15 +142,50 @@ def override_event(
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
-    return AttendanceEventResponse(
-        id=event.id,
-        student_id=event.student_id,
-        course_id=event.course_id,
-        instructor_id=event.instructor_id,
-        timestamp=event.timestamp,
-        verification_method=event.verification_method,
-        status=event.status,
-        confidence=event.confidence,
-        requires_manual_review=event.requires_manual_review,
-        notes=event.notes,
+    event_broker.publish("overridden", event)
+    return _event_response(event)
+
+
+@router.post("/attendance/override/bulk", response_model=list[AttendanceEventResponse])
+def bulk_override_events(
+    payload: BulkOverrideRequest,
+    session: Session = Depends(get_db_session),
+) -> list[AttendanceEventResponse]:
+    """Finalize a whole review queue in one transaction."""
+    repository = AttendanceRepository(session)
+    try:
+        events = repository.override_events(
+            (item.event_id, item.status, item.notes) for item in payload.overrides
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    for event in events:
+        event_broker.publish("overridden", event)
+    return [_event_response(event) for event in events]
+
+
+@router.put("/courses/{course_id}/fence", response_model=FenceResponse)
+def set_course_fence(
+    course_id: int,
+    payload: FenceRequest,
+    session: Session = Depends(get_db_session),
+) -> FenceResponse:
+    """Store a course's lecture hall polygons and reload the fence index."""
+    polygons = [list(map(list, ring)) for ring in payload.polygons]
+    polygons += [list(map(list, box_polygon(box))) for box in payload.boxes]
+    repository = AttendanceRepository(session)
+    try:
+        fence = repository.upsert_fence(
+            course_id, polygons=polygons, buffer_meters=payload.buffer_meters
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    fence_index.invalidate()
+    return FenceResponse(
+        course_id=fence.course_id,
+        polygons=fence.polygons,
+        buffer_meters=fence.buffer_meters,
+        updated_at=fence.updated_at,
     )
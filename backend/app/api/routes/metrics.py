@@ -0,0 +1,20 @@
+"""Prometheus scrape endpoint."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from ..metrics import install_gc_timer, register_admission
+from .checkin import vision_admission
+
+router = APIRouter(tags=["metrics"])
+
+install_gc_timer()
+register_admission({"vision": vision_admission})
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Current metrics in the Prometheus text exposition format."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
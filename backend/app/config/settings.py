@@ -61,13 +61,26 @@ class Settings(BaseSettings):
     app_name: str = "HARV Attendance API"
     app_version: str = "1.0.0"
     api_prefix: str = "/api"
+    gzip_minimum_size: int = 1024
     database_url: str = Field(
         default=f"sqlite:///{Path('backend') / 'harv.db'}", env="HARV_DATABASE_URL"
     )
     lecture_hall_bounds: LectureHallBounds = LectureHallBounds()
+    fence_refresh_interval_s: float = 30.0
     vision_threshold: float = 0.65
     vision_model_metadata: Path = Path("models") / "harv_cnn_v1" / "metadata.json"
+    vision_workers: int = 2
+    vision_job_dir: Path = Path("backend") / "vision_jobs"
+    vision_job_max_attempts: int = 3
+    vision_max_in_flight: int = 2
+    vision_max_queue: int = 16
+    vision_max_wait_s: float = 2.0
     default_courses: list[dict] = Field(default_factory=_default_course_seed)
+    health_deep_timeout_s: float = 2.0
+    stream_queue_size: int = 256
+    stream_heartbeat_s: float = 15.0
+    archive_dir: Path = Path("backend") / "archive"
+    archive_retention_days: int = 180
 
 
 settings = Settings()
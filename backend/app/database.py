@@ -2,20 +2,105 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 from collections.abc import Iterator
 from contextlib import contextmanager
 
+from sqlalchemy import Connection, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateIndex
 from sqlmodel import Session, SQLModel, create_engine
 
 from .config.settings import settings
+from .models import attendance, jobs  # noqa: F401 - registers tables on SQLModel.metadata
+from .models.schema import SchemaVersion
+
+SCHEMA_KEY = "harv"
+
+# Value for rows that predate a column, keyed by (table, column); SQL expression.
+COLUMN_BACKFILLS = {("attendanceevent", "updated_at"): "timestamp"}
 
 connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
 engine = create_engine(settings.database_url, echo=False, connect_args=connect_args)
 
 
-def init_db() -> None:
-    """Create tables if they do not yet exist."""
+def schema_fingerprint() -> str:
+    """Hash the table definitions so any model change invalidates the stored version."""
+    spec = [
+        [
+            table.name,
+            [[c.name, str(c.type), c.nullable, c.primary_key] for c in table.columns],
+            sorted(index.name or "" for index in table.indexes),
+        ]
+        for table in SQLModel.metadata.sorted_tables
+    ]
+    return hashlib.sha256(json.dumps(spec).encode()).hexdigest()[:16]
+
+
+def init_db() -> bool:
+    """Create tables unless the stored schema version already matches.
+
+    Returns True when ``create_all`` ran, False when it was skipped.
+    """
+    fingerprint = schema_fingerprint()
+    try:
+        with Session(engine) as session:
+            stored = session.get(SchemaVersion, SCHEMA_KEY)
+        if stored is not None and stored.fingerprint == fingerprint:
+            return False
+    except SQLAlchemyError:
+        # Fresh database: the version table itself does not exist yet.
+        pass
+
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        upgrade_existing_tables(connection)
+    with Session(engine) as session:
+        session.merge(SchemaVersion(id=SCHEMA_KEY, fingerprint=fingerprint))
+        session.commit()
+    return True
+
+
+def upgrade_existing_tables(connection: Connection) -> list[str]:
+    """Add columns and indexes that models gained after their table was created.
+
+    ``create_all`` only creates missing tables, so older databases never see later
+    additions. Columns are added as nullable (SQLite cannot add a NOT NULL column
+    without a default) and backfilled from ``COLUMN_BACKFILLS``. Safe to re-run.
+    Returns the ``table.column`` names that were added.
+    """
+    inspector = inspect(connection)
+    added = []
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(
+                text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}')
+            )
+            backfill = COLUMN_BACKFILLS.get((table.name, column.name))
+            if backfill:
+                connection.execute(
+                    text(
+                        f'UPDATE "{table.name}" SET "{column.name}" = {backfill} '
+                        f'WHERE "{column.name}" IS NULL'
+                    )
+                )
+            added.append(f"{table.name}.{column.name}")
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+    return added
+
+
+def ping_db() -> None:
+    """Round-trip a trivial query to prove the database is reachable."""
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
 
 
 @contextmanager
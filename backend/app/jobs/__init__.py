@@ -0,0 +1 @@
+"""Offline maintenance jobs run outside the request path."""
@@ -0,0 +1,54 @@
+"""Move aged attendance events from the hot table into per-term archive partitions.
+
+Usage::
+
+    python -m backend.app.jobs.archive                # older than archive_retention_days
+    python -m backend.app.jobs.archive --before 2025-06-01
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+
+from ..config.settings import settings
+from ..database import init_db, session_scope
+from ..repositories.archive import AttendanceArchive
+from ..repositories.attendance import AttendanceRepository
+
+logger = logging.getLogger(__name__)
+
+
+def run(before: datetime, batch_size: int = 5000) -> int:
+    """Archive every event older than ``before`` and return how many were moved."""
+    init_db()
+    archive = AttendanceArchive(settings.archive_dir)
+    with session_scope() as session:
+        moved = AttendanceRepository(session, archive=archive).archive_events(
+            before=before, batch_size=batch_size
+        )
+    logger.info(f"Archived {moved} attendance events older than {before.isoformat()}")
+    return moved
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--before",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Archive events strictly older than this ISO date (UTC).",
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    before = args.before or datetime.now(tz=timezone.utc) - timedelta(
+        days=settings.archive_retention_days
+    )
+    logging.basicConfig(level=logging.INFO)
+    run(before, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
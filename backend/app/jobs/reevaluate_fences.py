@@ -0,0 +1,144 @@
+"""Re-run the geofence over a course's past GPS check-ins after its hall bounds change.
+
+Usage::
+
+    python -m backend.app.jobs.reevaluate_fences --course-id 1 --dry-run
+    python -m backend.app.jobs.reevaluate_fences --course-id 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from ..config.settings import settings
+from ..database import session_scope
+from ..repositories.attendance import AttendanceRepository
+from ..services.fences import FenceIndex
+from ..services.gps import INSIDE, MESSAGES, NEAR, OUTSIDE, GPSFence
+
+logger = logging.getLogger(__name__)
+
+# Index i holds the note written for message code i.
+_NOTES_BY_CODE = np.array([MESSAGES[INSIDE], MESSAGES[NEAR], MESSAGES[OUTSIDE]], dtype=object)
+
+
+@dataclass
+class ReevaluationReport:
+    """Diff between stored GPS outcomes and the current fence."""
+
+    course_id: int
+    dry_run: bool
+    scanned: int = 0
+    changed: int = 0
+    skipped_overrides: int = 0
+    transitions: Counter = field(default_factory=Counter)
+    samples: list[dict] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        report = asdict(self)
+        report["transitions"] = dict(self.transitions)
+        return report
+
+
+def reevaluate_course(
+    repository: AttendanceRepository,
+    fence: GPSFence,
+    course_id: int,
+    *,
+    chunk_size: int = 5000,
+    dry_run: bool = False,
+    sample_size: int = 20,
+) -> ReevaluationReport:
+    """Recompute status, review flag and note for every GPS event of a course.
+
+    Events whose note is not one of the fence messages were overridden by an
+    instructor and are left alone. Each chunk is evaluated with one vectorized fence
+    call and, unless ``dry_run``, written back in its own transaction.
+    """
+    report = ReevaluationReport(course_id=course_id, dry_run=dry_run)
+    machine_notes = set(MESSAGES.values())
+
+    for rows in repository.iter_gps_events(course_id, chunk_size=chunk_size):
+        ids, lats, lons, statuses, reviews, notes = zip(*rows, strict=True)
+        result = fence.evaluate_many(np.array(lats), np.array(lons))
+        new_status = np.where(result.within_bounds, "present", "pending")
+        new_review = ~result.within_bounds
+        new_notes = _NOTES_BY_CODE[result.message_codes]
+
+        machine = np.array([note in machine_notes for note in notes], dtype=bool)
+        differs = (
+            (np.array(statuses, dtype=object) != new_status)
+            | (np.array(reviews, dtype=bool) != new_review)
+            | (np.array(notes, dtype=object) != new_notes)
+        )
+        report.scanned += len(rows)
+        report.skipped_overrides += int((~machine).sum())
+
+        changes = []
+        for i in np.flatnonzero(machine & differs):
+            values = {
+                "status": str(new_status[i]),
+                "requires_manual_review": bool(new_review[i]),
+                "notes": new_notes[i],
+            }
+            changes.append((ids[i], values))
+            report.transitions[f"{statuses[i]}->{values['status']}"] += 1
+            if len(report.samples) < sample_size:
+                report.samples.append(
+                    {
+                        "id": ids[i],
+                        "latitude": lats[i],
+                        "longitude": lons[i],
+                        "before": {"status": statuses[i], "notes": notes[i]},
+                        "after": values,
+                    }
+                )
+        report.changed += len(changes)
+
+        if changes and not dry_run:
+            repository.update_events(changes)
+            repository.session.commit()
+
+    return report
+
+
+def run(course_id: int, *, dry_run: bool = False, chunk_size: int = 5000) -> ReevaluationReport:
+    """Re-evaluate a course against its stored fence (or the campus default)."""
+    fence_index = FenceIndex(default=GPSFence(settings.lecture_hall_bounds))
+    with session_scope() as session:
+        repository = AttendanceRepository(session)
+        fence_index.refresh(repository)
+        report = reevaluate_course(
+            repository,
+            fence_index.fence_for(course_id),
+            course_id,
+            chunk_size=chunk_size,
+            dry_run=dry_run,
+        )
+    logger.info(
+        f"Re-evaluated {report.scanned} GPS events for course {course_id}: "
+        f"{report.changed} changed{' (dry run)' if dry_run else ''}"
+    )
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--course-id", type=int, required=True)
+    parser.add_argument("--dry-run", action="store_true", help="Report the diff without writing.")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    report = run(args.course_id, dry_run=args.dry_run, chunk_size=args.chunk_size)
+    print(json.dumps(report.as_dict(), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
+from sqlalchemy import JSON, Column
 from sqlmodel import Field, SQLModel
 
 
@@ -16,14 +17,23 @@ class Course(SQLModel, table=True):
     instructor_id: str
 
 
+class CourseFence(SQLModel, table=True):
+    """Lecture hall geometry for a course: one or more polygons of [lat, lon] vertices."""
+
+    course_id: int = Field(foreign_key="course.id", primary_key=True)
+    polygons: list = Field(sa_column=Column(JSON, nullable=False))
+    buffer_meters: float = 40.0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class AttendanceEvent(SQLModel, table=True):
     """Attendance record generated from GPS or vision verification."""
 
     id: int | None = Field(default=None, primary_key=True)
     student_id: str
-    course_id: int = Field(foreign_key="course.id")
+    course_id: int = Field(foreign_key="course.id", index=True)
     instructor_id: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=datetime.utcnow, index=True)
     latitude: float | None = None
     longitude: float | None = None
     verification_method: str
@@ -31,3 +41,4 @@ class AttendanceEvent(SQLModel, table=True):
     confidence: float | None = None
     requires_manual_review: bool = False
     notes: str | None = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,22 @@
+"""Persistent local queue of deferred vision verifications."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED = "queued", "running", "done", "failed"
+
+
+class VisionJob(SQLModel, table=True):
+    """A spooled capture waiting to be scored for its pending attendance event."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    event_id: int = Field(foreign_key="attendanceevent.id", index=True)
+    image_path: str
+    status: str = Field(default=JOB_QUEUED, index=True)
+    attempts: int = 0
+    error: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,15 @@
+"""Bookkeeping table recording which schema revision a database was built with."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class SchemaVersion(SQLModel, table=True):
+    """Fingerprint of the table definitions last applied by ``init_db``."""
+
+    id: str = Field(primary_key=True)
+    fingerprint: str
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,142 @@
+"""Cold storage for attendance events that have aged out of the hot table."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ..models.attendance import AttendanceEvent
+
+INDEX_FILE = "index.json"
+
+
+def as_naive_utc(value: datetime) -> datetime:
+    """Normalize datetimes to naive UTC, matching how SQLite hands them back."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def term_for(timestamp: datetime) -> str:
+    """Map a timestamp onto an academic term label such as ``2025-fall``."""
+    timestamp = as_naive_utc(timestamp)
+    if timestamp.month <= 5:
+        season = "spring"
+    elif timestamp.month <= 8:
+        season = "summer"
+    else:
+        season = "fall"
+    return f"{timestamp.year}-{season}"
+
+
+class AttendanceArchive:
+    """Gzip-compressed JSONL partitions of attendance events keyed by course and term.
+
+    Layout on disk::
+
+        <root>/index.json
+        <root>/course=<course_id>/<term>.jsonl.gz
+
+    ``index.json`` records, per course and term, the partition path, event count and
+    timestamp range so reads only open partitions overlapping the requested window.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    # ------------------------------------------------------------------ index
+    def load_index(self) -> dict:
+        """Return the partition index, or an empty one if nothing is archived."""
+        path = self.root / INDEX_FILE
+        if not path.exists():
+            return {"watermark": None, "courses": {}}
+        with path.open("r", encoding="utf-8") as file:
+            index: dict = json.load(file)
+        return index
+
+    def _save_index(self, index: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f"{INDEX_FILE}.tmp"
+        with tmp_path.open("w", encoding="utf-8") as file:
+            json.dump(index, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.root / INDEX_FILE)
+
+    def watermark(self) -> datetime | None:
+        """Latest cutoff that has been archived; older events live only in partitions."""
+        value = self.load_index().get("watermark")
+        return datetime.fromisoformat(value) if value else None
+
+    # ------------------------------------------------------------------ write
+    def append(self, events: Iterable[AttendanceEvent], *, cutoff: datetime) -> int:
+        """Append events to their course/term partitions and advance the watermark."""
+        partitions: dict[tuple[int, str], list[dict]] = {}
+        for event in events:
+            record = event.model_dump(mode="json")
+            record["timestamp"] = as_naive_utc(event.timestamp).isoformat()
+            partitions.setdefault((event.course_id, term_for(event.timestamp)), []).append(record)
+
+        index = self.load_index()
+        written = 0
+        for (course_id, term), records in partitions.items():
+            relative = Path(f"course={course_id}") / f"{term}.jsonl.gz"
+            path = self.root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Appending writes a new gzip member; readers decode concatenated members.
+            with gzip.open(path, "at", encoding="utf-8") as file:
+                for record in records:
+                    file.write(json.dumps(record) + "\n")
+
+            entry = index["courses"].setdefault(str(course_id), {}).setdefault(
+                term, {"path": str(relative), "events": 0, "first": None, "last": None}
+            )
+            stamps = [record["timestamp"] for record in records]
+            entry["events"] += len(records)
+            entry["first"] = min(filter(None, [entry["first"], *stamps]))
+            entry["last"] = max(filter(None, [entry["last"], *stamps]))
+            written += len(records)
+
+        cutoff_iso = as_naive_utc(cutoff).isoformat()
+        if index["watermark"] is None or cutoff_iso > index["watermark"]:
+            index["watermark"] = cutoff_iso
+        self._save_index(index)
+        return written
+
+    # ------------------------------------------------------------------- read
+    def iter_events(
+        self,
+        *,
+        course_id: int,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Iterator[AttendanceEvent]:
+        """Yield archived events for a course, opening only overlapping partitions."""
+        start = as_naive_utc(start) if start else None
+        end = as_naive_utc(end) if end else None
+        terms = self.load_index()["courses"].get(str(course_id), {})
+        seen: set[tuple[int | None, datetime, str]] = set()
+
+        for term in sorted(terms):
+            entry = terms[term]
+            if start and datetime.fromisoformat(entry["last"]) < start:
+                continue
+            if end and datetime.fromisoformat(entry["first"]) > end:
+                continue
+            with gzip.open(self.root / entry["path"], "rt", encoding="utf-8") as file:
+                for line in file:
+                    event = AttendanceEvent.model_validate(json.loads(line))
+                    # Re-running an interrupted job may append a partition twice. SQLite
+                    # reuses ids once the hot table is emptied, so the id alone is not
+                    # unique across archive runs.
+                    key = (event.id, event.timestamp, event.student_id)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if start and event.timestamp < start:
+                        continue
+                    if end and event.timestamp > end:
+                        continue
+                    yield event
@@ -2,23 +2,37 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator, Sequence
 from datetime import datetime, timezone
 
-from sqlmodel import Session, select
+from sqlalchemy import func
+from sqlalchemy import select as sa_select
+from sqlmodel import Session, col, delete, select, update
 
-from ..models.attendance import AttendanceEvent, Course
+from ..models.attendance import AttendanceEvent, Course, CourseFence
+from .archive import AttendanceArchive, as_naive_utc
+
+
+def persisted_id(event: AttendanceEvent) -> int:
+    """Primary key of a committed event; create_event always returns one that has it."""
+    if event.id is None:
+        raise ValueError("Attendance event has not been saved yet")
+    return event.id
 
 
 class AttendanceRepository:
     """Encapsulates CRUD operations for attendance domain objects."""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, archive: AttendanceArchive | None = None):
         self.session = session
+        self.archive = archive
 
     def ensure_seed_courses(self, seed_courses: Iterable[dict]) -> None:
         """Ensure default courses exist and stay in sync with seed config."""
-        existing_courses = {course.code: course for course in self.session.exec(select(Course))}
+        seed_courses = list(seed_courses)
+        codes = [course["code"] for course in seed_courses]
+        statement = select(Course).where(col(Course.code).in_(codes))
+        existing_courses = {course.code: course for course in self.session.exec(statement)}
         mutated = False
 
         for course in seed_courses:
@@ -80,6 +94,99 @@ class AttendanceRepository:
         statement = select(Course).where(Course.instructor_id == instructor_id)
         return list(self.session.exec(statement))
 
+    def upsert_fence(
+        self, course_id: int, *, polygons: list, buffer_meters: float = 40.0
+    ) -> CourseFence:
+        """Create or replace the lecture hall geometry for a course."""
+        if self.session.get(Course, course_id) is None:
+            raise ValueError(f"Course {course_id} not found")
+        fence = self.session.get(CourseFence, course_id) or CourseFence(
+            course_id=course_id, polygons=polygons
+        )
+        fence.polygons = polygons
+        fence.buffer_meters = buffer_meters
+        fence.updated_at = datetime.now(tz=timezone.utc)
+        self.session.add(fence)
+        self.session.commit()
+        self.session.refresh(fence)
+        return fence
+
+    def list_fences(self) -> list[CourseFence]:
+        """Return every stored course fence."""
+        return list(self.session.exec(select(CourseFence)))
+
+    def fence_version(self) -> tuple[int, datetime | None]:
+        """Cheap change token for the fence table: row count and newest update."""
+        statement = select(func.count(), func.max(CourseFence.updated_at))
+        count, latest = self.session.exec(statement).one()
+        return count, latest
+
+    def _event_filters(
+        self,
+        course_id: int,
+        verification_method: str | None,
+        status: str | None,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> list:
+        clauses = [AttendanceEvent.course_id == course_id]
+        if verification_method:
+            clauses.append(AttendanceEvent.verification_method == verification_method)
+        if status:
+            clauses.append(AttendanceEvent.status == status)
+        if start:
+            clauses.append(AttendanceEvent.timestamp >= start)
+        if end:
+            clauses.append(AttendanceEvent.timestamp <= end)
+        return clauses
+
+    def _reached_watermark(self, start: datetime | None) -> datetime | None:
+        """Archive watermark if a range starting at ``start`` reaches behind it."""
+        # Only ranges that reach behind the archive watermark pay for cold reads.
+        watermark = self.archive.watermark() if self.archive else None
+        if start and watermark and as_naive_utc(start) < watermark:
+            return watermark
+        return None
+
+    def _archived_events(
+        self,
+        course_id: int,
+        verification_method: str | None,
+        status: str | None,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> list[AttendanceEvent]:
+        if self.archive is None or not self._reached_watermark(start):
+            return []
+        return [
+            event
+            for event in self.archive.iter_events(course_id=course_id, start=start, end=end)
+            if (not verification_method or event.verification_method == verification_method)
+            and (not status or event.status == status)
+        ]
+
+    def events_version(
+        self,
+        *,
+        course_id: int,
+        verification_method: str | None = None,
+        status: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> tuple:
+        """Cheap change token for an event listing: row count and newest update.
+
+        Federated ranges also carry the archive watermark, which moves whenever
+        events migrate to cold storage.
+        """
+        filters = (course_id, verification_method, status, start, end)
+        statement = select(func.count(), func.max(AttendanceEvent.updated_at)).where(
+            *self._event_filters(*filters)
+        )
+        count, latest = self.session.exec(statement).one()
+        watermark = self._reached_watermark(start)
+        return (count, latest, watermark) if watermark else (count, latest)
+
     def list_events(
         self,
         *,
@@ -90,16 +197,60 @@ class AttendanceRepository:
         end: datetime | None = None,
     ) -> list[AttendanceEvent]:
         """Retrieve attendance events for instructor dashboards."""
-        statement = select(AttendanceEvent).where(AttendanceEvent.course_id == course_id)
-        if verification_method:
-            statement = statement.where(AttendanceEvent.verification_method == verification_method)
-        if status:
-            statement = statement.where(AttendanceEvent.status == status)
-        if start:
-            statement = statement.where(AttendanceEvent.timestamp >= start)
-        if end:
-            statement = statement.where(AttendanceEvent.timestamp <= end)
-        return list(self.session.exec(statement))
+        filters = (course_id, verification_method, status, start, end)
+        statement = select(AttendanceEvent).where(*self._event_filters(*filters))
+        return self._archived_events(*filters) + list(self.session.exec(statement))
+
+    def list_event_rows(
+        self,
+        *,
+        columns: Sequence[str],
+        course_id: int,
+        verification_method: str | None = None,
+        status: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[tuple]:
+        """Like ``list_events`` but selects only ``columns`` and returns plain tuples.
+
+        Skips ORM identity-map bookkeeping, which dominates large dashboard listings.
+        """
+        filters = (course_id, verification_method, status, start, end)
+        statement = select(*(getattr(AttendanceEvent, name) for name in columns)).where(
+            *self._event_filters(*filters)
+        )
+        archived = [
+            tuple(getattr(event, name) for name in columns)
+            for event in self._archived_events(*filters)
+        ]
+        return archived + [tuple(row) for row in self.session.exec(statement)]
+
+    def archive_events(self, *, before: datetime, batch_size: int = 5000) -> int:
+        """Move events older than ``before`` from the hot table into the archive."""
+        if self.archive is None:
+            raise ValueError("Repository was created without an archive")
+
+        cutoff = as_naive_utc(before)
+        moved = 0
+        while True:
+            statement = (
+                select(AttendanceEvent)
+                .where(AttendanceEvent.timestamp < cutoff)
+                .order_by(col(AttendanceEvent.id))
+                .limit(batch_size)
+            )
+            batch = list(self.session.exec(statement))
+            if not batch:
+                break
+            self.archive.append(batch, cutoff=cutoff)
+            ids = [event.id for event in batch]
+            self.session.connection().execute(
+                delete(AttendanceEvent).where(col(AttendanceEvent.id).in_(ids))
+            )
+            self.session.commit()
+            self.session.expunge_all()
+            moved += len(batch)
+        return moved
 
     def override_event(self, event_id: int, *, status: str, notes: str | None) -> AttendanceEvent:
         """Allow instructors to manually update an event."""
@@ -109,7 +260,97 @@ class AttendanceRepository:
         event.status = status
         event.notes = notes
         event.requires_manual_review = False
+        event.updated_at = datetime.now(tz=timezone.utc)
         self.session.add(event)
         self.session.commit()
         self.session.refresh(event)
         return event
+
+    def override_events(
+        self, overrides: Iterable[tuple[int, str, str | None]]
+    ) -> list[AttendanceEvent]:
+        """Apply many instructor overrides in a single transaction.
+
+        ``overrides`` yields ``(event_id, status, notes)``; see ``update_events`` for
+        how they are batched. If any id is unknown nothing is written and
+        ``ValueError`` is raised.
+        """
+        latest = {
+            event_id: {"status": status, "notes": notes, "requires_manual_review": False}
+            for event_id, status, notes in overrides
+        }
+        updated = self.update_events(latest.items())
+        if updated != len(latest):
+            self.session.rollback()
+            found = set(
+                self.session.exec(
+                    select(AttendanceEvent.id).where(col(AttendanceEvent.id).in_(list(latest)))
+                )
+            )
+            missing = sorted(set(latest) - found)
+            raise ValueError(f"Attendance events {missing} not found")
+        self.session.commit()
+
+        statement = (
+            select(AttendanceEvent)
+            .where(col(AttendanceEvent.id).in_(list(latest)))
+            .execution_options(populate_existing=True)
+        )
+        events = {event.id: event for event in self.session.exec(statement)}
+        return [events[event_id] for event_id in latest]
+
+    def update_events(self, changes: Iterable[tuple[int, dict]]) -> int:
+        """Apply per-event column updates without committing.
+
+        Events sharing identical new values are written with one
+        ``UPDATE ... WHERE id IN (...)``; every touched row also gets a fresh
+        ``updated_at``. Returns the number of rows matched.
+        """
+        groups: dict[tuple, list[int]] = {}
+        for event_id, values in changes:
+            groups.setdefault(tuple(sorted(values.items())), []).append(event_id)
+
+        now = datetime.now(tz=timezone.utc)
+        updated = 0
+        for key, ids in groups.items():
+            statement = (
+                update(AttendanceEvent)
+                .where(col(AttendanceEvent.id).in_(ids))
+                .values({**dict(key), "updated_at": now})
+            )
+            updated += self.session.connection().execute(statement).rowcount
+        return updated
+
+    def iter_gps_events(self, course_id: int, *, chunk_size: int = 5000) -> Iterator[list[tuple]]:
+        """Stream a course's GPS events in id order as lightweight row tuples.
+
+        Rows are ``(id, latitude, longitude, status, requires_manual_review, notes)``.
+        Keyset pagination keeps each chunk an index range scan even while callers
+        update rows between chunks.
+        """
+        last_id = 0
+        while True:
+            statement = (
+                sa_select(
+                    col(AttendanceEvent.id),
+                    col(AttendanceEvent.latitude),
+                    col(AttendanceEvent.longitude),
+                    col(AttendanceEvent.status),
+                    col(AttendanceEvent.requires_manual_review),
+                    col(AttendanceEvent.notes),
+                )
+                .where(
+                    col(AttendanceEvent.course_id) == course_id,
+                    col(AttendanceEvent.verification_method) == "gps",
+                    col(AttendanceEvent.latitude).is_not(None),
+                    col(AttendanceEvent.longitude).is_not(None),
+                    col(AttendanceEvent.id) > last_id,
+                )
+                .order_by(col(AttendanceEvent.id))
+                .limit(chunk_size)
+            )
+            rows = [tuple(row) for row in self.session.connection().execute(statement)]
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
@@ -0,0 +1,83 @@
+"""Repository for the local vision job queue."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlmodel import Session, col, select, update
+
+from ..models.jobs import JOB_QUEUED, JOB_RUNNING, VisionJob
+
+
+class VisionJobRepository:
+    """Enqueue, claim and settle deferred vision verifications."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def enqueue(self, event_id: int, image_path: str) -> VisionJob:
+        job = VisionJob(event_id=event_id, image_path=image_path)
+        self.session.add(job)
+        self.session.commit()
+        self.session.refresh(job)
+        return job
+
+    def claim_next(self) -> VisionJob | None:
+        """Atomically move the oldest queued job to running.
+
+        The conditional UPDATE only matches while the job is still queued, so
+        concurrent workers never score the same capture twice.
+        """
+        while True:
+            statement = (
+                select(VisionJob.id)
+                .where(VisionJob.status == JOB_QUEUED)
+                .order_by(col(VisionJob.id))
+                .limit(1)
+            )
+            job_id = self.session.exec(statement).first()
+            if job_id is None:
+                return None
+            claim = (
+                update(VisionJob)
+                .where(col(VisionJob.id) == job_id, col(VisionJob.status) == JOB_QUEUED)
+                .values(
+                    status=JOB_RUNNING,
+                    attempts=VisionJob.attempts + 1,
+                    updated_at=datetime.now(tz=timezone.utc),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            # sqlmodel's exec() only types SELECTs; the connection's execute() returns a
+            # CursorResult with rowcount, in the same transaction.
+            claimed = self.session.connection().execute(claim).rowcount
+            self.session.commit()
+            if claimed:
+                return self.session.get(VisionJob, job_id, populate_existing=True)
+
+    def settle(self, job: VisionJob, *, status: str, error: str | None = None) -> None:
+        """Record a job outcome without committing."""
+        job.status = status
+        job.error = error
+        job.updated_at = datetime.now(tz=timezone.utc)
+        self.session.add(job)
+
+    def requeue_running(self) -> int:
+        """Return jobs orphaned by a crashed worker to the queue."""
+        requeue = (
+            update(VisionJob)
+            .where(col(VisionJob.status) == JOB_RUNNING)
+            .values(status=JOB_QUEUED)
+            .execution_options(synchronize_session=False)
+        )
+        requeued = self.session.connection().execute(requeue).rowcount
+        self.session.commit()
+        return requeued
+
+    def latest_for_event(self, event_id: int) -> VisionJob | None:
+        statement = (
+            select(VisionJob)
+            .where(col(VisionJob.event_id) == event_id)
+            .order_by(col(VisionJob.id).desc())
+        )
+        return self.session.exec(statement).first()
@@ -29,6 +29,14 @@ class VisionCheckInRequest(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+class CombinedCheckInRequest(GPSCheckInRequest):
+    """GPS payload with an optional capture, verified only if the fence check fails."""
+
+    image_b64: str | None = Field(
+        default=None, description="Base64 encoded capture; used when outside the fence."
+    )
+
+
 class CheckInResponse(BaseModel):
     """Shared response for both GPS and vision flows."""
 
@@ -37,3 +45,15 @@ class CheckInResponse(BaseModel):
     record_id: int
     requires_visual_verification: bool = False
     confidence: float | None = None
+
+
+class CheckInStatusResponse(BaseModel):
+    """Current state of a check-in, polled after an async submission."""
+
+    record_id: int
+    status: str
+    verification_method: str
+    confidence: float | None = None
+    requires_manual_review: bool
+    notes: str | None = None
+    job_status: str | None = None
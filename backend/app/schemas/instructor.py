@@ -4,7 +4,9 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from ..config.settings import LectureHallBounds
 
 
 class CourseResponse(BaseModel):
@@ -44,3 +46,42 @@ class OverrideRequest(BaseModel):
 
     status: str = Field(..., pattern="^(present|absent)$")
     notes: str = Field(..., min_length=3, max_length=280)
+
+
+class BulkOverrideItem(OverrideRequest):
+    """Single entry of a bulk override request."""
+
+    event_id: int
+
+
+class BulkOverrideRequest(BaseModel):
+    """Request body for clearing a review queue in one call."""
+
+    overrides: list[BulkOverrideItem] = Field(..., min_length=1, max_length=1000)
+
+
+class FenceRequest(BaseModel):
+    """Lecture hall geometry for a course, as polygons and/or boxes."""
+
+    polygons: list[list[tuple[float, float]]] = Field(
+        default_factory=list, description="Rings of (lat, lon) vertices."
+    )
+    boxes: list[LectureHallBounds] = Field(default_factory=list)
+    buffer_meters: float = Field(default=40.0, ge=0)
+
+    @model_validator(mode="after")
+    def check_geometry(self) -> FenceRequest:
+        if not self.polygons and not self.boxes:
+            raise ValueError("Provide at least one polygon or box")
+        if any(len(ring) < 3 for ring in self.polygons):
+            raise ValueError("Polygons need at least three vertices")
+        return self
+
+
+class FenceResponse(BaseModel):
+    """Stored fence for a course."""
+
+    course_id: int
+    polygons: list[list[tuple[float, float]]]
+    buffer_meters: float
+    updated_at: datetime
@@ -0,0 +1,100 @@
+"""Admission control for inference so overload sheds requests instead of queueing forever."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed; carries the HTTP status and a retry hint."""
+
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """Bounds in-flight inference and the time requests may wait for a slot.
+
+    Up to ``max_in_flight`` callers run at once and up to ``max_queue`` wait. A caller
+    arriving to a full queue is shed with 429; one that waits longer than
+    ``max_wait_s`` is shed with 503. ``Retry-After`` is the time the current backlog
+    needs to drain at the observed service rate.
+    """
+
+    # Weight of the newest sample in the service-time moving average.
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, *, max_in_flight: int, max_queue: int, max_wait_s: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_wait_timeout = 0
+        self.service_s: float | None = None
+        self.wait_s: float | None = None
+        self._cond = threading.Condition()
+
+    def _ewma(self, current: float | None, sample: float) -> float:
+        return sample if current is None else current + self.EWMA_ALPHA * (sample - current)
+
+    def retry_after(self, ahead: int) -> int:
+        """Seconds for ``ahead`` queued inferences to drain at the observed rate."""
+        drain_per_s = max(self.max_in_flight, 1) / max(self.service_s or 1.0, 1e-3)
+        return max(1, math.ceil(ahead / drain_per_s))
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        arrived = time.monotonic()
+        with self._cond:
+            if self.in_flight >= self.max_in_flight and self.waiting >= self.max_queue:
+                self.shed_queue_full += 1
+                raise Overloaded(429, self.retry_after(self.waiting + 1), "inference queue is full")
+            self.waiting += 1
+            try:
+                deadline = arrived + self.max_wait_s
+                while self.in_flight >= self.max_in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed_wait_timeout += 1
+                        # ``waiting`` still counts this caller, standing in for its own slot.
+                        raise Overloaded(
+                            503, self.retry_after(self.waiting), "timed out waiting for inference"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            self.admitted += 1
+            self.wait_s = self._ewma(self.wait_s, time.monotonic() - arrived)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self.service_s = self._ewma(self.service_s, time.monotonic() - started)
+                self._cond.notify()
+
+    def snapshot(self) -> dict:
+        """Counters and gauges for health and metrics endpoints."""
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "shed_queue_full": self.shed_queue_full,
+                "shed_wait_timeout": self.shed_wait_timeout,
+                "avg_wait_ms": round((self.wait_s or 0.0) * 1000, 2),
+                "avg_service_ms": round((self.service_s or 0.0) * 1000, 2),
+            }
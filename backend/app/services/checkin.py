@@ -2,11 +2,19 @@
 
 from __future__ import annotations
 
+import base64
+from contextlib import nullcontext
 from datetime import datetime
 
-from ..repositories.attendance import AttendanceRepository
-from ..services.gps import GPSFence
+from ..models.attendance import AttendanceEvent
+from ..repositories.attendance import AttendanceRepository, persisted_id
+from ..repositories.jobs import VisionJobRepository
+from ..services.admission import AdmissionController
+from ..services.events import EventBroker
+from ..services.fences import FenceIndex
+from ..services.gps import GPSResult
 from ..services.vision import VisionResult, VisionService
+from ..services.vision_jobs import QUEUED_NOTE, VisionWorkerPool
 
 
 class CheckInService:
@@ -16,12 +24,27 @@ class CheckInService:
         self,
         *,
         repository: AttendanceRepository,
-        gps_fence: GPSFence,
+        fence_index: FenceIndex,
         vision_service: VisionService,
+        events: EventBroker | None = None,
+        vision_jobs: VisionWorkerPool | None = None,
+        admission: AdmissionController | None = None,
     ):
         self.repository = repository
-        self.gps_fence = gps_fence
+        self.fence_index = fence_index
         self.vision_service = vision_service
+        self.events = events
+        self.vision_jobs = vision_jobs
+        self.admission = admission
+
+    def _publish(self, event: AttendanceEvent) -> None:
+        if self.events is not None:
+            self.events.publish("created", event)
+
+    def _score(self, image_b64: str) -> VisionResult:
+        # Raises ``Overloaded`` when inference is saturated; GPS paths never get here.
+        with self.admission.admit() if self.admission else nullcontext():
+            return self.vision_service.evaluate(image_b64)
 
     def handle_gps_checkin(
         self,
@@ -33,8 +56,10 @@ class CheckInService:
         longitude: float,
         timestamp: datetime,
     ):
-        """Validate GPS coordinates and store a record."""
-        gps_result = self.gps_fence.evaluate(latitude=latitude, longitude=longitude)
+        """Validate GPS coordinates against the course's own fence and store a record."""
+        self.fence_index.refresh(self.repository)
+        fence = self.fence_index.fence_for(course_id)
+        gps_result = fence.evaluate(latitude=latitude, longitude=longitude)
         status = "present" if gps_result.within_bounds else "pending"
         event = self.repository.create_event(
             student_id=student_id,
@@ -48,6 +73,7 @@ class CheckInService:
             timestamp=timestamp,
             notes=gps_result.message,
         )
+        self._publish(event)
         return event, gps_result
 
     def handle_vision_checkin(
@@ -60,16 +86,92 @@ class CheckInService:
         timestamp: datetime,
     ):
         """Score an uploaded image and persist the event."""
-        result: VisionResult = self.vision_service.evaluate(image_b64)
-        status = "present" if result.is_match else "rejected"
+        result = self._score(image_b64)
         event = self.repository.create_event(
             student_id=student_id,
             course_id=course_id,
             instructor_id=instructor_id,
             verification_method="vision",
-            status=status,
+            status=result.status,
             confidence=result.confidence,
-            requires_manual_review=not result.is_match and result.confidence >= 0.5,
+            requires_manual_review=result.requires_manual_review,
             timestamp=timestamp,
         )
+        self._publish(event)
         return event, result
+
+    def submit_vision_checkin(
+        self,
+        *,
+        student_id: str,
+        course_id: int,
+        instructor_id: str,
+        image_b64: str,
+        timestamp: datetime,
+    ) -> AttendanceEvent:
+        """Store a pending event and queue its capture for the background workers."""
+        if self.vision_jobs is None:
+            raise RuntimeError("Async vision check-ins need a worker pool")
+        image_bytes = base64.b64decode(image_b64, validate=True)
+        event = self.repository.create_event(
+            student_id=student_id,
+            course_id=course_id,
+            instructor_id=instructor_id,
+            verification_method="vision",
+            status="pending",
+            timestamp=timestamp,
+            notes=QUEUED_NOTE,
+        )
+        image_path = self.vision_jobs.spool(image_bytes)
+        VisionJobRepository(self.repository.session).enqueue(persisted_id(event), image_path)
+        self.vision_jobs.notify()
+        self._publish(event)
+        return event
+
+    def handle_checkin(
+        self,
+        *,
+        student_id: str,
+        course_id: int,
+        instructor_id: str,
+        latitude: float,
+        longitude: float,
+        image_b64: str | None,
+        timestamp: datetime,
+    ) -> tuple[AttendanceEvent, GPSResult, VisionResult | None]:
+        """Fence first, vision only when the fence fails and an image was sent.
+
+        Exactly one event is stored. Passing the fence never touches the model; a
+        vision-decided event keeps the coordinates and the fence message as notes.
+        """
+        self.fence_index.refresh(self.repository)
+        gps_result = self.fence_index.fence_for(course_id).evaluate(
+            latitude=latitude, longitude=longitude
+        )
+        vision_result = None
+        confidence = None
+        if gps_result.within_bounds or not image_b64:
+            method = "gps"
+            status = "present" if gps_result.within_bounds else "pending"
+            requires_manual_review = gps_result.requires_visual_verification
+        else:
+            vision_result = self._score(image_b64)
+            method, status = "vision", vision_result.status
+            confidence = vision_result.confidence
+            requires_manual_review = vision_result.requires_manual_review
+
+        event = self.repository.create_event(
+            student_id=student_id,
+            course_id=course_id,
+            instructor_id=instructor_id,
+            verification_method=method,
+            latitude=latitude,
+            longitude=longitude,
+            timestamp=timestamp,
+            status=status,
+            confidence=confidence,
+            requires_manual_review=requires_manual_review,
+            notes=gps_result.message,
+        )
+        self._publish(event)
+        return event, gps_result, vision_result
@@ -0,0 +1,115 @@
+"""In-process pub/sub that fans attendance changes out to live dashboard streams."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import AsyncGenerator
+
+import orjson
+
+from ..models.attendance import AttendanceEvent
+from ..repositories.attendance import persisted_id
+from ..schemas.instructor import AttendanceEventResponse
+
+logger = logging.getLogger(__name__)
+
+_EVENT_FIELDS = tuple(AttendanceEventResponse.model_fields)
+
+# Sent to a subscriber that fell behind: its backlog was dropped, refetch the listing.
+RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+
+def sse_frame(kind: str, event: AttendanceEvent) -> bytes:
+    """Encode an event as one server-sent-events message."""
+    data = orjson.dumps({name: getattr(event, name) for name in _EVENT_FIELDS})
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (persisted_id(event), kind.encode(), data)
+
+
+class Subscription:
+    """One stream's bounded queue, owned by the event loop that created it."""
+
+    def __init__(self, course_id: int, max_queue: int):
+        self.course_id = course_id
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=max_queue)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    def offer(self, frame: bytes) -> None:
+        """Enqueue a frame; must run on ``self.loop``."""
+        if self.queue.full():
+            # A slow consumer never blocks publishers: drop its backlog and ask it to resync.
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_FRAME)
+            logger.warning(f"Stream for course {self.course_id} fell behind; sent resync")
+            return
+        self.queue.put_nowait(frame)
+
+
+class EventBroker:
+    """Per-course fan-out of committed attendance changes.
+
+    Publishers are synchronous request handlers running in the threadpool; each frame
+    is encoded once and handed to subscriber loops with ``call_soon_threadsafe``.
+    Courses with no subscribers cost a dict lookup.
+    """
+
+    def __init__(self, *, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, course_id: int) -> Subscription:
+        """Register a stream; call from inside the event loop that will consume it."""
+        subscription = Subscription(course_id, self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(course_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.course_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.course_id]
+
+    def subscriber_count(self, course_id: int) -> int:
+        return len(self._subscribers.get(course_id, ()))
+
+    def publish(self, kind: str, event: AttendanceEvent) -> int:
+        """Push a committed event to its course's streams; returns how many were reached."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(event.course_id, ()))
+        if not subscribers:
+            return 0
+        frame = sse_frame(kind, event)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, frame)
+            except RuntimeError:
+                # The consuming loop has shut down.
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+    async def stream(
+        self, course_id: int, *, heartbeat_s: float = 15.0
+    ) -> AsyncGenerator[bytes, None]:
+        """Yield a course's frames, with keepalives so proxies keep it open.
+
+        The subscription only exists while the generator runs, so a response that is
+        never iterated (the client left before the first chunk) never registers one.
+        """
+        subscription = self.subscribe(course_id)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat_s)
+                except TimeoutError:
+                    yield KEEPALIVE_FRAME
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,112 @@
+"""In-memory index of per-course lecture hall fences."""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from ..models.attendance import CourseFence
+from ..repositories.attendance import AttendanceRepository
+from .gps import GPSFence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """One loaded generation of the index; replaced whole, never mutated."""
+
+    fences: dict[int, GPSFence] = field(default_factory=dict)
+    grid: dict[tuple[int, int], list[int]] = field(default_factory=dict)
+    oversized: list[int] = field(default_factory=list)
+    version: tuple | None = None
+
+
+class FenceIndex:
+    """Compiled course fences plus a uniform grid for point-to-course lookups.
+
+    Fences are compiled into ``GPSFence`` objects once per load. ``fence_for`` is a dict
+    lookup; ``courses_at`` consults grid cells (``cell_deg`` on a side, ~110 m by default)
+    so only fences overlapping the point's cell are tested. Courses without a stored
+    fence fall back to ``default``. A load builds a new ``_Snapshot`` and publishes it
+    with a single reference assignment; readers bind the reference once per call, so
+    they never mix fences and grid from different loads.
+    """
+
+    # Fences spanning more cells than this are kept out of the grid and scanned directly.
+    MAX_CELLS_PER_FENCE = 4096
+
+    def __init__(
+        self,
+        default: GPSFence,
+        *,
+        cell_deg: float = 0.001,
+        refresh_interval_s: float = 30.0,
+    ):
+        self.default = default
+        self.cell_deg = cell_deg
+        self.refresh_interval_s = refresh_interval_s
+        self._snapshot = _Snapshot()
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg)
+
+    def load(self, fences: Iterable[CourseFence], version: tuple | None = None) -> None:
+        """Compile stored fences and rebuild the grid."""
+        compiled: dict[int, GPSFence] = {}
+        grid: dict[tuple[int, int], list[int]] = {}
+        oversized: list[int] = []
+        for record in fences:
+            fence = GPSFence(polygons=record.polygons, buffer_meters=record.buffer_meters)
+            compiled[record.course_id] = fence
+            bounds = fence.bounds
+            lat_lo, lon_lo = self._cell(bounds.min_lat, bounds.min_lon)
+            lat_hi, lon_hi = self._cell(bounds.max_lat, bounds.max_lon)
+            if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) > self.MAX_CELLS_PER_FENCE:
+                oversized.append(record.course_id)
+                continue
+            for i in range(lat_lo, lat_hi + 1):
+                for j in range(lon_lo, lon_hi + 1):
+                    grid.setdefault((i, j), []).append(record.course_id)
+
+        self._snapshot = _Snapshot(compiled, grid, oversized, version)
+        logger.info(f"Fence index loaded {len(compiled)} course fences")
+
+    def fence_for(self, course_id: int) -> GPSFence:
+        """Return the course's own fence, or the campus default."""
+        return self._snapshot.fences.get(course_id, self.default)
+
+    def courses_at(self, latitude: float, longitude: float) -> list[int]:
+        """Course ids whose stored fence contains the point."""
+        snapshot = self._snapshot
+        candidates = snapshot.grid.get(self._cell(latitude, longitude), []) + snapshot.oversized
+        return [
+            course_id
+            for course_id in candidates
+            if snapshot.fences[course_id].contains(latitude, longitude)
+        ]
+
+    def invalidate(self) -> None:
+        """Force the next ``refresh`` to re-check the stored fences."""
+        self._checked_at = float("-inf")
+
+    def refresh(self, repository: AttendanceRepository) -> bool:
+        """Reload when the fence table changed; checks at most once per interval."""
+        now = time.monotonic()
+        if now - self._checked_at < self.refresh_interval_s:
+            return False
+        with self._lock:
+            if now - self._checked_at < self.refresh_interval_s:
+                return False
+            self._checked_at = now
+            version = repository.fence_version()
+            if version == self._snapshot.version:
+                return False
+            self.load(repository.list_fences(), version=version)
+            return True
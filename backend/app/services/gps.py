@@ -2,11 +2,31 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
-from math import sqrt
+from math import cos, hypot, inf, pi, radians
+
+import numpy as np
+from numpy.typing import ArrayLike
 
 from ..config.settings import LectureHallBounds
 
+# A polygon is a ring of (lat, lon) vertices; the closing edge is implicit.
+Polygon = Sequence[tuple[float, float]]
+
+# Mean Earth radius, matching the haversine used by the serve app.
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEGREE = EARTH_RADIUS_M * pi / 180
+ON_EDGE_TOLERANCE_M = 1e-6
+
+# Message codes returned by ``GPSFence.evaluate_many``.
+INSIDE, NEAR, OUTSIDE = 0, 1, 2
+MESSAGES = {
+    INSIDE: "GPS location confirmed within lecture hall.",
+    NEAR: "Location close to hall, please use visual verification.",
+    OUTSIDE: "GPS location outside of lecture hall bounds. Please verify with a photo of the classroom.",
+}
+
 
 @dataclass
 class GPSResult:
@@ -17,44 +37,193 @@ class GPSResult:
     message: str
 
 
+@dataclass
+class GPSBatchResult:
+    """Vectorized outcome of ``GPSFence.evaluate_many``; arrays share the input shape."""
+
+    within_bounds: np.ndarray
+    within_buffer: np.ndarray
+    message_codes: np.ndarray
+
+    def __len__(self) -> int:
+        return self.within_bounds.size
+
+    def result(self, index: int) -> GPSResult:
+        """Materialize the scalar ``GPSResult`` for one point."""
+        within = bool(self.within_bounds.flat[index])
+        return GPSResult(
+            within_bounds=within,
+            # Always require visual verification when outside bounds
+            requires_visual_verification=not within,
+            message=MESSAGES[int(self.message_codes.flat[index])],
+        )
+
+
+def box_polygon(bounds: LectureHallBounds) -> list[tuple[float, float]]:
+    """Express a bounding box as a four-vertex polygon."""
+    return [
+        (bounds.min_lat, bounds.min_lon),
+        (bounds.min_lat, bounds.max_lon),
+        (bounds.max_lat, bounds.max_lon),
+        (bounds.max_lat, bounds.min_lon),
+    ]
+
+
 class GPSFence:
-    """Simple bounding-box fence with buffer logic."""
+    """Lecture hall fence made of one or more polygons, with buffer logic.
 
-    def __init__(self, bounds: LectureHallBounds, buffer_meters: float = 40.0):
-        self.bounds = bounds
-        # convert ~1e-5 degrees ≈ 1.11 m at Harvard lat
-        self.buffer = buffer_meters * 0.00001
+    Constructed from a single ``LectureHallBounds`` box (the legacy global fence) or
+    from explicit polygons. Rings are compiled once into a local equirectangular
+    projection centred on the fence (east = Δlon·cos(lat₀), north = Δlat, in meters), so
+    buffers and distances are true meters. ``evaluate_many`` checks whole coordinate
+    arrays. The scalar ``evaluate`` and ``contains`` run the same arithmetic in plain
+    Python over the same compiled rings, since NumPy's per-call overhead dwarfs the work
+    for a single point.
+    """
 
-    def evaluate(self, latitude: float, longitude: float) -> GPSResult:
-        """Check whether a coordinate is inside the lecture hall."""
-        inside_lat = self.bounds.min_lat <= latitude <= self.bounds.max_lat
-        inside_lon = self.bounds.min_lon <= longitude <= self.bounds.max_lon
-        within = inside_lat and inside_lon
-        if within:
-            return GPSResult(
-                within_bounds=True,
-                requires_visual_verification=False,
-                message="GPS location confirmed within lecture hall.",
-            )
+    CHUNK_SIZE = 65536
+
+    def __init__(
+        self,
+        bounds: LectureHallBounds | None = None,
+        buffer_meters: float = 40.0,
+        *,
+        polygons: Iterable[Polygon] | None = None,
+    ):
+        rings = [list(ring) for ring in polygons] if polygons is not None else []
+        if bounds is not None:
+            rings.append(box_polygon(bounds))
+        if not rings or any(len(ring) < 3 for ring in rings):
+            raise ValueError("A fence needs at least one polygon with three or more vertices")
 
-        # Determine if user is close to the fence (for a more specific message).
-        lat_buffer = (
-            (self.bounds.min_lat - self.buffer) <= latitude <= (self.bounds.max_lat + self.buffer)
+        self.buffer_meters = buffer_meters
+        self.polygons = rings
+        lats = [lat for ring in rings for lat, _ in ring]
+        lons = [lon for ring in rings for _, lon in ring]
+        self.bounds = bounds or LectureHallBounds(
+            min_lat=min(lats), max_lat=max(lats), min_lon=min(lons), max_lon=max(lons)
         )
-        lon_buffer = (
-            (self.bounds.min_lon - self.buffer) <= longitude <= (self.bounds.max_lon + self.buffer)
+
+        self.origin = (
+            (self.bounds.min_lat + self.bounds.max_lat) / 2,
+            (self.bounds.min_lon + self.bounds.max_lon) / 2,
+        )
+        self._north_scale = METERS_PER_DEGREE
+        self._east_scale = METERS_PER_DEGREE * cos(radians(self.origin[0]))
+        self._compiled = [self._compile(*self.project(*np.asarray(ring).T)) for ring in rings]
+
+    @classmethod
+    def from_boxes(cls, boxes: Iterable[LectureHallBounds], buffer_meters: float = 40.0):
+        """Build a multi-box fence, e.g. a hall plus its annex."""
+        return cls(polygons=[box_polygon(box) for box in boxes], buffer_meters=buffer_meters)
+
+    def project(self, lats: ArrayLike, lons: ArrayLike) -> tuple[np.ndarray, np.ndarray]:
+        """Map coordinates to (east, north) meters from the fence origin."""
+        lat0, lon0 = self.origin
+        east = (np.asarray(lons, dtype=np.float64) - lon0) * self._east_scale
+        north = (np.asarray(lats, dtype=np.float64) - lat0) * self._north_scale
+        return east, north
+
+    def distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+        """Distance in meters between two nearby points under the fence's projection."""
+        return hypot((lon1 - lon2) * self._east_scale, (lat1 - lat2) * self._north_scale)
+
+    @staticmethod
+    def _compile(east: np.ndarray, north: np.ndarray) -> _Ring:
+        x1, y1 = np.roll(east, 1), np.roll(north, 1)
+        dx, dy = east - x1, north - y1
+        length_sq = dx * dx + dy * dy
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv_length_sq = np.where(length_sq > 0, 1.0 / length_sq, 0.0)
+            slope = np.where(dx != 0, dy / dx, 0.0)
+        return _Ring(
+            bbox=(float(east.min()), float(east.max()), float(north.min()), float(north.max())),
+            edges=tuple(
+                map(tuple, np.column_stack((x1, y1, east, dx, dy, inv_length_sq, slope)).tolist())
+            ),
+            x1=x1,
+            y1=y1,
+            x2=east,
+            dx=dx,
+            dy=dy,
+            inv_length_sq=inv_length_sq,
+            slope=slope,
         )
-        near = lat_buffer and lon_buffer
-        message = (
-            "Location close to hall, please use visual verification."
-            if near
-            else "GPS location outside of lecture hall bounds. Please verify with a photo of the classroom."
+
+    def evaluate_many(self, lats: ArrayLike, lons: ArrayLike) -> GPSBatchResult:
+        """Vectorized fence check for arrays of coordinates.
+
+        Points are projected once, then each ring is tested with (points x edges)
+        broadcasting over the points that pass its buffered bounding box, in chunks of
+        ``CHUNK_SIZE`` to bound memory.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if lats.shape != lons.shape:
+            raise ValueError("lats and lons must have the same shape")
+        shape = lats.shape
+        east, north = self.project(lats.ravel(), lons.ravel())
+
+        within = np.zeros(east.size, dtype=bool)
+        within_buffer = np.zeros(east.size, dtype=bool)
+        buffer = self.buffer_meters
+        for ring in self._compiled:
+            min_x, max_x, min_y, max_y = ring.bbox
+            candidates = np.flatnonzero(
+                ~within
+                & (east >= min_x - buffer)
+                & (east <= max_x + buffer)
+                & (north >= min_y - buffer)
+                & (north <= max_y + buffer)
+            )
+            for offset in range(0, candidates.size, self.CHUNK_SIZE):
+                chunk = candidates[offset : offset + self.CHUNK_SIZE]
+                inside, closest = ring.hits(east[chunk], north[chunk])
+                within[chunk] |= inside
+                within_buffer[chunk] |= inside | (closest <= buffer)
+
+        codes = np.full(east.size, OUTSIDE, dtype=np.int8)
+        codes[within_buffer] = NEAR
+        codes[within] = INSIDE
+        return GPSBatchResult(
+            within_bounds=within.reshape(shape),
+            within_buffer=within_buffer.reshape(shape),
+            message_codes=codes.reshape(shape),
         )
-        # Always require visual verification when outside bounds
+
+    def _code(self, latitude: float, longitude: float, buffer: float) -> int:
+        """Scalar counterpart of ``evaluate_many`` for one point: INSIDE, NEAR or OUTSIDE."""
+        lat0, lon0 = self.origin
+        x = (longitude - lon0) * self._east_scale
+        y = (latitude - lat0) * self._north_scale
+        code = OUTSIDE
+        for ring in self._compiled:
+            min_x, max_x, min_y, max_y = ring.bbox
+            if not (
+                min_x - buffer <= x <= max_x + buffer and min_y - buffer <= y <= max_y + buffer
+            ):
+                continue
+            if ring.crosses_odd(x, y):
+                return INSIDE
+            closest = ring.nearest(x, y)
+            if closest <= ON_EDGE_TOLERANCE_M:
+                return INSIDE
+            if closest <= buffer:
+                code = NEAR
+        return code
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        """Point-in-polygon test against every ring of the fence."""
+        return self._code(latitude, longitude, ON_EDGE_TOLERANCE_M) == INSIDE
+
+    def evaluate(self, latitude: float, longitude: float) -> GPSResult:
+        """Check whether a coordinate is inside the lecture hall."""
+        code = self._code(latitude, longitude, self.buffer_meters)
         return GPSResult(
-            within_bounds=False,
-            requires_visual_verification=True,
-            message=message,
+            within_bounds=code == INSIDE,
+            # Always require visual verification when outside bounds
+            requires_visual_verification=code != INSIDE,
+            message=MESSAGES[code],
         )
 
     @staticmethod
@@ -62,7 +231,49 @@ class GPSFence:
         """Expose bounds as tuple for testing."""
         return (bounds.min_lat, bounds.max_lat, bounds.min_lon, bounds.max_lon)
 
-    @staticmethod
-    def distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """Rough Euclidean distance for educational demos."""
-        return sqrt((lat1 - lat2) ** 2 + (lon1 - lon2) ** 2)
+
+@dataclass(frozen=True)
+class _Ring:
+    """Projected edges of one polygon ring: arrays for broadcasting, plus the same values
+    as per-edge tuples (x1, y1, x2, dx, dy, inv_length_sq, slope) for scalar checks."""
+
+    bbox: tuple[float, float, float, float]
+    edges: tuple[tuple[float, ...], ...]
+    x1: np.ndarray
+    y1: np.ndarray
+    x2: np.ndarray
+    dx: np.ndarray
+    dy: np.ndarray
+    inv_length_sq: np.ndarray
+    slope: np.ndarray
+
+    def hits(self, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return (inside, meters to the nearest edge) for each projected point."""
+        x, y = x[:, None], y[:, None]
+        rel_x, rel_y = x - self.x1, y - self.y1
+        # Ray cast northwards: count edges crossed above the point.
+        straddles = (self.x1 > x) != (self.x2 > x)
+        crossings = straddles & (rel_y < rel_x * self.slope)
+        inside = np.count_nonzero(crossings, axis=1) % 2 == 1
+
+        t = np.clip((rel_x * self.dx + rel_y * self.dy) * self.inv_length_sq, 0.0, 1.0)
+        closest = np.hypot(rel_x - t * self.dx, rel_y - t * self.dy).min(axis=1)
+        # Points on an edge (to within rounding) count as inside, like the inclusive box check.
+        return inside | (closest <= ON_EDGE_TOLERANCE_M), closest
+
+    def crosses_odd(self, x: float, y: float) -> bool:
+        """Scalar ray cast with the same arithmetic as ``hits``."""
+        inside = False
+        for x1, y1, x2, _, _, _, slope in self.edges:
+            if (x1 > x) != (x2 > x) and y - y1 < (x - x1) * slope:
+                inside = not inside
+        return inside
+
+    def nearest(self, x: float, y: float) -> float:
+        """Meters from a projected point to the ring's nearest edge."""
+        closest = inf
+        for x1, y1, _, dx, dy, inv_length_sq, _ in self.edges:
+            rel_x, rel_y = x - x1, y - y1
+            t = min(max((rel_x * dx + rel_y * dy) * inv_length_sq, 0.0), 1.0)
+            closest = min(closest, hypot(rel_x - t * dx, rel_y - t * dy))
+        return closest
@@ -17,6 +17,24 @@ class VisionResult:
     is_match: bool
     confidence: float
 
+    @property
+    def status(self) -> str:
+        """Attendance status implied by this result."""
+        return "present" if self.is_match else "rejected"
+
+    @property
+    def requires_manual_review(self) -> bool:
+        """Near misses go to an instructor instead of being rejected outright."""
+        return not self.is_match and self.confidence >= 0.5
+
+    def event_fields(self) -> dict[str, object]:
+        """Attendance event columns implied by this result, for bulk updates."""
+        return {
+            "status": self.status,
+            "confidence": self.confidence,
+            "requires_manual_review": self.requires_manual_review,
+        }
+
 
 class VisionService:
     """Decodes payloads and delegates to the model loader."""
@@ -28,6 +46,9 @@ class VisionService:
 
     def evaluate(self, image_b64: str) -> VisionResult:
         """Decode base64 image and score it using the CNN loader."""
-        image_bytes = base64.b64decode(image_b64, validate=True)
+        return self.evaluate_bytes(base64.b64decode(image_b64, validate=True))
+
+    def evaluate_bytes(self, image_bytes: bytes) -> VisionResult:
+        """Score already-decoded image bytes."""
         is_match, confidence = self.model.verify(image_bytes)
         return VisionResult(is_match=is_match, confidence=confidence)
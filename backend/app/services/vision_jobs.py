@@ -0,0 +1,120 @@
+"""Background scoring of vision check-ins accepted in async mode."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from pathlib import Path
+
+from ..database import session_scope
+from ..models.attendance import AttendanceEvent
+from ..models.jobs import JOB_DONE, JOB_FAILED, JOB_QUEUED
+from ..repositories.attendance import AttendanceRepository
+from ..repositories.jobs import VisionJobRepository
+from .events import EventBroker
+from .vision import VisionService
+
+logger = logging.getLogger(__name__)
+
+QUEUED_NOTE = "Queued for visual verification."
+FAILED_NOTE = "Visual verification failed; please review manually."
+
+
+class VisionWorkerPool:
+    """Threads that drain the ``VisionJob`` table.
+
+    Captures are spooled to ``image_dir`` and referenced from the job row, so queued
+    work survives restarts; jobs left running by a crash are re-queued on ``start``.
+    Workers sleep until ``notify`` or the poll interval, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        vision_service: VisionService,
+        *,
+        image_dir: Path,
+        events: EventBroker | None = None,
+        workers: int = 2,
+        max_attempts: int = 3,
+        poll_interval_s: float = 1.0,
+    ):
+        self.vision_service = vision_service
+        self.image_dir = Path(image_dir)
+        self.events = events
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_interval_s = poll_interval_s
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def spool(self, image_bytes: bytes) -> str:
+        """Write a capture to disk and return the path stored on the job."""
+        self.image_dir.mkdir(parents=True, exist_ok=True)
+        path = self.image_dir / f"{uuid.uuid4().hex}.img"
+        path.write_bytes(image_bytes)
+        return str(path)
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def start(self) -> None:
+        with session_scope() as session:
+            requeued = VisionJobRepository(session).requeue_running()
+        if requeued:
+            logger.info(f"Re-queued {requeued} interrupted vision jobs")
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"vision-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception:
+                logger.exception("Vision worker iteration failed")
+            self._wakeup.wait(self.poll_interval_s)
+            self._wakeup.clear()
+
+    def run_once(self) -> bool:
+        """Claim and score one job; returns False when the queue is empty."""
+        with session_scope() as session:
+            jobs = VisionJobRepository(session)
+            job = jobs.claim_next()
+            if job is None:
+                return False
+
+            repository = AttendanceRepository(session)
+            try:
+                result = self.vision_service.evaluate_bytes(Path(job.image_path).read_bytes())
+            except Exception as exc:
+                logger.warning(f"Vision job {job.id} attempt {job.attempts} failed: {exc}")
+                if job.attempts < self.max_attempts:
+                    jobs.settle(job, status=JOB_QUEUED, error=str(exc))
+                    return True
+                jobs.settle(job, status=JOB_FAILED, error=str(exc))
+                fields = {"requires_manual_review": True, "notes": FAILED_NOTE}
+            else:
+                jobs.settle(job, status=JOB_DONE)
+                fields = {**result.event_fields(), "notes": None}
+
+            repository.update_events([(job.event_id, fields)])
+            session.commit()
+            Path(job.image_path).unlink(missing_ok=True)
+            event = session.get(AttendanceEvent, job.event_id, populate_existing=True)
+            if self.events is not None and event is not None:
+                self.events.publish("verified", event)
+            return True
@@ -0,0 +1,83 @@
+"""Timed, partially parallel application startup."""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.ml.model_loader import log_model_version
+
+from .config.settings import settings
+from .database import init_db, session_scope
+from .repositories.attendance import AttendanceRepository
+from .services.vision import VisionService
+
+logger = logging.getLogger(__name__)
+
+
+def timed_phase(name: str, func: Callable[[], dict | None]) -> dict:
+    """Run a startup phase and emit one structured log line with its duration."""
+    started = time.perf_counter()
+    record: dict = {"event": "startup_phase", "phase": name, "status": "ok"}
+    try:
+        record.update(func() or {})
+    except Exception as exc:
+        record.update(status="error", error=str(exc))
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(json.dumps(record))
+    return record
+
+
+def _prepare_database() -> None:
+    timed_phase("schema", lambda: {"status": "applied" if init_db() else "skipped"})
+
+    def seed() -> None:
+        with session_scope() as session:
+            AttendanceRepository(session).ensure_seed_courses(settings.default_courses)
+
+    timed_phase("seed_courses", seed)
+
+
+def _prepare_model(vision_service: VisionService) -> None:
+    """Warm the vision model without making it a startup dependency.
+
+    A failed phase is logged with status "error" and startup carries on; the model then
+    loads lazily on the first vision check, so GPS check-in keeps working.
+    """
+
+    def load() -> dict:
+        model_info = log_model_version()
+        return {"model_name": model_info.get("model_name")}
+
+    for name, func in (
+        ("model_metadata", load),
+        ("model_warmup", lambda: {"loaded": vision_service.model.warmup()}),
+    ):
+        try:
+            timed_phase(name, func)
+        except Exception:
+            logger.warning(f"Startup phase {name} failed; continuing without it", exc_info=True)
+
+
+def run_startup(vision_service: VisionService) -> None:
+    """Initialize the database and the vision model concurrently.
+
+    Schema creation and seeding are sequential with respect to each other but
+    independent of model loading, so the two chains overlap.
+    """
+
+    def run_all() -> None:
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup") as executor:
+            futures = [
+                executor.submit(_prepare_database),
+                executor.submit(_prepare_model, vision_service),
+            ]
+            for future in futures:
+                future.result()
+
+    timed_phase("total", run_all)
@@ -20,10 +20,17 @@ logger = logging.getLogger(__name__)
 DEFAULT_MODEL_DIR = Path("models/harv_cnn_v1")
 
 
+# Parsed metadata keyed by path, invalidated when the file's mtime changes.
+_MODEL_INFO_CACHE: dict[Path, tuple[float | None, dict]] = {}
+
+
 def get_model_info(model_dir: Path | None = None) -> dict:
     """
     Read model metadata and return version info for logging.
 
+    Parsed metadata is cached per path and only re-read when the file's mtime
+    changes, so repeated calls cost a single ``stat``.
+
     Args:
         model_dir: Path to model directory (default: models/harv_cnn_v1).
 
@@ -35,15 +42,24 @@ def get_model_info(model_dir: Path | None = None) -> dict:
     metadata_path = model_dir / "metadata.json"
     weights_path = model_dir / "weights.pt"
 
-    if not metadata_path.exists():
+    try:
+        mtime: float | None = metadata_path.stat().st_mtime
+    except OSError:
+        mtime = None
+
+    cached = _MODEL_INFO_CACHE.get(metadata_path)
+    if cached is not None and cached[0] == mtime:
+        return dict(cached[1])
+
+    if mtime is None:
         logger.warning(f"Model metadata not found at {metadata_path}")
+        _MODEL_INFO_CACHE[metadata_path] = (None, {})
         return {}
 
     with metadata_path.open("r", encoding="utf-8") as f:
         metadata = json.load(f)
 
     # Get file modification time as proxy for training timestamp
-    mtime = metadata_path.stat().st_mtime
     timestamp = datetime.fromtimestamp(mtime, tz=UTC).isoformat()
 
     info = {
@@ -56,7 +72,8 @@ def get_model_info(model_dir: Path | None = None) -> dict:
         "metadata_path": str(metadata_path),
         "last_updated": timestamp,
     }
-    return info
+    _MODEL_INFO_CACHE[metadata_path] = (mtime, info)
+    return dict(info)
 
 
 def log_model_version(model_dir: Path | None = None) -> dict:
@@ -172,6 +189,21 @@ class VisionModel:
             logger.warning(f"PyTorch/torchvision not available: {e}. Using fallback.")
             self._loaded = False
 
+    def warmup(self) -> bool:
+        """Load weights and run one dummy forward pass.
+
+        Returns False when PyTorch is unavailable and the fallback path is active.
+        """
+        self._ensure_loaded()
+        if not self._loaded or self._model is None:
+            return False
+
+        import torch
+
+        with torch.no_grad():
+            self._model(torch.zeros(1, 3, 224, 224))
+        return True
+
     def verify(self, image_bytes: bytes) -> tuple[bool, float]:
         """Verify if image shows a classroom/lecture hall environment.
 
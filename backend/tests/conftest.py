@@ -10,6 +10,7 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session, SQLModel, create_engine
 
 from backend.app import database
+from backend.app.api.routes import checkin
 from backend.app.config.settings import settings
 from backend.app.main import create_app
 from backend.app.repositories.attendance import AttendanceRepository
@@ -35,6 +36,7 @@ def fixture_db_session(test_engine):
 def fixture_client(test_engine):
     """Spin up the FastAPI TestClient with overridden DB dependencies."""
     database.engine = test_engine
+    checkin.fence_index.invalidate()
     app = create_app()
 
     with Session(test_engine) as session:
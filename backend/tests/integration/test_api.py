@@ -4,7 +4,10 @@ from __future__ import annotations
 
 from fastapi.testclient import TestClient
 
+from backend.app import database
+from backend.app.api.routes import checkin
 from backend.app.config.settings import settings
+from backend.app.main import create_app
 
 
 def test_health_endpoint(client: TestClient):
@@ -17,6 +20,34 @@ def test_health_endpoint(client: TestClient):
     assert "lecture_hall_bounds" in body
 
 
+def test_metrics_endpoint_exposes_route_and_process_metrics(client: TestClient):
+    client.get("/health")
+    client.get("/api/checkin/999999")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in body
+    assert 'route="/api/checkin/{record_id}",status="404"' in body
+    assert "http_request_duration_seconds_bucket" in body
+    assert "http_requests_in_flight" in body
+    assert "process_resident_memory_bytes" in body
+    assert "process_open_fds" in body
+    assert "python_gc_pause_seconds_count" in body
+    assert 'harv_admission_shed_total{pool="vision",reason="queue_full"}' in body
+
+
+def test_deep_health_pings_dependencies(client: TestClient):
+    response = client.get("/health/deep")
+    assert response.status_code == 200
+    checks = response.json()["checks"]
+    assert checks["database"]["ok"] is True
+    assert checks["vision_model"]["ok"] is True
+    assert "latency_ms" in checks["database"]
+
+
 def test_gps_checkin(client: TestClient):
     payload = {
         "student_id": "student-1",
@@ -47,6 +78,101 @@ def test_vision_checkin(client: TestClient, sample_image_b64: str):
     assert body["confidence"] is not None
 
 
+def test_combined_checkin_skips_vision_inside_fence(
+    client: TestClient, sample_image_b64: str, monkeypatch
+):
+    def fail(image_b64):
+        raise AssertionError("vision should not run when the fence passes")
+
+    monkeypatch.setattr(checkin.vision_service, "evaluate", fail)
+    payload = {
+        "student_id": "student-combined",
+        "course_id": 1,
+        "instructor_id": "instructor-harv",
+        "device_id": "ios-1",
+        "latitude": 42.3765,
+        "longitude": -71.1168,
+        "image_b64": sample_image_b64,
+    }
+    response = client.post("/api/checkin", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "present"
+    assert body["confidence"] is None
+
+
+def test_combined_checkin_falls_back_to_vision_outside_fence(
+    client: TestClient, sample_image_b64: str
+):
+    payload = {
+        "student_id": "student-combined",
+        "course_id": 1,
+        "instructor_id": "instructor-harv",
+        "device_id": "ios-1",
+        "latitude": 0.0,
+        "longitude": 0.0,
+        "image_b64": sample_image_b64,
+    }
+    response = client.post("/api/checkin", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["confidence"] is not None
+    listing = client.get("/api/instructor/attendance", params={"course_id": 1}).json()
+    assert [(e["id"], e["verification_method"]) for e in listing] == [(body["record_id"], "vision")]
+
+
+def test_async_vision_checkin_is_scored_in_background(
+    client: TestClient, sample_image_b64: str, tmp_path, monkeypatch
+):
+    spool = tmp_path / "spool"
+    monkeypatch.setattr(checkin.vision_workers, "image_dir", spool)
+    payload = {
+        "student_id": "student-async",
+        "course_id": 1,
+        "instructor_id": "instructor-harv",
+        "image_b64": sample_image_b64,
+    }
+    response = client.post("/api/checkin/vision", params={"mode": "async"}, json=payload)
+
+    assert response.status_code == 202
+    record_id = response.json()["record_id"]
+    pending = client.get(f"/api/checkin/{record_id}").json()
+    assert pending["status"] == "pending"
+    assert pending["job_status"] == "queued"
+
+    assert checkin.vision_workers.run_once() is True
+    assert checkin.vision_workers.run_once() is False
+
+    scored = client.get(f"/api/checkin/{record_id}").json()
+    assert scored["job_status"] == "done"
+    assert scored["status"] in {"present", "rejected"}
+    assert scored["confidence"] is not None
+    assert not list(spool.iterdir())
+
+
+def test_saturated_vision_is_shed_but_gps_is_not(
+    client: TestClient, sample_image_b64: str, monkeypatch
+):
+    monkeypatch.setattr(checkin.vision_admission, "max_in_flight", 0)
+    monkeypatch.setattr(checkin.vision_admission, "max_queue", 0)
+    vision_payload = {
+        "student_id": "student-shed",
+        "course_id": 1,
+        "instructor_id": "instructor-harv",
+        "image_b64": sample_image_b64,
+    }
+    shed = client.post("/api/checkin/vision", json=vision_payload)
+
+    assert shed.status_code == 429
+    assert int(shed.headers["retry-after"]) >= 1
+    gps_payload = {**vision_payload, "device_id": "ios-1", "latitude": 0.0, "longitude": 0.0}
+    assert client.post("/api/checkin/gps", json=gps_payload).status_code == 200
+    counters = client.get("/health/admission").json()["vision"]
+    assert counters["shed_queue_full"] >= 1
+
+
 def test_instructor_endpoints(client: TestClient):
     courses = client.get("/api/instructor/courses", params={"instructor_id": "instructor-harv"})
     assert courses.status_code == 200
@@ -75,3 +201,128 @@ def test_instructor_endpoints(client: TestClient):
     override = client.post(f"/api/instructor/attendance/{event_id}/override", json=override_payload)
     assert override.status_code == 200
     assert override.json()["status"] == "present"
+
+
+def test_attendance_listing_matches_response_model(client: TestClient):
+    gps_payload = {
+        "student_id": "student-listing",
+        "course_id": 1,
+        "instructor_id": "instructor-harv",
+        "device_id": "ios-1",
+        "latitude": 0.0,
+        "longitude": 0.0,
+    }
+    event_id = client.post("/api/checkin/gps", json=gps_payload).json()["record_id"]
+    # The override endpoint still goes through response-model serialization.
+    override = client.post(
+        f"/api/instructor/attendance/{event_id}/override",
+        json={"status": "absent", "notes": "Not in room"},
+    )
+
+    listing = client.get("/api/instructor/attendance", params={"course_id": 1, "status": "absent"})
+
+    assert listing.status_code == 200
+    assert listing.json() == [override.json()]
+
+
+def test_attendance_listing_revalidates_with_etag(client: TestClient):
+    gps_payload = {
+        "student_id": "student-etag",
+        "course_id": 1,
+        "instructor_id": "instructor-harv",
+        "device_id": "ios-1",
+        "latitude": 0.0,
+        "longitude": 0.0,
+    }
+    event_ids = [
+        client.post("/api/checkin/gps", json=gps_payload).json()["record_id"] for _ in range(8)
+    ]
+    params = {"course_id": 1}
+
+    first = client.get("/api/instructor/attendance", params=params)
+    etag = first.headers["etag"]
+    assert first.headers["content-encoding"] == "gzip"
+
+    cached = client.get(
+        "/api/instructor/attendance", params=params, headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    client.post(
+        f"/api/instructor/attendance/{event_ids[0]}/override",
+        json={"status": "present", "notes": "Seen in lecture"},
+    )
+    changed = client.get(
+        "/api/instructor/attendance", params=params, headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_bulk_override_endpoint(client: TestClient):
+    gps_payload = {
+        "student_id": "student-bulk",
+        "course_id": 1,
+        "instructor_id": "instructor-harv",
+        "device_id": "ios-1",
+        "latitude": 0.0,
+        "longitude": 0.0,
+    }
+    event_ids = [
+        client.post("/api/checkin/gps", json=gps_payload).json()["record_id"] for _ in range(3)
+    ]
+    overrides = [
+        {"event_id": event_id, "status": "present", "notes": "Cleared from review queue"}
+        for event_id in event_ids
+    ]
+
+    response = client.post(
+        "/api/instructor/attendance/override/bulk", json={"overrides": overrides}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [row["id"] for row in body] == event_ids
+    assert all(row["status"] == "present" and not row["requires_manual_review"] for row in body)
+
+    missing = client.post(
+        "/api/instructor/attendance/override/bulk",
+        json={"overrides": [{"event_id": 10_000, "status": "absent", "notes": "Unknown id"}]},
+    )
+    assert missing.status_code == 404
+
+
+def test_startup_runs_all_phases(test_engine):
+    database.engine = test_engine
+    with TestClient(create_app()) as client:
+        response = client.get(
+            "/api/instructor/courses", params={"instructor_id": "instructor-harv"}
+        )
+    assert response.status_code == 200
+    assert {course["code"] for course in response.json()} >= {"CS50", "STAT110"}
+
+
+def test_course_fence_drives_gps_checkin(client: TestClient):
+    fence = {
+        "polygons": [[[10.0, 10.0], [10.0, 10.001], [10.001, 10.001], [10.001, 10.0]]],
+        "buffer_meters": 10,
+    }
+    response = client.put("/api/instructor/courses/3/fence", json=fence)
+    assert response.status_code == 200
+    assert response.json()["course_id"] == 3
+
+    payload = {
+        "student_id": "student-fence",
+        "course_id": 3,
+        "instructor_id": "instructor-harv",
+        "device_id": "ios",
+        "latitude": 10.0005,
+        "longitude": 10.0005,
+    }
+    assert client.post("/api/checkin/gps", json=payload).json()["status"] == "present"
+    # The campus-wide default box no longer applies to this course.
+    payload.update(latitude=42.3765, longitude=-71.1168)
+    assert client.post("/api/checkin/gps", json=payload).json()["status"] == "pending"
+
+    missing = client.put("/api/instructor/courses/9999/fence", json=fence)
+    assert missing.status_code == 404
@@ -0,0 +1,49 @@
+"""Admission tests cover both shedding modes and the retry hint."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from backend.app.services.admission import AdmissionController, Overloaded
+
+
+def test_full_queue_is_shed_with_429():
+    controller = AdmissionController(max_in_flight=1, max_queue=0, max_wait_s=1.0)
+
+    with controller.admit(), pytest.raises(Overloaded) as excinfo, controller.admit():
+        pass
+
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after >= 1
+    assert controller.snapshot()["shed_queue_full"] == 1
+
+
+def test_waiting_past_budget_is_shed_with_503():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, max_wait_s=0.05)
+    controller.service_s = 3.0
+    release = threading.Event()
+    holding = threading.Event()
+
+    def hold_slot():
+        with controller.admit():
+            holding.set()
+            release.wait(5)
+
+    worker = threading.Thread(target=hold_slot)
+    worker.start()
+    holding.wait(5)
+    try:
+        with pytest.raises(Overloaded) as excinfo, controller.admit():
+            pass
+    finally:
+        release.set()
+        worker.join()
+
+    assert excinfo.value.status_code == 503
+    # One caller ahead at ~3 s per inference on a single slot.
+    assert excinfo.value.retry_after == 3
+    snapshot = controller.snapshot()
+    assert snapshot["shed_wait_timeout"] == 1
+    assert snapshot["in_flight"] == 0
@@ -0,0 +1,117 @@
+"""Archive tests cover moving events to cold storage and federated reads."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from backend.app.models.attendance import AttendanceEvent, Course
+from backend.app.repositories.archive import AttendanceArchive, as_naive_utc, term_for
+from backend.app.repositories.attendance import AttendanceRepository
+
+
+def utc(year: int, month: int, day: int) -> datetime:
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+def get_repository(archive_root: Path) -> AttendanceRepository:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+    session.add(Course(id=1, code="CS50", name="CS50", instructor_id="instructor-harv"))
+    session.commit()
+    return AttendanceRepository(session, archive=AttendanceArchive(archive_root))
+
+
+def add_event(repo: AttendanceRepository, timestamp: datetime, status: str = "present"):
+    return repo.create_event(
+        student_id="student",
+        course_id=1,
+        instructor_id="instructor-harv",
+        verification_method="gps",
+        status=status,
+        timestamp=timestamp,
+    )
+
+
+def test_term_for_maps_months_to_seasons():
+    assert term_for(utc(2025, 2, 1)) == "2025-spring"
+    assert term_for(utc(2025, 7, 1)) == "2025-summer"
+    assert term_for(utc(2025, 10, 1)) == "2025-fall"
+
+
+def test_archive_moves_old_events_and_indexes_by_term(tmp_path: Path):
+    repo = get_repository(tmp_path)
+    add_event(repo, utc(2024, 10, 1))
+    add_event(repo, utc(2025, 2, 1))
+    add_event(repo, utc(2025, 9, 15))
+
+    moved = repo.archive_events(before=utc(2025, 6, 1))
+
+    assert moved == 2
+    hot = repo.session.exec(select(AttendanceEvent)).all()
+    assert [event.timestamp for event in hot] == [as_naive_utc(utc(2025, 9, 15))]
+    assert repo.archive is not None
+    index = repo.archive.load_index()
+    assert set(index["courses"]["1"]) == {"2024-fall", "2025-spring"}
+    assert (tmp_path / "course=1" / "2024-fall.jsonl.gz").exists()
+
+
+def test_list_events_federates_only_when_range_reaches_back(tmp_path: Path):
+    repo = get_repository(tmp_path)
+    add_event(repo, utc(2024, 10, 1), status="absent")
+    add_event(repo, utc(2025, 2, 1))
+    add_event(repo, utc(2025, 9, 15))
+    repo.archive_events(before=utc(2025, 6, 1))
+
+    assert len(repo.list_events(course_id=1)) == 1
+    assert len(repo.list_events(course_id=1, start=utc(2025, 1, 1))) == 2
+    assert len(repo.list_events(course_id=1, start=utc(2024, 1, 1))) == 3
+    absent = repo.list_events(course_id=1, start=utc(2024, 1, 1), status="absent")
+    assert [event.timestamp for event in absent] == [as_naive_utc(utc(2024, 10, 1))]
+
+
+def test_events_reusing_an_archived_id_are_all_listed(tmp_path: Path):
+    repo = get_repository(tmp_path)
+    first_id = add_event(repo, utc(2024, 10, 1)).id
+    repo.archive_events(before=utc(2025, 1, 1))
+    # The hot table is empty again, so SQLite hands out the same id.
+    assert add_event(repo, utc(2025, 2, 1)).id == first_id
+    repo.archive_events(before=utc(2025, 6, 1))
+
+    listed = repo.list_events(course_id=1, start=utc(2024, 1, 1))
+
+    assert sorted(event.timestamp for event in listed) == [
+        as_naive_utc(utc(2024, 10, 1)),
+        as_naive_utc(utc(2025, 2, 1)),
+    ]
+
+
+def test_partition_appended_twice_lists_each_event_once(tmp_path: Path):
+    repo = get_repository(tmp_path)
+    add_event(repo, utc(2024, 10, 1))
+    events = list(repo.session.exec(select(AttendanceEvent)))
+    assert repo.archive is not None
+    repo.archive.append(events, cutoff=utc(2025, 1, 1))
+    repo.archive_events(before=utc(2025, 1, 1))
+
+    assert len(list(repo.archive.iter_events(course_id=1))) == 1
+
+
+def test_list_event_rows_projects_columns_across_archive(tmp_path: Path):
+    repo = get_repository(tmp_path)
+    add_event(repo, utc(2024, 10, 1), status="absent")
+    add_event(repo, utc(2025, 9, 15))
+    repo.archive_events(before=utc(2025, 6, 1))
+
+    rows = repo.list_event_rows(
+        columns=("status", "timestamp"), course_id=1, start=utc(2024, 1, 1)
+    )
+
+    # Timestamps come back as naive UTC, from SQLite and the archive alike.
+    assert rows == [
+        ("absent", as_naive_utc(utc(2024, 10, 1))),
+        ("present", as_naive_utc(utc(2025, 9, 15))),
+    ]
@@ -0,0 +1,85 @@
+"""Event broker tests cover per-course fan-out and slow-consumer backpressure."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from backend.app.models.attendance import AttendanceEvent
+from backend.app.services.events import RESYNC_FRAME, EventBroker
+
+
+def make_event(event_id: int, course_id: int = 1) -> AttendanceEvent:
+    return AttendanceEvent(
+        id=event_id,
+        student_id="student",
+        course_id=course_id,
+        instructor_id="instructor-harv",
+        verification_method="gps",
+        status="present",
+        timestamp=datetime(2025, 9, 15, 10, 0, tzinfo=timezone.utc),
+    )
+
+
+def test_publish_reaches_only_the_course_subscribers():
+    async def scenario():
+        broker = EventBroker()
+        cs50, other = broker.subscribe(1), broker.subscribe(2)
+
+        assert broker.publish("created", make_event(7, course_id=1)) == 1
+        await asyncio.sleep(0)
+
+        frame = cs50.queue.get_nowait().decode()
+        assert other.queue.empty()
+        return frame
+
+    frame = asyncio.run(scenario())
+    lines = frame.strip().split("\n")
+    assert lines[:2] == ["id: 7", "event: created"]
+    payload = json.loads(lines[2].removeprefix("data: "))
+    assert payload["status"] == "present"
+    assert "latitude" not in payload
+
+
+def test_slow_subscriber_gets_resync_instead_of_blocking():
+    async def scenario():
+        broker = EventBroker(max_queue=2)
+        subscription = broker.subscribe(1)
+        for event_id in range(3):
+            broker.publish("created", make_event(event_id))
+        await asyncio.sleep(0)
+        return subscription
+
+    subscription = asyncio.run(scenario())
+    assert subscription.queue.get_nowait() == RESYNC_FRAME
+    assert subscription.queue.empty()
+    assert subscription.dropped == 2
+
+
+def test_stream_unsubscribes_when_closed():
+    async def scenario():
+        broker = EventBroker()
+        stream = broker.stream(1, heartbeat_s=0.01)
+        keepalive = await anext(stream)
+        subscribed = broker.subscriber_count(1)
+        await stream.aclose()
+        return broker, keepalive, subscribed
+
+    broker, keepalive, subscribed = asyncio.run(scenario())
+    assert keepalive.startswith(b":")
+    assert subscribed == 1
+    assert broker.subscriber_count(1) == 0
+
+
+def test_stream_that_is_never_iterated_does_not_subscribe():
+    async def scenario():
+        broker = EventBroker()
+        stream = broker.stream(1)
+        # The client disconnected before the response sent its first chunk.
+        await stream.aclose()
+        return broker
+
+    broker = asyncio.run(scenario())
+    assert broker.subscriber_count(1) == 0
+    assert broker.publish("created", make_event(7)) == 0
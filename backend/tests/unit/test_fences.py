@@ -0,0 +1,79 @@
+"""Fence index tests cover per-course lookup and reloads."""
+
+from __future__ import annotations
+
+import threading
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from backend.app.config.settings import LectureHallBounds
+from backend.app.models.attendance import Course, CourseFence
+from backend.app.repositories.attendance import AttendanceRepository
+from backend.app.services.fences import FenceIndex
+from backend.app.services.gps import GPSFence, box_polygon
+
+
+def get_repository() -> AttendanceRepository:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+    session.add(Course(id=1, code="CS50", name="CS50", instructor_id="instructor-harv"))
+    session.add(Course(id=2, code="AC215", name="AC215", instructor_id="instructor-ac215"))
+    session.commit()
+    return AttendanceRepository(session)
+
+
+def square(lat: float, lon: float, size: float = 0.0005) -> list:
+    bounds = LectureHallBounds(min_lat=lat, max_lat=lat + size, min_lon=lon, max_lon=lon + size)
+    return [list(vertex) for vertex in box_polygon(bounds)]
+
+
+def test_courses_use_their_own_fence_and_fall_back_to_default():
+    repo = get_repository()
+    default = GPSFence(LectureHallBounds(min_lat=0, max_lat=1, min_lon=0, max_lon=1))
+    index = FenceIndex(default=default)
+    repo.upsert_fence(1, polygons=[square(42.3770, -71.1170)])
+
+    assert index.refresh(repo) is True
+    assert index.fence_for(1).evaluate(42.3772, -71.1168).within_bounds is True
+    assert index.fence_for(1).evaluate(0.5, 0.5).within_bounds is False
+    assert index.fence_for(2) is default
+    assert index.courses_at(42.3772, -71.1168) == [1]
+    assert index.courses_at(42.3800, -71.1168) == []
+
+
+def test_refresh_is_throttled_until_invalidated():
+    repo = get_repository()
+    index = FenceIndex(default=GPSFence(LectureHallBounds()), refresh_interval_s=3600)
+    assert index.refresh(repo) is True
+    repo.upsert_fence(2, polygons=[square(42.3750, -71.1190)])
+
+    assert index.refresh(repo) is False
+    assert index.courses_at(42.3752, -71.1188) == []
+
+    index.invalidate()
+    assert index.refresh(repo) is True
+    assert index.courses_at(42.3752, -71.1188) == [2]
+
+
+def test_courses_at_never_mixes_generations_during_reloads():
+    index = FenceIndex(default=GPSFence(LectureHallBounds()))
+    generations = [
+        [CourseFence(course_id=1, polygons=[square(42.3770, -71.1170)], buffer_meters=40.0)],
+        [CourseFence(course_id=2, polygons=[square(42.3770, -71.1170)], buffer_meters=40.0)],
+    ]
+    done = threading.Event()
+
+    def reload() -> None:
+        for attempt in range(2000):
+            index.load(generations[attempt % 2])
+        done.set()
+
+    loader = threading.Thread(target=reload)
+    loader.start()
+    seen = set()
+    while not done.is_set():
+        seen.update(index.courses_at(42.3772, -71.1168))
+    loader.join()
+
+    assert seen <= {1, 2}
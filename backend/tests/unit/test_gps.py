@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import numpy as np
+
 from backend.app.config.settings import LectureHallBounds
-from backend.app.services.gps import GPSFence
+from backend.app.services.gps import INSIDE, NEAR, OUTSIDE, GPSFence
 
 
 def test_gps_inside_bounds():
@@ -31,3 +33,47 @@ def test_gps_outside_bounds():
     # Visual verification is always required when outside bounds
     assert result.requires_visual_verification is True
     assert "photo" in result.message.lower() or "verify" in result.message.lower()
+
+
+def test_gps_polygon_fence_excludes_notch():
+    # L-shaped hall: the top-right quadrant of the unit square is not part of it.
+    hall = [(0, 0), (0, 1), (0.5, 1), (0.5, 0.5), (1, 0.5), (1, 0)]
+    fence = GPSFence(polygons=[hall], buffer_meters=1)
+    assert fence.evaluate(0.25, 0.75).within_bounds is True
+    assert fence.evaluate(0.75, 0.25).within_bounds is True
+    assert fence.evaluate(0.75, 0.75).within_bounds is False
+    assert fence.contains(0.5, 0.75) is True  # edges are inclusive
+
+
+def test_gps_multi_box_fence():
+    hall = LectureHallBounds(min_lat=0, max_lat=1, min_lon=0, max_lon=1)
+    annex = LectureHallBounds(min_lat=2, max_lat=3, min_lon=0, max_lon=1)
+    fence = GPSFence.from_boxes([hall, annex], buffer_meters=1)
+    assert fence.evaluate(2.5, 0.5).within_bounds is True
+    assert fence.evaluate(1.5, 0.5).within_bounds is False
+    assert GPSFence.as_tuple(fence.bounds) == (0, 3, 0, 1)
+
+
+def test_evaluate_many_returns_codes_per_point():
+    bounds = LectureHallBounds(min_lat=0, max_lat=1, min_lon=0, max_lon=1)
+    fence = GPSFence(bounds, buffer_meters=20000)
+    result = fence.evaluate_many(np.array([0.5, 1.1, 5.0]), np.array([0.5, 0.5, 5.0]))
+    assert result.within_bounds.tolist() == [True, False, False]
+    assert result.within_buffer.tolist() == [True, True, False]
+    assert result.message_codes.tolist() == [INSIDE, NEAR, OUTSIDE]
+
+
+def test_evaluate_many_matches_scalar_evaluate():
+    hall = [(0, 0), (0, 1), (0.5, 1), (0.5, 0.5), (1, 0.5), (1, 0)]
+    fence = GPSFence(polygons=[hall], buffer_meters=5000)
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(-0.2, 1.2, size=(20, 25))
+    lons = rng.uniform(-0.2, 1.2, size=(20, 25))
+
+    result = fence.evaluate_many(lats, lons)
+
+    assert result.within_bounds.shape == (20, 25)
+    for index, (lat, lon) in enumerate(zip(lats.ravel(), lons.ravel(), strict=True)):
+        scalar = fence.evaluate(lat, lon)
+        assert scalar == result.result(index)
+        assert fence.contains(lat, lon) == scalar.within_bounds
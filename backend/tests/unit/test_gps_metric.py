@@ -0,0 +1,74 @@
+"""Fence distances and buffers checked against great-circle (haversine) meters."""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from backend.app.config.settings import LectureHallBounds
+from backend.app.services.gps import EARTH_RADIUS_M, METERS_PER_DEGREE, GPSFence
+
+# (latitude, longitude) of hall centres: equator, Harvard Yard, Sydney, Oslo.
+SITES = [(0.0, 0.0), (42.3765, -71.1167), (-33.8688, 151.2093), (59.9139, 10.7522)]
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def hall_at(lat: float, lon: float, half_side_m: float = 50.0) -> LectureHallBounds:
+    d_lat = half_side_m / METERS_PER_DEGREE
+    d_lon = half_side_m / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+    return LectureHallBounds(
+        min_lat=lat - d_lat, max_lat=lat + d_lat, min_lon=lon - d_lon, max_lon=lon + d_lon
+    )
+
+
+def offset(lat: float, lon: float, north_m: float, east_m: float) -> tuple[float, float]:
+    """Move a point by a metric offset along the great circle (small distances)."""
+    d_lat = north_m / METERS_PER_DEGREE
+    d_lon = east_m / (METERS_PER_DEGREE * math.cos(math.radians(lat + d_lat / 2)))
+    return lat + d_lat, lon + d_lon
+
+
+@pytest.mark.parametrize(("lat", "lon"), SITES)
+def test_distance_matches_haversine_within_campus_range(lat, lon):
+    fence = GPSFence(hall_at(lat, lon))
+    rng = np.random.default_rng(7)
+    for north_m, east_m in rng.uniform(-1000, 1000, size=(50, 2)):
+        other = offset(lat, lon, north_m, east_m)
+        expected = haversine_m(lat, lon, *other)
+        assert fence.distance(lat, lon, *other) == pytest.approx(expected, rel=2e-3, abs=0.05)
+
+
+@pytest.mark.parametrize(("lat", "lon"), SITES)
+def test_buffer_is_measured_in_meters_on_every_side(lat, lon):
+    bounds = hall_at(lat, lon)
+    fence = GPSFence(bounds, buffer_meters=40)
+    east_edge = (lat, bounds.max_lon)
+    north_edge = (bounds.max_lat, lon)
+
+    for edge_lat, edge_lon, north, east in [(*east_edge, 0, 1), (*north_edge, 1, 0)]:
+        inner = offset(edge_lat, edge_lon, 38 * north, 38 * east)
+        outer = offset(edge_lat, edge_lon, 42 * north, 42 * east)
+        assert haversine_m(edge_lat, edge_lon, *inner) == pytest.approx(38, abs=0.1)
+
+        result = fence.evaluate_many([inner[0], outer[0]], [inner[1], outer[1]])
+        assert result.within_bounds.tolist() == [False, False]
+        assert result.within_buffer.tolist() == [True, False]
+
+
+def test_longitude_buffer_is_not_latitude_sized_at_harvard():
+    # 40 m east of the hall is ~0.000487 degrees of longitude here; the old fixed
+    # 0.00001 deg/m factor would have allowed only 0.0004 degrees.
+    bounds = hall_at(42.3765, -71.1167)
+    fence = GPSFence(bounds, buffer_meters=40)
+    lat, lon = offset(42.3765, bounds.max_lon, 0, 39)
+    assert lon - bounds.max_lon > 0.0004
+    assert fence.evaluate_many([lat], [lon]).within_buffer[0]
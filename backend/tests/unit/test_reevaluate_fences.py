@@ -0,0 +1,68 @@
+"""Re-evaluation job tests: dry-run diffs, batched writes, and override safety."""
+
+from __future__ import annotations
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from backend.app.config.settings import LectureHallBounds
+from backend.app.jobs.reevaluate_fences import reevaluate_course
+from backend.app.models.attendance import AttendanceEvent, Course
+from backend.app.repositories.attendance import AttendanceRepository
+from backend.app.services.gps import GPSFence
+
+OLD_HALL = LectureHallBounds(min_lat=42.3740, max_lat=42.3750, min_lon=-71.1200, max_lon=-71.1190)
+NEW_HALL = LectureHallBounds(min_lat=42.3760, max_lat=42.3770, min_lon=-71.1200, max_lon=-71.1190)
+
+
+def get_repository() -> AttendanceRepository:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+    session.add(Course(id=1, code="CS50", name="CS50", instructor_id="instructor-harv"))
+    session.commit()
+    return AttendanceRepository(session)
+
+
+def record_gps(repo: AttendanceRepository, fence: GPSFence, lat: float, lon: float):
+    result = fence.evaluate(lat, lon)
+    return repo.create_event(
+        student_id="student",
+        course_id=1,
+        instructor_id="instructor-harv",
+        verification_method="gps",
+        status="present" if result.within_bounds else "pending",
+        latitude=lat,
+        longitude=lon,
+        requires_manual_review=result.requires_visual_verification,
+        notes=result.message,
+    )
+
+
+def test_reevaluation_dry_run_then_apply():
+    repo = get_repository()
+    old_fence = GPSFence(OLD_HALL)
+    in_new_hall = [record_gps(repo, old_fence, 42.3765, -71.1195).id for _ in range(3)]
+    in_old_hall = record_gps(repo, old_fence, 42.3745, -71.1195).id
+    overridden = record_gps(repo, old_fence, 42.3765, -71.1195).id
+    repo.override_event(overridden, status="absent", notes="Left early")
+
+    new_fence = GPSFence(NEW_HALL)
+    dry = reevaluate_course(repo, new_fence, 1, chunk_size=2, dry_run=True)
+    assert dry.scanned == 5
+    assert dry.changed == 4
+    assert dry.skipped_overrides == 1
+    assert dry.transitions == {"pending->present": 3, "present->pending": 1}
+    assert {sample["id"] for sample in dry.samples} == {*in_new_hall, in_old_hall}
+    assert len(repo.list_events(course_id=1, status="pending")) == 3
+
+    applied = reevaluate_course(repo, new_fence, 1, chunk_size=2)
+    assert applied.changed == 4
+    repo.session.expire_all()
+    events = {event.id: event for event in repo.session.exec(select(AttendanceEvent))}
+    assert all(events[event_id].status == "present" for event_id in in_new_hall)
+    assert all(not events[event_id].requires_manual_review for event_id in in_new_hall)
+    assert events[in_old_hall].status == "pending"
+    assert events[overridden].status == "absent"
+    assert events[overridden].notes == "Left early"
+
+    assert reevaluate_course(repo, new_fence, 1).changed == 0
@@ -4,10 +4,11 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
+import pytest
 from sqlmodel import Session, SQLModel, create_engine, select
 
 from backend.app.models.attendance import Course
-from backend.app.repositories.attendance import AttendanceRepository
+from backend.app.repositories.attendance import AttendanceRepository, persisted_id
 
 
 def get_session():
@@ -57,3 +58,53 @@ def test_ensure_seed_courses_upserts_missing_entries():
     mapping = {course.code: course for course in courses}
     assert mapping["CS50"].name == "CS50 - Intro to CS"
     assert mapping["DEMO001"].instructor_id == "instructor-harv"
+
+
+def test_override_events_updates_each_status_group():
+    session = get_session()
+    repo = AttendanceRepository(session)
+    ids = [
+        persisted_id(
+            repo.create_event(
+                student_id=f"student-{idx}",
+                course_id=1,
+                instructor_id="instructor-harv",
+                verification_method="vision",
+                status="rejected",
+                requires_manual_review=True,
+            )
+        )
+        for idx in range(4)
+    ]
+
+    updated = repo.override_events(
+        [
+            (ids[0], "present", "Seen in lecture"),
+            (ids[1], "present", "Seen in lecture"),
+            (ids[2], "absent", "Not in room"),
+        ]
+    )
+
+    assert [event.id for event in updated] == ids[:3]
+    assert [event.status for event in updated] == ["present", "present", "absent"]
+    assert all(not event.requires_manual_review for event in updated)
+    untouched = repo.list_events(course_id=1, status="rejected")
+    assert [event.id for event in untouched] == [ids[3]]
+
+
+def test_override_events_is_all_or_nothing():
+    session = get_session()
+    repo = AttendanceRepository(session)
+    event = repo.create_event(
+        student_id="student",
+        course_id=1,
+        instructor_id="instructor-harv",
+        verification_method="vision",
+        status="rejected",
+    )
+
+    with pytest.raises(ValueError, match="999"):
+        repo.override_events([(persisted_id(event), "present", "ok"), (999, "present", "ok")])
+
+    session.refresh(event)
+    assert event.status == "rejected"
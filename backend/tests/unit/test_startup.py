@@ -0,0 +1,104 @@
+"""Startup tests cover schema version skipping and phase timing."""
+
+from __future__ import annotations
+
+import json
+import logging
+from urllib.error import URLError
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlmodel import create_engine
+
+from backend.app import database, startup
+from backend.app.services.vision import VisionService
+from backend.app.startup import timed_phase
+from backend.ml.model_loader import VisionModel
+
+
+def test_init_db_skips_when_schema_version_matches(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+
+    assert database.init_db() is True
+    assert database.init_db() is False
+
+
+def test_init_db_upgrades_tables_created_by_older_models(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE attendanceevent (id INTEGER PRIMARY KEY, student_id VARCHAR, "
+                "course_id INTEGER, instructor_id VARCHAR, timestamp DATETIME, "
+                "latitude FLOAT, longitude FLOAT, verification_method VARCHAR, status VARCHAR, "
+                "confidence FLOAT, requires_manual_review BOOLEAN, notes VARCHAR)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO attendanceevent (id, student_id, course_id, instructor_id, "
+                "timestamp, verification_method, status, requires_manual_review) "
+                "VALUES (1, 's', 1, 'i', '2025-09-15 10:00:00.000000', 'gps', 'present', 0)"
+            )
+        )
+
+    assert database.init_db() is True
+
+    inspector = inspect(engine)
+    assert "updated_at" in {column["name"] for column in inspector.get_columns("attendanceevent")}
+    indexed = {tuple(index["column_names"]) for index in inspector.get_indexes("attendanceevent")}
+    assert {("course_id",), ("timestamp",)} <= indexed
+    with engine.connect() as connection:
+        updated_at = connection.execute(text("SELECT updated_at FROM attendanceevent")).scalar()
+    assert updated_at == "2025-09-15 10:00:00.000000"
+    with engine.begin() as connection:
+        assert database.upgrade_existing_tables(connection) == []
+    assert database.init_db() is False
+
+
+def test_timed_phase_logs_structured_record(caplog):
+    with caplog.at_level(logging.INFO, logger="backend.app.startup"):
+        record = timed_phase("demo", lambda: {"rows": 3})
+
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged == record
+    assert logged["phase"] == "demo"
+    assert logged["rows"] == 3
+    assert logged["duration_ms"] >= 0
+
+
+def test_timed_phase_logs_failures(caplog):
+    def boom() -> None:
+        raise RuntimeError("schema locked")
+
+    with caplog.at_level(logging.INFO, logger="backend.app.startup"), pytest.raises(RuntimeError):
+        timed_phase("schema", boom)
+
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged["status"] == "error"
+    assert logged["error"] == "schema locked"
+
+
+def test_model_warmup_failure_does_not_abort_startup(monkeypatch, caplog):
+    class UnreachableWeights(VisionModel):
+        def __init__(self) -> None:
+            pass
+
+        def warmup(self) -> bool:
+            raise URLError("weights download failed")
+
+    monkeypatch.setattr(startup, "_prepare_database", lambda: None)
+    monkeypatch.setattr(startup, "log_model_version", lambda: {"model_name": "mobilenet"})
+
+    with caplog.at_level(logging.INFO, logger="backend.app.startup"):
+        startup.run_startup(VisionService(model=UnreachableWeights()))
+
+    records = [
+        json.loads(record.getMessage())
+        for record in caplog.records
+        if record.getMessage().startswith("{")
+    ]
+    phases = {record["phase"]: record["status"] for record in records}
+    assert phases == {"model_metadata": "ok", "model_warmup": "error", "total": "ok"}
@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import base64
+import json
+import os
 from pathlib import Path
 
 from backend.app.services.vision import VisionService
-from backend.ml.model_loader import VisionModel
+from backend.ml.model_loader import VisionModel, get_model_info
 
 
 def test_vision_model_scoring(tmp_path: Path):
@@ -27,3 +29,18 @@ def test_vision_service_returns_result(tmp_path: Path):
     payload = base64.b64encode(b"another-image").decode("utf-8")
     result = service.evaluate(payload)
     assert 0 <= result.confidence <= 1
+
+
+def test_model_info_is_cached_until_metadata_changes(tmp_path: Path):
+    metadata = tmp_path / "metadata.json"
+    metadata.write_text(json.dumps({"model_name": "v1"}), encoding="utf-8")
+    assert get_model_info(tmp_path)["model_name"] == "v1"
+
+    # Same mtime: the cached parse is served even though the content changed.
+    stat = metadata.stat()
+    metadata.write_text(json.dumps({"model_name": "v2"}), encoding="utf-8")
+    os.utime(metadata, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert get_model_info(tmp_path)["model_name"] == "v1"
+
+    os.utime(metadata, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert get_model_info(tmp_path)["model_name"] == "v2"
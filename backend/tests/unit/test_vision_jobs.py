@@ -0,0 +1,72 @@
+"""Vision job tests cover retries and crash recovery of the local queue."""
+
+from __future__ import annotations
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from backend.app import database
+from backend.app.models.attendance import AttendanceEvent, Course
+from backend.app.models.jobs import JOB_FAILED, JOB_QUEUED, JOB_RUNNING, VisionJob
+from backend.app.repositories.jobs import VisionJobRepository
+from backend.app.services.vision import VisionResult, VisionService
+from backend.app.services.vision_jobs import FAILED_NOTE, VisionWorkerPool
+
+
+class BrokenVision(VisionService):
+    def __init__(self) -> None:
+        pass
+
+    def evaluate_bytes(self, image_bytes: bytes) -> VisionResult:
+        raise OSError("cannot identify image file")
+
+
+@pytest.fixture(name="engine")
+def fixture_engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(database, "engine", engine)
+    with Session(engine) as session:
+        session.add(Course(id=1, code="CS50", name="CS50", instructor_id="instructor-harv"))
+        session.add(
+            AttendanceEvent(
+                id=1,
+                student_id="student",
+                course_id=1,
+                instructor_id="instructor-harv",
+                verification_method="vision",
+            )
+        )
+        session.commit()
+    return engine
+
+
+def test_failing_job_is_retried_then_flagged_for_review(engine, tmp_path):
+    pool = VisionWorkerPool(BrokenVision(), image_dir=tmp_path / "spool", max_attempts=2)
+    with Session(engine) as session:
+        VisionJobRepository(session).enqueue(1, pool.spool(b"not-an-image"))
+
+    assert pool.run_once() is True
+    with Session(engine) as session:
+        job = session.get_one(VisionJob, 1)
+        assert (job.status, job.attempts) == (JOB_QUEUED, 1)
+
+    assert pool.run_once() is True
+    with Session(engine) as session:
+        assert session.get_one(VisionJob, 1).status == JOB_FAILED
+        event = session.get_one(AttendanceEvent, 1)
+        assert event.requires_manual_review
+        assert event.notes == FAILED_NOTE
+
+
+def test_start_requeues_jobs_interrupted_mid_run(engine, tmp_path):
+    with Session(engine) as session:
+        session.add(VisionJob(event_id=1, image_path="lost.img", status=JOB_RUNNING))
+        session.commit()
+
+    pool = VisionWorkerPool(BrokenVision(), image_dir=tmp_path, workers=0)
+    pool.start()
+    pool.stop()
+
+    with Session(engine) as session:
+        assert session.get_one(VisionJob, 1).status == JOB_QUEUED
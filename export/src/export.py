@@ -1,27 +1,254 @@
-import json, yaml, torch
-from torchvision import models
+import io, json, os, statistics, time, yaml, torch
+import numpy as np
+from PIL import Image
+from torch import nn
+from torch.nn import functional as F
+from torchvision import models, transforms
+from datetime import datetime, timezone
 from pathlib import Path
 
-with open("/app/params.yaml") as f:
-    P = yaml.safe_load(f)
-
-if P["model_name"] == "mobilenet_v3_small":
-    model = models.mobilenet_v3_small(weights=None)
-    in_feats = model.classifier[3].in_features
-    model.classifier[3] = torch.nn.Linear(in_feats, 2)
-else:
-    model = models.efficientnet_b0(weights=None)
-    in_feats = model.classifier[1].in_features
-    model.classifier[1] = torch.nn.Linear(in_feats, 2)
-
-model.load_state_dict(torch.load("/app/artifacts/checkpoints/best.pt", map_location="cpu"))
-model.eval()
-
-dummy = torch.randn(1,3,P["img_size"],P["img_size"])
-ts = torch.jit.trace(model, dummy)
-out_dir = Path("/app/artifacts/model"); out_dir.mkdir(parents=True, exist_ok=True)
-ts.save(str(out_dir/"model.torchscript.pt"))
-
-with open(out_dir/"metadata.json","w") as f:
-    json.dump({"img_size":P["img_size"],"model":P["model_name"],"classes":P["classes"]}, f, indent=2)
-print("[export] model exported to TorchScript")
+try:
+    with open("/app/params.yaml") as f:
+        P = yaml.safe_load(f) or {}
+except FileNotFoundError:
+    # Only main() needs the pipeline parameters; the checks below import without them.
+    P = {}
+
+# Must match the Normalize in train/src/train.py and evaluate/src/evaluate.py.
+IMAGENET_MEAN = [0.485, 0.456, 0.406]
+IMAGENET_STD = [0.229, 0.224, 0.225]
+# What serve passes in: cv2.imdecode output viewed with torch.from_numpy.
+INPUT_FORMAT = "uint8_bgr_hwc"
+VAL_DIR = Path("/app/data/processed/val")
+# serve/src/registry.py reads MODEL_ROOT/<version>/ and follows MODEL_ROOT/ACTIVE.
+MODEL_ROOT = Path(os.getenv("MODEL_ROOT", "/app/artifacts/models"))
+MODEL_FILE = "model.torchscript.pt"
+BACKBONE_FILE = "backbone.torchscript.pt"
+POINTER_FILE = "ACTIVE"
+# False leaves the running version active until /admin/models/activate promotes the new one.
+PROMOTE = bool(P.get("export_promote", True))
+PARITY_IMAGES = 8
+PARITY_ATOL = float(P.get("export_parity_atol", 0.02))
+# Without validation images the parity check cannot run; that fails the export unless
+# explicitly allowed (e.g. a smoke run on synthetic data).
+PARITY_REQUIRED = bool(P.get("export_parity_required", True))
+# "optimized" saves the frozen graph and has the loader run optimize_for_inference (which
+# folds BatchNorm into the preceding convolutions); "plain" saves the scripted module as is.
+# The optimized graph itself cannot be saved: its MKLDNN constants do not reload.
+EXPORT_MODE = P.get("export_mode", "optimized")
+BATCH_SIZES = [int(n) for n in P.get("export_batch_sizes", [1, 4, 16])]
+EAGER_ATOL = float(P.get("export_eager_atol", 1e-3))
+if EXPORT_MODE not in ("optimized", "plain"):
+    raise SystemExit(f"[export] unknown export_mode {EXPORT_MODE!r}; use 'optimized' or 'plain'")
+
+
+class ServingModel(nn.Module):
+    """Runs the training-time validation transform inside the graph.
+
+    Input is uint8 BGR of any height and width, (H, W, 3) or (N, H, W, 3), exactly as
+    cv2 decodes it. The graph resizes to img_size, reorders to RGB, scales and applies
+    the ImageNet normalization, so serve needs no Python-side preprocessing.
+    """
+
+    def __init__(self, net: nn.Module, img_size: int):
+        super().__init__()
+        self.net = net
+        self.img_size = img_size
+        self.register_buffer("mean", torch.tensor(IMAGENET_MEAN).view(1, 3, 1, 1))
+        self.register_buffer("std", torch.tensor(IMAGENET_STD).view(1, 3, 1, 1))
+
+    def forward(self, images: torch.Tensor) -> torch.Tensor:
+        if images.dim() == 3:
+            images = images.unsqueeze(0)
+        x = images.permute(0, 3, 1, 2).flip(1).float()
+        x = F.interpolate(
+            x, size=[self.img_size, self.img_size], mode="bilinear", align_corners=False, antialias=True
+        )
+        # PIL resizes in uint8 before ToTensor; round the same way.
+        x = x.round().clamp(0.0, 255.0) / 255.0
+        return self.net((x - self.mean) / self.std)
+
+
+def check_preprocessing_parity(serving, net, img_size):
+    """Compare serving-model probabilities on raw BGR images with the eager model fed
+    the validation transform from train.py. Raises if they drift apart."""
+    val_tf = transforms.Compose([
+        transforms.Resize((img_size, img_size)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD),
+    ])
+    paths = sorted(p for p in VAL_DIR.glob("*/*") if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+    paths = paths[:PARITY_IMAGES]
+    if not paths:
+        if PARITY_REQUIRED:
+            raise SystemExit(
+                f"[export] no validation images under {VAL_DIR}; preprocessing parity cannot be checked "
+                "(set export_parity_required: false to export anyway)"
+            )
+        print(f"[export] WARNING: no validation images under {VAL_DIR}; preprocessing parity NOT checked")
+        return {"checked": 0, "skipped": "no_validation_images"}
+
+    max_diff, disagreements = 0.0, 0
+    with torch.no_grad():
+        for path in paths:
+            rgb = Image.open(path).convert("RGB")
+            expected = torch.softmax(net(val_tf(rgb).unsqueeze(0)), dim=1)
+            bgr = np.ascontiguousarray(np.asarray(rgb)[:, :, ::-1])
+            actual = torch.softmax(serving(torch.from_numpy(bgr)), dim=1)
+            max_diff = max(max_diff, float((expected - actual).abs().max()))
+            disagreements += int(expected.argmax(dim=1).item() != actual.argmax(dim=1).item())
+
+    report = {"checked": len(paths), "max_prob_diff": round(max_diff, 6), "label_mismatches": disagreements}
+    print(f"[export] preprocessing parity: {report}")
+    if max_diff > PARITY_ATOL or disagreements:
+        raise SystemExit(f"[export] serving preprocessing diverges from training transform: {report}")
+    return report
+
+
+def export_graph(net, img_size):
+    """Trace net, wrap it with in-graph preprocessing and freeze it in optimized mode.
+    This is the module that gets saved."""
+    dummy = torch.randn(1,3,img_size,img_size)
+    traced = torch.jit.trace(net, dummy)
+    # Scripted rather than traced so the rank check and any-size resize stay dynamic.
+    scripted = torch.jit.script(ServingModel(traced, img_size).eval())
+    return torch.jit.freeze(scripted) if EXPORT_MODE == "optimized" else scripted
+
+
+def reload(exported):
+    """Save and load a module, then optimize it as serve/src/registry.py does on load.
+    The checks run on this, so they cover exactly what serve will execute."""
+    buffer = io.BytesIO()
+    torch.jit.save(exported, buffer)
+    buffer.seek(0)
+    loaded = torch.jit.load(buffer, map_location="cpu")
+    loaded.eval()
+    return torch.jit.optimize_for_inference(loaded) if EXPORT_MODE == "optimized" else loaded
+
+
+def check_batches(exported, eager, img_size):
+    """Run the exported and eager serving models on random images at each batch size.
+    Raises if shapes or logits disagree, so a graph specialized to batch 1 never ships."""
+    # Non-square and larger than img_size, like real phone photos.
+    height, width = img_size * 2, img_size * 3 // 2
+    max_diff = 0.0
+    with torch.no_grad():
+        for n in BATCH_SIZES:
+            images = torch.randint(0, 256, (n, height, width, 3), dtype=torch.uint8)
+            expected, actual = eager(images), exported(images)
+            if actual.shape != expected.shape:
+                raise SystemExit(f"[export] batch {n}: got shape {tuple(actual.shape)}, expected {tuple(expected.shape)}")
+            max_diff = max(max_diff, float((expected - actual).abs().max()))
+    report = {"batch_sizes": BATCH_SIZES, "max_logit_diff": round(max_diff, 6)}
+    print(f"[export] eager parity: {report}")
+    if max_diff > EAGER_ATOL:
+        raise SystemExit(f"[export] exported graph diverges from eager model: {report}")
+    return report
+
+
+def version_name(model_name, now=None):
+    """EXPORT_VERSION, else a UTC timestamp plus the architecture. Timestamps sort by
+    name, so serve's "last version by name" default is the newest export."""
+    now = now or datetime.now(tz=timezone.utc)
+    return os.getenv("EXPORT_VERSION") or f"{now:%Y%m%dT%H%M%SZ}-{model_name}"
+
+
+def write_version(root, version, modules, meta):
+    """Save modules (file name -> TorchScript module) and metadata.json as a registry
+    version. They are staged in a hidden directory and renamed into place, so serve
+    never sees a version whose files are still being written."""
+    path = root / version
+    if path.exists():
+        raise SystemExit(f"[export] model version {version} already exists under {root}")
+    staging = root / f".{version}.partial"
+    staging.mkdir(parents=True)
+    for name, module in modules.items():
+        module.save(str(staging / name))
+    (staging / "metadata.json").write_text(json.dumps(meta, indent=2))
+    staging.rename(path)
+    return path
+
+
+def promote(root, version):
+    """Point ACTIVE at version; running serve workers switch within MODEL_POINTER_POLL_S."""
+    tmp = root / f".{POINTER_FILE}.tmp"
+    tmp.write_text(version + "\n")
+    os.replace(tmp, root / POINTER_FILE)
+
+
+def median_latency_ms(module, img_size, runs=20):
+    image = torch.randint(0, 256, (img_size, img_size, 3), dtype=torch.uint8)
+    timings = []
+    with torch.no_grad():
+        for _ in range(3):  # let the profiling executor specialize first
+            module(image)
+        for _ in range(runs):
+            started = time.perf_counter()
+            module(image)
+            timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def main():
+    if P["model_name"] == "mobilenet_v3_small":
+        model = models.mobilenet_v3_small(weights=None)
+        in_feats = model.classifier[3].in_features
+        model.classifier[3] = torch.nn.Linear(in_feats, 2)
+    else:
+        model = models.efficientnet_b0(weights=None)
+        in_feats = model.classifier[1].in_features
+        model.classifier[1] = torch.nn.Linear(in_feats, 2)
+
+    model.load_state_dict(torch.load("/app/artifacts/checkpoints/best.pt", map_location="cpu"))
+    model.eval()
+
+    ts = export_graph(model, P["img_size"])
+    eager = ServingModel(model, P["img_size"]).eval()
+    # Checked and timed after a save/load round trip, as serve will run it.
+    served = reload(ts)
+    batches = check_batches(served, eager, P["img_size"])
+
+    # Pooled features without the classifier, so serve can match a photo against per-class
+    # room embeddings with one backbone pass and a dot product.
+    backbone = nn.Sequential(model.features, model.avgpool, nn.Flatten(1)).eval()
+    backbone_ts = export_graph(backbone, P["img_size"])
+    backbone_batches = check_batches(reload(backbone_ts), ServingModel(backbone, P["img_size"]).eval(), P["img_size"])
+    with torch.no_grad():
+        embedding_dim = int(backbone(torch.zeros(1, 3, P["img_size"], P["img_size"])).shape[1])
+    parity = check_preprocessing_parity(served, model, P["img_size"])
+    latency = {
+        "eager_ms": median_latency_ms(eager, P["img_size"]),
+        "exported_ms": median_latency_ms(served, P["img_size"]),
+    }
+    print(f"[export] batch-1 latency: {latency}")
+    version = version_name(P["model_name"])
+    meta = {
+        "version": version,
+        "img_size": P["img_size"],
+        "model": P["model_name"],
+        "classes": P["classes"],
+        "input": INPUT_FORMAT,
+        "preprocessing": {"resize": "bilinear_antialias", "mean": IMAGENET_MEAN, "std": IMAGENET_STD},
+        "parity": parity,
+        "backbone": {"file": BACKBONE_FILE, "embedding_dim": embedding_dim, "eager_parity": backbone_batches},
+        "export": {
+            "mode": EXPORT_MODE,
+            "frozen": EXPORT_MODE == "optimized",
+            # Applied by the loader, not stored in the file.
+            "optimize_for_inference": EXPORT_MODE == "optimized",
+            "torch": torch.__version__,
+            "eager_parity": batches,
+            "latency": latency,
+        },
+    }
+    path = write_version(MODEL_ROOT, version, {MODEL_FILE: ts, BACKBONE_FILE: backbone_ts}, meta)
+    print(f"[export] model exported to TorchScript as version {version} in {path}")
+    if PROMOTE:
+        promote(MODEL_ROOT, version)
+        print(f"[export] {MODEL_ROOT / POINTER_FILE} now names {version}")
+    else:
+        print(f"[export] export_promote is off; activate {version} with POST /admin/models/activate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Export tests run the batch and preprocessing checks on a saved and reloaded graph,
+and cover how exports are published as registry versions."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("torchvision")
+
+import numpy as np  # noqa: E402
+import torch  # noqa: E402
+from PIL import Image  # noqa: E402
+from torch import nn  # noqa: E402
+
+from export.src import export  # noqa: E402
+
+IMG_SIZE = 32
+
+
+def tiny_net() -> nn.Module:
+    """Conv + BatchNorm, so optimize_for_inference has something to fold."""
+    torch.manual_seed(0)
+    net = nn.Sequential(
+        nn.Conv2d(3, 8, 3, padding=1),
+        nn.BatchNorm2d(8),
+        nn.ReLU(),
+        nn.AdaptiveAvgPool2d(1),
+        nn.Flatten(1),
+        nn.Linear(8, 2),
+    )
+    net[1].running_mean.uniform_(-0.5, 0.5)
+    net[1].running_var.uniform_(0.5, 2.0)
+    return net.eval()
+
+
+@pytest.mark.parametrize("mode", ["optimized", "plain"])
+def test_reloaded_export_matches_eager_at_every_batch_size(monkeypatch, mode):
+    monkeypatch.setattr(export, "EXPORT_MODE", mode)
+    net = tiny_net()
+
+    served = export.reload(export.export_graph(net, IMG_SIZE))
+    report = export.check_batches(served, export.ServingModel(net, IMG_SIZE).eval(), IMG_SIZE)
+
+    assert report["batch_sizes"] == export.BATCH_SIZES
+    assert report["max_logit_diff"] <= export.EAGER_ATOL
+
+
+@pytest.fixture(name="val_dir")
+def fixture_val_dir(monkeypatch, tmp_path):
+    rng = np.random.default_rng(0)
+    (tmp_path / "Room1").mkdir()
+    for i in range(3):
+        # Smooth gradients, so the two resize implementations agree closely.
+        ramp = np.linspace(0, 255, 48 * 64, dtype=np.float64).reshape(48, 64)
+        rgb = np.stack([ramp, ramp[::-1], np.full_like(ramp, rng.integers(256))], axis=2)
+        Image.fromarray(rgb.astype(np.uint8)).save(tmp_path / "Room1" / f"{i}.png")
+    monkeypatch.setattr(export, "VAL_DIR", tmp_path)
+    return tmp_path
+
+
+def test_reloaded_export_matches_training_preprocessing(val_dir):
+    net = tiny_net()
+
+    served = export.reload(export.export_graph(net, IMG_SIZE))
+    report = export.check_preprocessing_parity(served, net, IMG_SIZE)
+
+    assert report["checked"] == 3
+    assert report["label_mismatches"] == 0
+
+
+def test_preprocessing_drift_fails_the_export(val_dir):
+    net = tiny_net()
+    unnormalized = export.ServingModel(net, IMG_SIZE).eval()
+    unnormalized.mean.zero_()
+    unnormalized.std.fill_(1.0)
+
+    with pytest.raises(SystemExit, match="diverges from training transform"):
+        export.check_preprocessing_parity(unnormalized, net, IMG_SIZE)
+
+
+def test_missing_validation_images_fail_the_export_unless_allowed(monkeypatch, tmp_path):
+    monkeypatch.setattr(export, "VAL_DIR", tmp_path)
+    net = tiny_net()
+    serving = export.ServingModel(net, IMG_SIZE).eval()
+
+    with pytest.raises(SystemExit, match="no validation images"):
+        export.check_preprocessing_parity(serving, net, IMG_SIZE)
+
+    monkeypatch.setattr(export, "PARITY_REQUIRED", False)
+    report = export.check_preprocessing_parity(serving, net, IMG_SIZE)
+    assert report == {"checked": 0, "skipped": "no_validation_images"}
+
+
+def test_batch_drift_from_eager_fails_the_export():
+    exported = export.ServingModel(tiny_net(), IMG_SIZE).eval()
+    other = nn.Sequential(*tiny_net()[:-1], nn.Linear(8, 2)).eval()
+
+    with pytest.raises(SystemExit, match="diverges from eager model"):
+        export.check_batches(exported, export.ServingModel(other, IMG_SIZE).eval(), IMG_SIZE)
+
+
+def test_export_is_published_as_a_registry_version_and_promoted(tmp_path):
+    net = tiny_net()
+    modules = {export.MODEL_FILE: export.export_graph(net, IMG_SIZE)}
+
+    path = export.write_version(tmp_path, "v2", modules, {"version": "v2", "img_size": IMG_SIZE})
+    export.promote(tmp_path, "v2")
+
+    assert path == tmp_path / "v2"
+    assert json.loads((path / "metadata.json").read_text())["version"] == "v2"
+    assert torch.jit.load(str(path / export.MODEL_FILE)) is not None
+    assert (tmp_path / export.POINTER_FILE).read_text().strip() == "v2"
+    # Nothing staged is left behind for serve to trip over.
+    assert sorted(p.name for p in tmp_path.iterdir()) == [export.POINTER_FILE, "v2"]
+
+
+def test_an_existing_version_is_never_overwritten(tmp_path):
+    (tmp_path / "v1").mkdir()
+
+    with pytest.raises(SystemExit, match="already exists"):
+        export.write_version(tmp_path, "v1", {}, {})
+
+
+def test_version_names_sort_by_export_time(monkeypatch):
+    monkeypatch.delenv("EXPORT_VERSION", raising=False)
+    earlier = datetime(2026, 9, 30, 23, 59, tzinfo=timezone.utc)
+
+    names = [
+        export.version_name("mobilenet_v3_small", earlier + timedelta(minutes=m)) for m in (0, 1)
+    ]
+
+    assert names == ["20260930T235900Z-mobilenet_v3_small", "20261001T000000Z-mobilenet_v3_small"]
+    monkeypatch.setenv("EXPORT_VERSION", "release-7")
+    assert export.version_name("mobilenet_v3_small") == "release-7"
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark the instructor attendance listing: ORM + response-model path vs column projection.
+
+The ORM path mirrors what FastAPI did for ``response_model=list[AttendanceEventResponse]``:
+load entities, build response models, dump them, re-validate and serialize with ``json``.
+The projected path is what ``list_attendance`` does now.
+
+Usage:
+    python scripts/benchmark_attendance_listing.py [--rows 10000 100000]
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlmodel import Session, SQLModel, create_engine
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from backend.app.api.routes.instructor import _EVENT_COLUMNS, _event_response  # noqa: E402
+from backend.app.models.attendance import AttendanceEvent, Course  # noqa: E402
+from backend.app.repositories.attendance import AttendanceRepository  # noqa: E402
+from backend.app.schemas.instructor import AttendanceEventResponse  # noqa: E402
+
+_adapter = TypeAdapter(list[AttendanceEventResponse])
+
+
+def seed(rows: int) -> Session:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+    session.add(Course(id=1, code="CS50", name="CS50", instructor_id="instructor-harv"))
+    start = datetime(2025, 9, 1, tzinfo=timezone.utc)
+    session.bulk_insert_mappings(
+        AttendanceEvent,
+        [
+            {
+                "student_id": f"student-{i % 300}",
+                "course_id": 1,
+                "instructor_id": "instructor-harv",
+                "timestamp": start + timedelta(minutes=i),
+                "verification_method": "vision" if i % 3 else "gps",
+                "status": "present" if i % 5 else "pending",
+                "confidence": 0.5 + (i % 50) / 100,
+                "requires_manual_review": i % 5 == 0,
+                "notes": "Face match confidence 0.91",
+            }
+            for i in range(rows)
+        ],
+    )
+    session.commit()
+    return session
+
+
+def orm_path(session: Session) -> bytes:
+    session.expunge_all()
+    events = AttendanceRepository(session).list_events(course_id=1)
+    content = [_event_response(event).model_dump() for event in events]
+    validated = _adapter.validate_python(content)
+    return json.dumps(_adapter.dump_python(validated, mode="json")).encode()
+
+
+def projected_path(session: Session) -> bytes:
+    rows = AttendanceRepository(session).list_event_rows(columns=_EVENT_COLUMNS, course_id=1)
+    return ORJSONResponse([dict(zip(_EVENT_COLUMNS, row, strict=True)) for row in rows]).body
+
+
+def best_of(func, session: Session, repeats: int) -> tuple[float, bytes]:
+    best, body = float("inf"), b""
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        body = func(session)
+        best = min(best, time.perf_counter() - t0)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark attendance listing serialization")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        session = seed(rows)
+        orm_s, orm_body = best_of(orm_path, session, args.repeats)
+        fast_s, fast_body = best_of(projected_path, session, args.repeats)
+        assert json.loads(orm_body) == json.loads(fast_body), "payloads differ"
+        print(f"{rows:>8,} rows")
+        print(f"  ORM + response model: {orm_s * 1000:9.1f} ms")
+        print(f"  column projection:    {fast_s * 1000:9.1f} ms")
+        print(f"  speedup:              {orm_s / fast_s:9.1f}x")
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark GPSFence throughput: the original bounding-box evaluate() loop, the current
+scalar evaluate() loop and vectorized evaluate_many().
+
+The original implementation is reproduced below so the reported speedup is measured
+against what check-ins used to pay per point, not against the current scalar path.
+
+Usage:
+    python scripts/benchmark_geofence.py [--points 1000000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from backend.app.config.settings import LectureHallBounds  # noqa: E402
+from backend.app.services.gps import (  # noqa: E402
+    INSIDE,
+    MESSAGES,
+    NEAR,
+    OUTSIDE,
+    GPSFence,
+    GPSResult,
+)
+
+
+class OriginalBoxFence:
+    """GPSFence.evaluate before polygon fences: inclusive box check, buffer in degrees."""
+
+    def __init__(self, bounds: LectureHallBounds, buffer_meters: float = 40.0):
+        self.bounds = bounds
+        self.buffer = buffer_meters * 0.00001
+
+    def evaluate(self, latitude: float, longitude: float) -> GPSResult:
+        inside_lat = self.bounds.min_lat <= latitude <= self.bounds.max_lat
+        inside_lon = self.bounds.min_lon <= longitude <= self.bounds.max_lon
+        if inside_lat and inside_lon:
+            return GPSResult(True, False, MESSAGES[INSIDE])
+        lat_buffer = (
+            (self.bounds.min_lat - self.buffer) <= latitude <= (self.bounds.max_lat + self.buffer)
+        )
+        lon_buffer = (
+            (self.bounds.min_lon - self.buffer) <= longitude <= (self.bounds.max_lon + self.buffer)
+        )
+        return GPSResult(False, True, MESSAGES[NEAR if lat_buffer and lon_buffer else OUTSIDE])
+
+
+def time_loop(evaluate, lats, lons) -> tuple[float, list[bool]]:
+    t0 = time.perf_counter()
+    within = [evaluate(lat, lon).within_bounds for lat, lon in zip(lats, lons, strict=True)]
+    return time.perf_counter() - t0, within
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark geofence evaluation")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--scalar-sample", type=int, default=20_000)
+    args = parser.parse_args()
+
+    fence = GPSFence(LectureHallBounds())
+    rng = np.random.default_rng(42)
+    # Scatter points over a ~1 km square around the default hall.
+    lats = rng.uniform(42.3700, 42.3825, args.points)
+    lons = rng.uniform(-71.1250, -71.1090, args.points)
+
+    t0 = time.perf_counter()
+    result = fence.evaluate_many(lats, lons)
+    vector_s = time.perf_counter() - t0
+
+    sample = min(args.scalar_sample, args.points)
+    # Python floats, as a request handler sees them.
+    sample_lats, sample_lons = lats[:sample].tolist(), lons[:sample].tolist()
+    original_s, original = time_loop(
+        OriginalBoxFence(LectureHallBounds()).evaluate, sample_lats, sample_lons
+    )
+    scalar_s, scalar = time_loop(fence.evaluate, sample_lats, sample_lons)
+    expected = result.within_bounds[:sample].tolist()
+    assert scalar == expected, "scalar and vectorized results differ"
+    assert original == expected, "original and current fences disagree on inside points"
+
+    print(f"points:           {args.points:,}")
+    print(
+        f"inside / near:    {int(result.within_bounds.sum()):,} / {int((result.within_buffer & ~result.within_bounds).sum()):,}"
+    )
+    print(f"evaluate_many:    {vector_s * 1000:.1f} ms  ({args.points / vector_s:,.0f} points/s)")
+    print(f"original loop:    {original_s / sample * 1e6:.2f} us/point  ({sample:,} sampled)")
+    print(f"evaluate loop:    {scalar_s / sample * 1e6:.2f} us/point  ({sample:,} sampled)")
+    print(
+        f"speedup:          {(original_s / sample) / (vector_s / args.points):.0f}x vs original loop"
+    )
+
+
+if __name__ == "__main__":
+    main()
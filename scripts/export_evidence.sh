@@ -59,8 +59,12 @@ fi
 
 echo ""
 echo "5. Collecting artifacts..."
-if [ -d "artifacts/model" ]; then
+if [ -d "artifacts/models" ]; then
     echo "   ✓ Model artifacts found"
+    ls -lh artifacts/models/ 2>/dev/null || true
+    cat artifacts/models/ACTIVE 2>/dev/null || true
+elif [ -d "artifacts/model" ]; then
+    echo "   ✓ Legacy model artifacts found"
     ls -lh artifacts/model/ 2>/dev/null || true
 fi
 
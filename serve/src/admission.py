@@ -0,0 +1,95 @@
+"""
+Admission control for inference: shed with 429/503 + Retry-After instead of queueing forever.
+"""
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """At most `max_in_flight` inferences run and `max_queue` wait, each for at most
+    `max_wait_s`. A full queue sheds with 429, an exhausted wait with 503; Retry-After
+    is the backlog divided by the observed drain rate."""
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, max_in_flight: int, max_queue: int, max_wait_s: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_wait_timeout = 0
+        self.service_s = None
+        self.wait_s = None
+        self._cond = threading.Condition()
+
+    def _ewma(self, current, sample):
+        return sample if current is None else current + self.EWMA_ALPHA * (sample - current)
+
+    def retry_after(self, ahead: int) -> int:
+        drain_per_s = max(self.max_in_flight, 1) / max(self.service_s or 1.0, 1e-3)
+        return max(1, math.ceil(ahead / drain_per_s))
+
+    @contextmanager
+    def admit(self):
+        arrived = time.monotonic()
+        with self._cond:
+            if self.in_flight >= self.max_in_flight and self.waiting >= self.max_queue:
+                self.shed_queue_full += 1
+                raise Overloaded(429, self.retry_after(self.waiting + 1), "inference_queue_full")
+            self.waiting += 1
+            try:
+                deadline = arrived + self.max_wait_s
+                while self.in_flight >= self.max_in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed_wait_timeout += 1
+                        raise Overloaded(503, self.retry_after(self.waiting), "inference_wait_timeout")
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            self.admitted += 1
+            self.wait_s = self._ewma(self.wait_s, time.monotonic() - arrived)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self.service_s = self._ewma(self.service_s, time.monotonic() - started)
+                self._cond.notify()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "shed_queue_full": self.shed_queue_full,
+                "shed_wait_timeout": self.shed_wait_timeout,
+                "avg_wait_ms": round((self.wait_s or 0.0) * 1000, 2),
+                "avg_service_ms": round((self.service_s or 0.0) * 1000, 2),
+            }
+
+
+# One controller for the single model shared by /verify and /student/checkin.
+VISION_ADMISSION = AdmissionController(
+    max_in_flight=int(os.getenv("VISION_MAX_IN_FLIGHT", "2")),
+    max_queue=int(os.getenv("VISION_MAX_QUEUE", "16")),
+    max_wait_s=float(os.getenv("VISION_MAX_WAIT_S", "2.0")),
+)
@@ -1,30 +1,48 @@
-import os, base64, json, time, yaml
-from pathlib import Path
-import numpy as np
-import cv2, torch
-from fastapi import FastAPI, Request, HTTPException
+import asyncio, logging, os, threading, time
+from fastapi import FastAPI, Header, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from .geo import (
     save_calibration, load_calibration, haversine_m, get_client_ip, PROVIDER, log_attempt
 )
 from . import database as db
+from .http_cache import conditional, make_etag
+from .admission import VISION_ADMISSION, Overloaded
+from . import metrics
+from .samples import VERIFY_SAMPLES
+from .registry import REGISTRY
+from .heads import HEADS, ROOM_MATCH_THRESHOLD
+from .faces import face_crops
+from .offload import DECODE_POOL, EXECUTORS, GEO_POOL, IO_POOL, LOOP_MONITOR, VISION_POOL
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from .pretrained_classrooms import list_classrooms, get_classroom
 
-# Load model metadata (if present) for /verify demo
-META_PATH = Path("/app/artifacts/model/metadata.json")
-if META_PATH.exists():
-    META = json.loads(META_PATH.read_text())
-    model = torch.jit.load("/app/artifacts/model/model.torchscript.pt", map_location="cpu")
-    model.eval()
-    IMG_SIZE = META["img_size"]
-    CLASSES = META["classes"]
-else:
-    META, model, IMG_SIZE, CLASSES = {}, None, 224, ["ProfA","Room1"]
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="HARV API", version="0.2.0")
 
+# List endpoints carry base64 photos and compress well; tiny payloads are not worth it.
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_BYTES", "1024")))
+# Outermost, so latency includes compression and error handling.
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.install({"vision": VISION_ADMISSION}, LOOP_MONITOR, EXECUTORS)
+
+@app.on_event("startup")
+async def start_background():
+    VERIFY_SAMPLES.start()
+    REGISTRY.preload()
+    LOOP_MONITOR.start()
+
+@app.on_event("shutdown")
+def stop_background():
+    VERIFY_SAMPLES.stop()
+    LOOP_MONITOR.stop()
+    for pool in EXECUTORS.values():
+        pool.shutdown()
+
 # Optional CORS for development (disabled by default since we use NGINX proxy)
 FRONTEND_ORIGIN = os.getenv("FRONTEND_ORIGIN")
 if FRONTEND_ORIGIN:
@@ -36,9 +54,25 @@ if FRONTEND_ORIGIN:
         allow_headers=["Content-Type"],
     )
 
+@app.exception_handler(Overloaded)
+async def shed(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"ok": False, "reason": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 class VerifyIn(BaseModel):
     image_b64: str
 
+VERIFY_BATCH_MAX = int(os.getenv("VERIFY_BATCH_MAX", "32"))
+
+class VerifyBatchIn(BaseModel):
+    images_b64: List[str]
+
+class ActivateModelIn(BaseModel):
+    version: str
+
 class CalibrateIn(BaseModel):
     lat: float
     lon: float
@@ -85,14 +119,58 @@ class ManualOverrideRequest(BaseModel):
     student_id: str
     secret_word: str
 
+# The template catalog is static per process: serialize and tag it once.
+CATALOG_BODY = JSONResponse({"classrooms": list_classrooms(include_photos=False)}).body
+CATALOG_ETAG = make_etag(CATALOG_BODY)
+
 @app.get("/professor/classrooms")
-def get_classroom_catalog():
+def get_classroom_catalog(request: Request):
     """Expose available pre-trained classroom templates to clients."""
-    return {"classrooms": list_classrooms(include_photos=False)}
+    return conditional(
+        request, CATALOG_ETAG, lambda: Response(CATALOG_BODY, media_type="application/json")
+    )
 
 @app.get("/healthz")
 def healthz():
-    return {"ok": True, "model": META.get("model"), "geo_provider": type(PROVIDER).__name__}
+    return {
+        "ok": True,
+        "model": REGISTRY.active_name(),
+        "model_version": REGISTRY.active_version,
+        "room_heads": HEADS.snapshot(),
+        "geo_provider": type(PROVIDER).__name__,
+        "admission": VISION_ADMISSION.snapshot(),
+        "event_loop": LOOP_MONITOR.snapshot(),
+        "executors": {name: pool.snapshot() for name, pool in EXECUTORS.items()},
+    }
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def _require_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="admin_disabled")
+    if token != ADMIN_TOKEN:
+        raise HTTPException(status_code=401, detail="bad_admin_token")
+
+@app.get("/admin/models")
+def list_models(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return REGISTRY.snapshot()
+
+@app.post("/admin/models/activate")
+def activate_model(inp: ActivateModelIn, x_admin_token: Optional[str] = Header(None)):
+    """Load and warm a version, then switch to it; in-flight requests finish on the old one."""
+    _require_admin(x_admin_token)
+    try:
+        REGISTRY.activate(inp.version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="model_version_not_found") from None
+    except RuntimeError as e:
+        return {"ok": False, "reason": "model_load_failed", "detail": str(e)}
+    return {"ok": True, "models": REGISTRY.snapshot()}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 @app.post("/geo/calibrate")
 def geo_calibrate(inp: CalibrateIn):
@@ -107,7 +185,8 @@ def geo_status():
 
 @app.post("/geo/verify")
 async def geo_verify(req: Request, inp: GeoVerifyIn):
-    cfg = load_calibration()
+    # Every blocking step (file reads, provider HTTP call, log append) runs on an executor.
+    cfg = await IO_POOL.run(load_calibration)
     if cfg["lat"] is None or cfg["lon"] is None:
         return {"ok": False, "reason": "not_calibrated"}
 
@@ -119,10 +198,10 @@ async def geo_verify(req: Request, inp: GeoVerifyIn):
         lat, lon, acc = float(inp.client_gps_lat), float(inp.client_gps_lon), float(inp.client_gps_accuracy_m or 50.0)
         source = "client_gps"
     else:
-        loc = PROVIDER.locate(ip)
+        loc = await GEO_POOL.run(PROVIDER.locate, ip)
         if not loc:
             provider_name = type(PROVIDER).__name__
-            log_attempt({"ok": False, "ip": ip, "provider": provider_name, "reason":"geo_lookup_failed"})
+            await IO_POOL.run(log_attempt, {"ok": False, "ip": ip, "provider": provider_name, "reason":"geo_lookup_failed"})
             return {"ok": False, "reason": "geo_lookup_failed", "provider": provider_name, "ip": ip}
         lat, lon, acc = loc
         source = "ip_geo"
@@ -130,7 +209,7 @@ async def geo_verify(req: Request, inp: GeoVerifyIn):
     dist_m = haversine_m(cfg["lat"], cfg["lon"], lat, lon)
     ok = dist_m <= float(cfg["epsilon_m"])
     rec = {"ok": ok, "ip": ip, "source": source, "lat": lat, "lon": lon, "acc_m": acc, "dist_m": dist_m, "eps_m": cfg["epsilon_m"]}
-    log_attempt(rec)
+    await IO_POOL.run(log_attempt, rec)
 
     return {
         "ok": ok,
@@ -143,44 +222,186 @@ async def geo_verify(req: Request, inp: GeoVerifyIn):
         "estimated_accuracy_m": acc
     }
 
-def preprocess(img):
-    img = cv2.resize(img,(IMG_SIZE,IMG_SIZE))
-    t = torch.from_numpy(img.transpose(2,0,1)).float().unsqueeze(0)/255.0
-    return t
+def classify_batch(imgs, m):
+    """One forward pass over decoded images under admission control -> [(label, confidence)].
+    Raises Overloaded when inference is saturated."""
+    with VISION_ADMISSION.admit():
+        return m.predict(imgs)
+
+def classifier_inputs(img, m, fit=False):
+    """Full-resolution frame -> (model inputs, faces found): one input per detected face,
+    as in the training crops, or the whole frame when no face is found."""
+    crops = face_crops(img)
+    if crops:
+        # Crops differ in size, so they are resized to stack into one batch.
+        return [m.fit(crop) for crop in crops], len(crops)
+    return [m.prepare(img, fit)], 0
+
+def best(predictions):
+    """Most confident (label, confidence) across one frame's crops."""
+    return max(predictions, key=lambda p: p[1])
+
+def score_image(image_b64, m=None):
+    """Decode, crop and classify a base64 photo -> (label, confidence, faces).
+    None if the photo is undecodable or no model is available."""
+    m = m or REGISTRY.current()
+    if m is None:
+        return None
+    img = m.decode(image_b64, fit=False)
+    if img is None:
+        return None
+    inputs, faces = classifier_inputs(img, m)
+    label, confidence = best(classify_batch(inputs, m))
+    return label, confidence, faces
+
+def verify_room(image_b64, class_obj, cancelled=None):
+    """Check a photo against the class's own room -> (label, confidence, ok), or None if
+    the photo is undecodable, no model is available or the caller set `cancelled`.
+
+    Classes with room photos are matched by cosine similarity to their prototypes (one
+    backbone pass over the whole frame); others fall back to the face classifier's
+    confidence > 0.5. `cancelled` (a threading.Event) is checked before decoding and
+    again before taking an inference slot, since a job already on a worker thread
+    cannot be cancelled from the event loop."""
+    if cancelled is not None and cancelled.is_set():
+        return None
+    m = REGISTRY.current()
+    if m is None:
+        return None
+    img = m.decode(image_b64, fit=False)
+    if img is None or (cancelled is not None and cancelled.is_set()):
+        return None
+    if m.backbone is not None:
+        with VISION_ADMISSION.admit():
+            # A cache miss may run the backbone over the room photos, so it holds the slot.
+            head = HEADS.get(class_obj, m)
+            if head is not None:
+                similarity = head.score(m.embed([m.prepare(img)])[0])
+                label = class_obj.get("classroom_label") or class_obj["code"]
+                return label, similarity, similarity >= ROOM_MATCH_THRESHOLD
+    # Face detection runs before taking an inference slot.
+    inputs, _ = classifier_inputs(img, m)
+    if cancelled is not None and cancelled.is_set():
+        return None
+    label, confidence = best(classify_batch(inputs, m))
+    return label, confidence, confidence > 0.5
+
+def prepare_batch_item(image_b64, m):
+    """Decode and crop one /verify/batch photo -> model-sized inputs, or None."""
+    img = m.decode(image_b64, fit=False)
+    if img is None:
+        return None
+    inputs, _ = classifier_inputs(img, m, fit=True)
+    return inputs
 
 @app.post("/verify")
 def verify(inp: VerifyIn):
     # Lecture hall recognition endpoint; photo step happens AFTER geo in the app flow
     t0 = time.time()
-    if model is None:
+    # Pinned for the whole request so a model switch cannot change it midway.
+    m = REGISTRY.current()
+    if m is None:
         return {"ok": False, "reason":"model_missing"}
 
-    img_bytes = base64.b64decode(inp.image_b64)
-    img = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
-    if img is None:
+    scored = score_image(inp.image_b64, m)
+    if scored is None:
         return {"ok": False, "reason":"bad_image"}
-
-    x = preprocess(img)
-    with torch.no_grad():
-        logits = model(x)
-        pred = int(torch.argmax(logits, dim=1).item())
-        conf = float(torch.softmax(logits, dim=1)[0, pred].item())
+    label, conf, faces = scored
 
     result = {
         "ok": True,
-        "label": CLASSES[pred],
+        "label": label,
         "confidence": round(conf, 4),
+        "faces": faces,
+        "model_version": m.version,
         "latency_ms": int((time.time()-t0)*1000)
     }
-    Path("/app/artifacts/samples").mkdir(parents=True, exist_ok=True)
-    with open("/app/artifacts/samples/sample_response.json","w") as f:
-        json.dump(result, f, indent=2)
+    VERIFY_SAMPLES.record(result)
     return result
 
+@app.post("/verify/batch")
+async def verify_batch(inp: VerifyBatchIn):
+    """Classify many photos at once: parallel decode and face cropping, then one stacked
+    forward pass over every crop.
+
+    For room-photo validation and audits; the whole batch takes a single inference slot."""
+    t0 = time.time()
+    if len(inp.images_b64) > VERIFY_BATCH_MAX:
+        return {"ok": False, "reason": "too_many_images", "max_images": VERIFY_BATCH_MAX}
+    # current() may load the model on first use, so keep it off the event loop.
+    m = await IO_POOL.run(REGISTRY.current)
+    if m is None:
+        return {"ok": False, "reason": "model_missing"}
+
+    prepared = await asyncio.gather(
+        *(DECODE_POOL.run(prepare_batch_item, b64, m) for b64 in inp.images_b64), return_exceptions=True
+    )
+    server_errors = set()
+    for i, failure in enumerate(prepared):
+        # Only undecodable input is the client's fault: None from imdecode, or
+        # binascii.Error (a ValueError) from bad base64. Shedding fails the whole batch;
+        # any other failure is a server fault reported against that image alone.
+        if isinstance(failure, Overloaded):
+            raise failure
+        if isinstance(failure, Exception) and not isinstance(failure, ValueError):
+            logger.error(f"verify/batch: image {i} failed", exc_info=failure)
+            server_errors.add(i)
+    t_decoded = time.time()
+
+    # Every crop of every photo goes through one forward pass; owners maps rows back.
+    inputs, owners = [], []
+    for i, item in enumerate(prepared):
+        if isinstance(item, list):
+            inputs.extend(item)
+            owners.extend([i] * len(item))
+    scores = await VISION_POOL.run(classify_batch, inputs, m) if inputs else []
+    per_image = {}
+    for i, score in zip(owners, scores, strict=True):
+        per_image.setdefault(i, []).append(score)
+    results = []
+    for i in range(len(prepared)):
+        if i in per_image:
+            label, conf = best(per_image[i])
+            results.append({"index": i, "ok": True, "label": label, "confidence": round(conf, 4)})
+        elif i in server_errors:
+            results.append({"index": i, "ok": False, "reason": "server_error"})
+        else:
+            results.append({"index": i, "ok": False, "reason": "bad_image"})
+
+    latency_ms = int((time.time()-t0)*1000)
+    return {
+        "ok": True,
+        "model_version": m.version,
+        "count": len(results),
+        "results": results,
+        "latency_ms": latency_ms,
+        "decode_ms": int((t_decoded-t0)*1000),
+        "per_image_ms": round(latency_ms / len(results), 2) if results else 0.0,
+    }
+
+@app.get("/debug/samples")
+def debug_samples(limit: int = 50, x_admin_token: Optional[str] = Header(None)):
+    """Most recent /verify responses from the in-memory ring, plus sampler counters.
+    Admin only, like /admin/models: samples carry request results."""
+    _require_admin(x_admin_token)
+    return {"stats": VERIFY_SAMPLES.stats(), "samples": VERIFY_SAMPLES.latest(limit)}
+
 # ============================================================================
 # PROFESSOR ENDPOINTS
 # ============================================================================
 
+def _precompute_room_embeddings(class_obj, photos):
+    """Embed room photos once at creation. Best effort: without a model, or under load,
+    the embeddings are computed on the class's first check-in instead."""
+    m = REGISTRY.current()
+    if m is None:
+        return
+    try:
+        with VISION_ADMISSION.admit():
+            HEADS.precompute(class_obj, photos, m)
+    except Exception as e:
+        print(f"Room embeddings for {class_obj['code']} deferred: {e}", flush=True)
+
 @app.post("/professor/classes")
 def create_class(class_data: ClassCreate):
     """Professor creates a new class with location and room photos."""
@@ -198,6 +419,7 @@ def create_class(class_data: ClassCreate):
             return {"ok": False, "reason": "room_photos_required"}
 
         new_class = db.create_class(payload)
+        _precompute_room_embeddings(new_class, payload["room_photos"])
         return {"ok": True, "class": new_class}
     except Exception as e:
         return {"ok": False, "reason": str(e)}
@@ -258,9 +480,7 @@ def get_student_attendance(student_id: str, class_code: str):
 # STUDENT ENDPOINTS
 # ============================================================================
 
-@app.get("/student/classes")
-def get_available_classes():
-    """Get all available classes for enrollment."""
+def _public_classes():
     classes = db.get_all_classes()
     # Remove sensitive data (secret_word, room_photos)
     for cls in classes:
@@ -268,6 +488,18 @@ def get_available_classes():
         cls.pop("room_photos", None)
     return classes
 
+@app.get("/student/classes")
+def get_available_classes(request: Request):
+    """Get all available classes for enrollment."""
+    version = db.classes_version()
+    if version is None:
+        # No cheap change token (Firestore): tag the rendered payload instead.
+        response = JSONResponse(_public_classes())
+        return conditional(request, make_etag(response.body), lambda: response)
+    return conditional(
+        request, make_etag("student_classes", version), lambda: JSONResponse(_public_classes())
+    )
+
 @app.post("/student/enroll")
 def enroll_in_class(enrollment: EnrollmentCreate):
     """Student enrolls in a class."""
@@ -299,39 +531,78 @@ def get_student_classes(student_id: str):
         cls.pop("room_photos", None)
     return classes
 
+def _checkin_class(class_code, student_id):
+    """Class record plus enrollment check in one executor hop -> (class_obj, enrolled)."""
+    class_obj = db.get_class_by_code(class_code)
+    if not class_obj:
+        return None, False
+    return class_obj, db.is_student_enrolled(class_code, student_id)
+
+def _within_class_fence(class_obj, lat, lon):
+    """-> (geo_ok, distance_m) for a position against the class location."""
+    distance_m = haversine_m(class_obj["lat"], class_obj["lon"], lat, lon)
+    return distance_m <= class_obj["epsilon_m"], distance_m
+
+async def _locate_by_ip(req, class_obj):
+    """IP-geolocation half of check-in -> (geo_ok, distance_m)."""
+    client = req.client.host if req.client else ""
+    ip = get_client_ip(req.headers, client)
+    loc = await GEO_POOL.run(PROVIDER.locate, ip)
+    if not loc:
+        return False, None
+    lat, lon, _ = loc
+    return _within_class_fence(class_obj, lat, lon)
+
+def _discard(task):
+    """Drop a task whose result is no longer needed without leaking its exception."""
+    if task is None:
+        return
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
 @app.post("/student/checkin")
 async def student_checkin(req: Request, checkin: CheckInRequest):
-    """Integrated check-in: geolocation + vision verification."""
-    # 1. Check if class exists
-    class_obj = db.get_class_by_code(checkin.class_code)
+    """Integrated check-in: geolocation + vision verification.
+
+    Runs on the event loop; database access, geolocation lookups and inference are all
+    handed to bounded executors so a slow step only holds up this request."""
+    # 1-2. Check that the class exists and the student is enrolled
+    class_obj, enrolled = await IO_POOL.run(_checkin_class, checkin.class_code, checkin.student_id)
     if not class_obj:
         return {"ok": False, "reason": "class_not_found"}
-    
-    # 2. Check if student is enrolled
-    if not db.is_student_enrolled(checkin.class_code, checkin.student_id):
+    if not enrolled:
         return {"ok": False, "reason": "not_enrolled"}
     
-    # 3. Geolocation verification
-    geo_ok = False
-    distance_m = None
-    
+    # 3-4. Geolocation decides first; vision only runs for a location that passed.
+    # Vision work happens off the event loop: model lookup, decode, inference and waiting
+    # for a slot must not stall other requests. Without a usable model it scores None
+    # (recognition_failed).
+    vision_task = None
+    cancelled = threading.Event()
     if checkin.lat is not None and checkin.lon is not None:
-        # Use provided GPS coordinates
-        distance_m = haversine_m(class_obj["lat"], class_obj["lon"], checkin.lat, checkin.lon)
-        geo_ok = distance_m <= class_obj["epsilon_m"]
+        # Client GPS is a haversine away, so a rejected location never starts vision work.
+        geo_ok, distance_m = _within_class_fence(class_obj, checkin.lat, checkin.lon)
     else:
-        # Try IP-based geolocation
-        client = req.client.host if req.client else ""
-        ip = get_client_ip(req.headers, client)
-        loc = PROVIDER.locate(ip)
-        if loc:
-            lat, lon, _ = loc
-            distance_m = haversine_m(class_obj["lat"], class_obj["lon"], lat, lon)
-            geo_ok = distance_m <= class_obj["epsilon_m"]
-    
+        # The IP lookup is a network round trip, so vision overlaps it and latency is
+        # max(geo, vision). If geo fails, the flag stops the vision job before it takes
+        # an inference slot, since a job already on a worker thread cannot be cancelled.
+        vision_task = asyncio.create_task(
+            VISION_POOL.run(verify_room, checkin.image_b64, class_obj, cancelled)
+        )
+        try:
+            geo_ok, distance_m = await _locate_by_ip(req, class_obj)
+        except BaseException:
+            cancelled.set()
+            _discard(vision_task)
+            raise
+
     if not geo_ok:
+        cancelled.set()
+        _discard(vision_task)
         # Record failed check-in
-        db.record_checkin({
+        await IO_POOL.run(db.record_checkin, {
             "class_code": checkin.class_code,
             "student_id": checkin.student_id,
             "success": False,
@@ -348,33 +619,26 @@ async def student_checkin(req: Request, checkin: CheckInRequest):
             "needs_manual_override": True,
         }
     
-    # 4. Vision verification (lecture hall recognition)
+    # Vision verification (lecture hall recognition)
     vision_ok = False
     label = None
     confidence = 0.0
     
-    if model is not None:
-        try:
-            img_bytes = base64.b64decode(checkin.image_b64)
-            img = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
-            
-            if img is not None:
-                x = preprocess(img)
-                with torch.no_grad():
-                    logits = model(x)
-                    pred = int(torch.argmax(logits, dim=1).item())
-                    confidence = float(torch.softmax(logits, dim=1)[0, pred].item())
-                    label = CLASSES[pred]
-                
-                # Check if predicted label matches expected class
-                # For now, accept any prediction with confidence > 0.5
-                vision_ok = confidence > 0.5
-        except:
-            pass
+    try:
+        if vision_task is None:
+            vision_task = VISION_POOL.run(verify_room, checkin.image_b64, class_obj)
+        scored = await vision_task
+        
+        if scored is not None:
+            label, confidence, vision_ok = scored
+    except Overloaded:
+        raise
+    except Exception:
+        pass
     
     if not vision_ok:
         # Record failed check-in
-        db.record_checkin({
+        await IO_POOL.run(db.record_checkin, {
             "class_code": checkin.class_code,
             "student_id": checkin.student_id,
             "success": False,
@@ -395,7 +659,7 @@ async def student_checkin(req: Request, checkin: CheckInRequest):
         }
     
     # 5. Success - record check-in
-    db.record_checkin({
+    await IO_POOL.run(db.record_checkin, {
         "class_code": checkin.class_code,
         "student_id": checkin.student_id,
         "success": True,
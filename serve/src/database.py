@@ -2,14 +2,19 @@
 Simple JSON-based database for HARV mobile app.
 In production, this should be replaced with PostgreSQL or similar.
 """
+import functools
 import json
 import os
+import tempfile
+import threading
 from collections import defaultdict
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
 import hashlib
 
+import numpy as np
+
 DB_BACKEND = os.getenv("DB_BACKEND", "json").lower()
 FIRESTORE_PROJECT_ID = os.getenv("FIRESTORE_PROJECT_ID") or os.getenv("PROJECT_ID")
 FIRESTORE_COLLECTION_PREFIX = os.getenv("FIRESTORE_COLLECTION_PREFIX", "harv")
@@ -26,32 +31,62 @@ if USE_FIRESTORE and not FIRESTORE_PROJECT_ID:
     print("[database] FIRESTORE_PROJECT_ID/PROJECT_ID not configured; falling back to JSON storage.")
     USE_FIRESTORE = False
 
-DB_PATH = Path("/app/artifacts/db")
+DB_PATH = Path(os.getenv("DB_PATH", "/app/artifacts/db"))
 DB_PATH.mkdir(parents=True, exist_ok=True)
 
 CLASSES_FILE = DB_PATH / "classes.json"
 ENROLLMENTS_FILE = DB_PATH / "enrollments.json"
 CHECKINS_FILE = DB_PATH / "checkins.json"
+# Room photos and their embeddings live beside the class, not in the hot class record.
+ROOM_PHOTOS_DIR = DB_PATH / "room_photos"
+EMBEDDINGS_DIR = DB_PATH / "embeddings"
+
+# Handlers reach the JSON files from several threads at once (the IO executor and
+# Starlette's threadpool), so every read-modify-write holds this lock. Reads need no
+# lock: files are only ever replaced whole.
+_WRITE_LOCK = threading.RLock()
+
+
+def _serialized(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with _WRITE_LOCK:
+            return fn(*args, **kwargs)
+    return wrapper
 
 
 def load_json(file_path: Path) -> List[Dict]:
-    """Load JSON data from file."""
-    if not file_path.exists():
-        return []
+    """Load JSON data from file. A missing file is an empty table; an unreadable one
+    raises, since treating it as empty would let the next write wipe the history."""
     try:
         with open(file_path, 'r') as f:
             return json.load(f)
-    except:
+    except FileNotFoundError:
         return []
 
 
+def replace_atomically(file_path: Path, write, mode: str = "w"):
+    """Write through a uniquely named temp file beside file_path, then rename it over
+    file_path, so readers and concurrent writers never see a partial file."""
+    with tempfile.NamedTemporaryFile(
+        mode, dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp", delete=False
+    ) as f:
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, file_path)
+
+
 def save_json(file_path: Path, data: List[Dict]):
     """Save JSON data to file."""
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=2)
+    replace_atomically(file_path, lambda f: json.dump(data, f, indent=2))
 
 
 # Class Management
+@_serialized
 def create_class(class_data: Dict) -> Dict:
     """Create a new class."""
     classes = load_json(CLASSES_FILE)
@@ -67,7 +102,7 @@ def create_class(class_data: Dict) -> Dict:
         "lon": class_data["lon"],
         "epsilon_m": class_data["epsilon_m"],
         "secret_word": class_data["secret_word"],
-        "room_photos": class_data.get("room_photos", []),
+        "room_photo_count": len(class_data.get("room_photos", [])),
         "classroom_id": class_data.get("classroom_id"),
         "classroom_label": class_data.get("classroom_label"),
         "professor_id": class_data.get("professor_id", "unknown"),
@@ -75,6 +110,8 @@ def create_class(class_data: Dict) -> Dict:
         "created_at": datetime.now().isoformat(),
     }
     
+    ROOM_PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
+    save_json(ROOM_PHOTOS_DIR / f"{class_id}.json", class_data.get("room_photos", []))
     classes.append(new_class)
     save_json(CLASSES_FILE, classes)
     
@@ -101,7 +138,45 @@ def get_all_classes() -> List[Dict]:
     return load_json(CLASSES_FILE)
 
 
+def classes_version() -> Optional[str]:
+    """Cheap change token for the class list (file mtime + size); None if unavailable."""
+    try:
+        st = CLASSES_FILE.stat()
+    except FileNotFoundError:
+        return "empty"
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def get_room_photos(class_obj: Dict) -> List[str]:
+    """Base64 room photos for a class; older records still carry them inline."""
+    if "room_photos" in class_obj:
+        return class_obj["room_photos"]
+    return load_json(ROOM_PHOTOS_DIR / f"{class_obj['id']}.json")
+
+
+def _embeddings_path(class_id: str, model_version: str) -> Path:
+    return EMBEDDINGS_DIR / f"{class_id}.{model_version}.npy"
+
+
+def save_room_embeddings(class_id: str, model_version: str, matrix: np.ndarray):
+    """Store a class's float16 room-photo embeddings for one model version."""
+    EMBEDDINGS_DIR.mkdir(parents=True, exist_ok=True)
+    replace_atomically(
+        _embeddings_path(class_id, model_version),
+        lambda f: np.save(f, matrix.astype(np.float16)),
+        mode="wb",
+    )
+
+
+def load_room_embeddings(class_id: str, model_version: str) -> Optional[np.ndarray]:
+    try:
+        return np.load(_embeddings_path(class_id, model_version))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
 # Enrollment Management
+@_serialized
 def enroll_student(class_code: str, student_id: str) -> Dict:
     """Enroll a student in a class."""
     enrollments = load_json(ENROLLMENTS_FILE)
@@ -124,6 +199,7 @@ def enroll_student(class_code: str, student_id: str) -> Dict:
     return {"ok": True, "enrollment": enrollment}
 
 
+@_serialized
 def unenroll_student(class_code: str, student_id: str) -> Dict:
     """Remove a student enrollment from a class."""
     enrollments = load_json(ENROLLMENTS_FILE)
@@ -158,6 +234,7 @@ def is_student_enrolled(class_code: str, student_id: str) -> bool:
 
 
 # Check-in Management
+@_serialized
 def record_checkin(checkin_data: Dict) -> Dict:
     """Record a check-in attempt."""
     checkins = load_json(CHECKINS_FILE)
@@ -253,6 +330,8 @@ if USE_FIRESTORE:
             self.students = self.client.collection(f"{prefix}_students")
             self.enrollments = self.client.collection(f"{prefix}_enrollments")
             self.checkins = self.client.collection(f"{prefix}_checkins")
+            self.room_photos = self.client.collection(f"{prefix}_room_photos")
+            self.room_embeddings = self.client.collection(f"{prefix}_room_embeddings")
 
         def _timestamp(self) -> str:
             return datetime.utcnow().isoformat()
@@ -276,16 +355,36 @@ if USE_FIRESTORE:
                 "lon": class_data["lon"],
                 "epsilon_m": class_data["epsilon_m"],
                 "secret_word": class_data["secret_word"],
-                "room_photos": class_data.get("room_photos", []),
+                "room_photo_count": len(class_data.get("room_photos", [])),
                 "classroom_id": class_data.get("classroom_id"),
                 "classroom_label": class_data.get("classroom_label"),
                 "professor_id": class_data.get("professor_id", "unknown"),
                 "professor_name": class_data.get("professor_name", "Unknown"),
                 "created_at": self._timestamp(),
             }
+            self.room_photos.document(class_id).set({"photos": class_data.get("room_photos", [])})
             self.classes.document(class_code).set(new_class)
             return new_class
 
+        def get_room_photos(self, class_obj: Dict) -> List[str]:
+            if "room_photos" in class_obj:
+                return class_obj["room_photos"]
+            doc = self.room_photos.document(class_obj["id"]).get()
+            return (doc.to_dict() or {}).get("photos", []) if doc.exists else []
+
+        def save_room_embeddings(self, class_id: str, model_version: str, matrix: np.ndarray):
+            matrix = matrix.astype(np.float16)
+            self.room_embeddings.document(f"{class_id}.{model_version}").set(
+                {"shape": list(matrix.shape), "data": matrix.tobytes()}
+            )
+
+        def load_room_embeddings(self, class_id: str, model_version: str) -> Optional[np.ndarray]:
+            doc = self.room_embeddings.document(f"{class_id}.{model_version}").get()
+            if not doc.exists:
+                return None
+            data = doc.to_dict()
+            return np.frombuffer(data["data"], dtype=np.float16).reshape(data["shape"])
+
         def get_class_by_code(self, code: str) -> Optional[Dict]:
             doc = self.classes.document(code).get()
             if not doc.exists:
@@ -432,6 +531,19 @@ if USE_FIRESTORE:
     def get_all_classes() -> List[Dict]:
         return _firestore_db.get_all_classes()
 
+    def classes_version() -> Optional[str]:
+        # Firestore has no cheap collection-level change token.
+        return None
+
+    def get_room_photos(class_obj: Dict) -> List[str]:
+        return _firestore_db.get_room_photos(class_obj)
+
+    def save_room_embeddings(class_id: str, model_version: str, matrix: np.ndarray):
+        return _firestore_db.save_room_embeddings(class_id, model_version, matrix)
+
+    def load_room_embeddings(class_id: str, model_version: str) -> Optional[np.ndarray]:
+        return _firestore_db.load_room_embeddings(class_id, model_version)
+
     def enroll_student(class_code: str, student_id: str) -> Dict:
         return _firestore_db.enroll_student(class_code, student_id)
 
@@ -0,0 +1,62 @@
+"""
+Face detection and cropping ahead of the classifier.
+
+The training set (scripts/setup_real_faces.py, scripts/download_kaggle_faces.py) is Haar
+cascade face crops, so the classifier should see crops rather than whole frames. The
+cascade runs on a downscaled grayscale copy with the same detectMultiScale parameters the
+dataset scripts used, and boxes are mapped back to crop the full-resolution frame.
+"""
+import os
+import threading
+
+import cv2
+
+FACE_CROP_ENABLED = os.getenv("FACE_CROP", "true").lower() == "true"
+CASCADE_FILE = os.getenv(
+    "FACE_CASCADE", cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+)
+# Longest side of the copy the detector sees; detection cost scales with its area.
+DETECT_MAX_SIDE = int(os.getenv("FACE_DETECT_MAX_SIDE", "320"))
+MAX_FACES = int(os.getenv("FACE_MAX_CROPS", "4"))
+
+_local = threading.local()
+
+
+def _cascade():
+    """CascadeClassifier is not safe to share between threads; each worker thread builds
+    its own once and keeps it."""
+    cascade = getattr(_local, "cascade", None)
+    if cascade is None:
+        cascade = cv2.CascadeClassifier(CASCADE_FILE)
+        if cascade.empty():
+            raise RuntimeError(f"could not load face cascade {CASCADE_FILE}")
+        _local.cascade = cascade
+    return cascade
+
+
+def detect_faces(img):
+    """Face boxes (x, y, w, h) in full-resolution coordinates, largest first."""
+    height, width = img.shape[:2]
+    scale = min(1.0, DETECT_MAX_SIDE / max(height, width))
+    small = img
+    if scale < 1.0:
+        small = cv2.resize(img, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    found = _cascade().detectMultiScale(gray, 1.1, 4)
+
+    boxes = []
+    for x, y, w, h in found:
+        x0, y0 = max(0, int(x / scale)), max(0, int(y / scale))
+        x1, y1 = min(width, int((x + w) / scale)), min(height, int((y + h) / scale))
+        if x1 > x0 and y1 > y0:
+            boxes.append((x0, y0, x1 - x0, y1 - y0))
+    boxes.sort(key=lambda box: box[2] * box[3], reverse=True)
+    return boxes[:MAX_FACES]
+
+
+def face_crops(img):
+    """Full-resolution face crops (views, no copy), or [] when none is found or cropping
+    is disabled."""
+    if not FACE_CROP_ENABLED:
+        return []
+    return [img[y:y + h, x:x + w] for x, y, w, h in detect_faces(img)]
@@ -0,0 +1,111 @@
+"""
+Per-class room matching on top of the shared backbone.
+
+Each class gets a small head: the L2-normalised backbone embeddings of its room photos
+(prototypes). Verifying a check-in is one backbone pass for the photo plus a
+matrix-vector product, and memory grows with classes * photos * embedding_dim floats
+instead of one model per class.
+
+Embeddings are computed once when a class is created and stored as float16 beside the
+class record. Heads are kept in an LRU keyed by class and model version, so a model
+switch never mixes embedding spaces; a version without stored embeddings (or a class
+created before they existed) is embedded from the stored photos on first use.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import database as db
+
+# Cosine similarity a check-in photo needs with its closest room photo.
+ROOM_MATCH_THRESHOLD = float(os.getenv("ROOM_MATCH_THRESHOLD", "0.7"))
+
+
+class RoomPrototypes:
+    def __init__(self, matrix):
+        # (photos, D), rows with unit norm. Stored as float16; widened once here so each
+        # check-in is a BLAS matrix-vector product.
+        self.matrix = np.asarray(matrix, dtype=np.float32)
+
+    def score(self, embedding):
+        """Best cosine similarity between a unit-norm embedding and the room photos."""
+        return float((self.matrix @ embedding).max())
+
+
+class HeadCache:
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._heads = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(class_obj, m):
+        # The id changes when a code is reused for a new class.
+        return class_obj.get("id") or class_obj["code"], m.version
+
+    @staticmethod
+    def embed_photos(photos, m):
+        """One backbone pass over room photos -> (photos, D) float16, or None if none decode."""
+        imgs = [img for img in (m.decode(b64, fit=True) for b64 in photos) if img is not None]
+        if not imgs:
+            return None
+        return m.embed(imgs).astype(np.float16)
+
+    def precompute(self, class_obj, photos, m):
+        """Embed and store a new class's photos so check-ins never pay for it."""
+        if m.backbone is None:
+            return None
+        matrix = self.embed_photos(photos, m)
+        if matrix is None:
+            return None
+        db.save_room_embeddings(class_obj["id"], m.version, matrix)
+        return self._put(self._key(class_obj, m), RoomPrototypes(matrix))
+
+    def build(self, class_obj, m):
+        """Stored embeddings for this model version, else embed the stored photos (and
+        keep the result). None if the class has no usable photos."""
+        class_id = class_obj.get("id")
+        matrix = db.load_room_embeddings(class_id, m.version) if class_id else None
+        if matrix is None:
+            matrix = self.embed_photos(db.get_room_photos(class_obj), m)
+            if matrix is None:
+                return None
+            if class_id:
+                db.save_room_embeddings(class_id, m.version, matrix)
+        return RoomPrototypes(matrix)
+
+    def _put(self, key, head):
+        with self._lock:
+            self._heads[key] = head
+            self._heads.move_to_end(key)
+            while len(self._heads) > self.capacity:
+                self._heads.popitem(last=False)
+        return head
+
+    def get(self, class_obj, m):
+        """Head for a class under model m; None if the model has no backbone or the class
+        has no usable room photos. Call under admission control: a miss may run the backbone."""
+        if m.backbone is None:
+            return None
+        key = self._key(class_obj, m)
+        with self._lock:
+            if key in self._heads:
+                self._heads.move_to_end(key)
+                self.hits += 1
+                return self._heads[key]
+        head = self.build(class_obj, m)
+        with self._lock:
+            self.misses += 1
+        return self._put(key, head)
+
+    def snapshot(self):
+        with self._lock:
+            return {"resident": len(self._heads), "capacity": self.capacity,
+                    "hits": self.hits, "misses": self.misses}
+
+
+HEADS = HeadCache(capacity=int(os.getenv("HEAD_CACHE_SIZE", "512")))
@@ -0,0 +1,34 @@
+"""
+Conditional GET helpers for the list endpoints: strong ETags and 304 responses.
+"""
+import hashlib
+from collections.abc import Callable
+
+from fastapi import Request, Response
+
+# Clients must revalidate, which is cheap when the ETag still matches.
+CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the values (or bytes) a response is derived from."""
+    raw = parts[0] if len(parts) == 1 and isinstance(parts[0], bytes) else repr(parts).encode()
+    return f'"{hashlib.sha256(raw).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def conditional(request: Request, etag: str, render: Callable[[], Response]) -> Response:
+    """Answer 304 when the client already holds `etag`; only render the body otherwise."""
+    headers = {"ETag": etag, **CACHE_HEADERS}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response = render()
+    response.headers.update(headers)
+    return response
@@ -0,0 +1,162 @@
+"""
+Prometheus instrumentation for the serve app: per-route HTTP metrics, GC pauses,
+admission gauges, event-loop lag. Process metrics (RSS, open fds, CPU) come from prometheus_client's
+default process collector. Mirrors backend/app/api/metrics.py.
+"""
+import gc
+import time
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, SummaryMetricFamily
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by method, route and status.", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route.",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+# Only touched on the event loop thread, so a plain int avoids the gauge's lock per request.
+_in_flight = [0]
+HTTP_IN_FLIGHT.set_function(lambda: _in_flight[0])
+
+# (method, route, status) -> bound children; labels() lookups are the costly part.
+_series = {}
+
+
+def _bound_series(method, route, status):
+    key = (method, route, status)
+    series = _series.get(key)
+    if series is None:
+        series = (HTTP_REQUESTS.labels(method, route, str(status)), HTTP_LATENCY.labels(method, route))
+        _series[key] = series
+    return series
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; labels by route template, read after routing has run."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_flight[0] += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_flight[0] -= 1
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            requests, latency = _bound_series(scope["method"], route, status)
+            requests.inc()
+            latency.observe(elapsed)
+
+
+class GCPauseCollector:
+    """Times collections via gc.callbacks. The callback only touches plain lists, since
+    metric objects take a non-reentrant lock that a collection could interrupt."""
+
+    def __init__(self):
+        self._started = 0.0
+        self.count = [0, 0, 0]
+        self.seconds = [0.0, 0.0, 0.0]
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self._started = time.perf_counter()
+        else:
+            generation = info["generation"]
+            self.count[generation] += 1
+            self.seconds[generation] += time.perf_counter() - self._started
+
+    def collect(self):
+        pauses = SummaryMetricFamily(
+            "python_gc_pause_seconds",
+            "Stop-the-world garbage collection pauses by generation.",
+            labels=["generation"],
+        )
+        for generation in range(3):
+            pauses.add_metric([str(generation)], self.count[generation], self.seconds[generation])
+        yield pauses
+
+
+class AdmissionCollector:
+    """Exports admission controller snapshots at scrape time."""
+
+    def __init__(self, controllers):
+        self.controllers = controllers
+
+    def collect(self):
+        in_flight = GaugeMetricFamily("harv_admission_in_flight", "Admitted inferences running.", labels=["pool"])
+        waiting = GaugeMetricFamily("harv_admission_waiting", "Requests waiting for an inference slot.", labels=["pool"])
+        admitted = CounterMetricFamily("harv_admission_admitted", "Requests admitted to inference.", labels=["pool"])
+        shed = CounterMetricFamily("harv_admission_shed", "Requests shed by reason.", labels=["pool", "reason"])
+        for pool, controller in self.controllers.items():
+            snapshot = controller.snapshot()
+            in_flight.add_metric([pool], snapshot["in_flight"])
+            waiting.add_metric([pool], snapshot["waiting"])
+            admitted.add_metric([pool], snapshot["admitted"])
+            shed.add_metric([pool, "queue_full"], snapshot["shed_queue_full"])
+            shed.add_metric([pool, "wait_timeout"], snapshot["shed_wait_timeout"])
+        yield from (in_flight, waiting, admitted, shed)
+
+
+class LoopCollector:
+    """Exports event-loop lag and blocking-executor occupancy at scrape time."""
+
+    def __init__(self, monitor, executors):
+        self.monitor = monitor
+        self.executors = executors
+
+    def collect(self):
+        lag = GaugeMetricFamily("harv_event_loop_lag_seconds", "Lateness of the last loop-lag probe.")
+        lag.add_metric([], self.monitor.last_s)
+        stalls = CounterMetricFamily(
+            "harv_event_loop_stalls", "Loop-lag probes over the stall threshold."
+        )
+        stalls.add_metric([], self.monitor.stalls)
+        pending = GaugeMetricFamily(
+            "harv_executor_pending", "Calls submitted to a blocking executor.", labels=["pool"]
+        )
+        shed = CounterMetricFamily(
+            "harv_executor_shed", "Calls shed because an executor was saturated.", labels=["pool"]
+        )
+        for name, pool in self.executors.items():
+            pending.add_metric([name], pool.pending)
+            shed.add_metric([name], pool.shed)
+        yield from (lag, stalls, pending, shed)
+
+
+_gc_pauses = GCPauseCollector()
+_registered = False
+
+
+def install(admission_controllers, loop_monitor=None, executors=None):
+    """Register process-level collectors once per worker."""
+    global _registered
+    if _registered:
+        return
+    gc.callbacks.append(_gc_pauses)
+    REGISTRY.register(_gc_pauses)
+    REGISTRY.register(AdmissionCollector(admission_controllers))
+    if loop_monitor is not None:
+        REGISTRY.register(LoopCollector(loop_monitor, executors or {}))
+    _registered = True
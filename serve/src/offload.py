@@ -0,0 +1,127 @@
+"""
+Bounded executors for blocking work reached from async handlers, plus a monitor that
+reports when the event loop stalls anyway.
+
+Each kind of blocking work gets its own pool so one cannot starve another: a slow
+geolocation provider ties up GEO_POOL threads, not the ones serving database reads.
+Callers beyond a pool's pending limit are shed with Overloaded instead of piling up in
+the executor's unbounded work queue.
+"""
+import asyncio
+import contextlib
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .admission import VISION_ADMISSION, Overloaded
+
+
+class Offload:
+    """A named thread pool with a cap on submitted-but-unfinished calls."""
+
+    def __init__(self, name, workers, max_pending):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0  # only touched on the event loop thread
+        self.shed = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"harv-{name}")
+
+    async def run(self, fn, *args, **kwargs):
+        if self.pending >= self.max_pending:
+            self.shed += 1
+            raise Overloaded(429, 1, f"{self.name} executor is saturated")
+        loop = asyncio.get_running_loop()
+        future = self.executor.submit(functools.partial(fn, *args, **kwargs))
+        self.pending += 1
+        # Released when the call really finishes: a cancelled caller stops waiting, but a
+        # call already running on a worker keeps its thread until it returns.
+        future.add_done_callback(lambda _: self._release_on(loop))
+        return await asyncio.wrap_future(future)
+
+    def _release_on(self, loop):
+        # Runs on the worker thread. Calls finishing after shutdown closed the loop have
+        # nothing left to account to; the loop can also close between check and call.
+        if loop.is_closed():
+            return
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(self._release)
+
+    def _release(self):
+        self.pending -= 1
+
+    def snapshot(self):
+        return {"workers": self.workers, "pending": self.pending, "max_pending": self.max_pending, "shed": self.shed}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LoopLagMonitor:
+    """Sleeps for a fixed interval and measures how late the loop wakes it up.
+
+    Any lateness is time the loop spent running something else without yielding, i.e.
+    blocking work that escaped the executors. Stalls over the threshold are logged.
+    """
+
+    def __init__(self, interval_s=0.25, threshold_s=0.1):
+        self.interval_s = interval_s
+        self.threshold_s = threshold_s
+        self.last_s = 0.0
+        self.max_s = 0.0
+        self.stalls = 0
+        self.stalled_s = 0.0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            lag = max(0.0, time.perf_counter() - started - self.interval_s)
+            self.last_s = lag
+            self.max_s = max(self.max_s, lag)
+            if lag > self.threshold_s:
+                self.stalls += 1
+                self.stalled_s += lag
+                print(f"Event loop stalled for {lag * 1000:.0f} ms", flush=True)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self):
+        return {
+            "last_ms": round(self.last_s * 1000, 2),
+            "max_ms": round(self.max_s * 1000, 2),
+            "stalls": self.stalls,
+            "threshold_ms": round(self.threshold_s * 1000, 2),
+        }
+
+
+# Outbound geolocation HTTP calls (requests, up to a 5 s timeout each).
+GEO_POOL = Offload("geo", int(os.getenv("GEO_WORKERS", "8")), int(os.getenv("GEO_MAX_PENDING", "64")))
+# JSON-file / Firestore database access and calibration and attempt-log files.
+IO_POOL = Offload("io", int(os.getenv("IO_WORKERS", "4")), int(os.getenv("IO_MAX_PENDING", "256")))
+# Decode and inference. One thread per admission slot or queue position, so callers wait
+# in the admission controller (which knows when to shed) rather than in the executor.
+_VISION_THREADS = VISION_ADMISSION.max_in_flight + VISION_ADMISSION.max_queue
+VISION_POOL = Offload("vision", _VISION_THREADS, _VISION_THREADS)
+# Base64 and image decoding for /verify/batch; cv2 releases the GIL, so this scales with cores.
+DECODE_POOL = Offload(
+    "decode",
+    int(os.getenv("DECODE_WORKERS", str(os.cpu_count() or 4))),
+    int(os.getenv("DECODE_MAX_PENDING", "256")),
+)
+
+EXECUTORS = {pool.name: pool for pool in (GEO_POOL, IO_POOL, VISION_POOL, DECODE_POOL)}
+
+LOOP_MONITOR = LoopLagMonitor(
+    interval_s=float(os.getenv("LOOP_LAG_INTERVAL_S", "0.25")),
+    threshold_s=float(os.getenv("LOOP_LAG_THRESHOLD_S", "0.1")),
+)
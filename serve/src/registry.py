@@ -0,0 +1,280 @@
+"""
+Versioned model registry for the serve app.
+
+Each version is a directory under MODEL_ROOT holding model.torchscript.pt and
+metadata.json, as written by export (export/src/export.py), which also points ACTIVE at
+its new version unless export_promote is off. The active version comes from the ACTIVE pointer
+file in MODEL_ROOT, then the MODEL_VERSION env var, then the last version by name. The
+legacy single-model directory is served as version "default" when nothing else exists.
+
+Versions load lazily and are warmed before they can serve. Switching (admin endpoint
+or rewriting ACTIVE) loads the target first and then swaps one attribute, so requests
+already holding a model finish on it. At most MODEL_CACHE_SIZE versions stay resident.
+"""
+import base64
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+MODEL_ROOT = Path(os.getenv("MODEL_ROOT", "/app/artifacts/models"))
+LEGACY_MODEL_DIR = Path("/app/artifacts/model")
+MODEL_FILE = "model.torchscript.pt"
+POINTER_FILE = "ACTIVE"
+# Exports since the preprocessing move take cv2's uint8 BGR HWC output directly.
+RAW_INPUT_FORMAT = "uint8_bgr_hwc"
+
+
+class LoadedModel:
+    """One resident version: the TorchScript module plus what is needed to feed it."""
+
+    def __init__(self, version, path, module, meta, backbone=None):
+        self.version = version
+        self.path = path
+        self.module = module
+        self.meta = meta
+        # Pooled-feature graph for per-class room matching; absent in older exports.
+        self.backbone = backbone
+        self.img_size = meta.get("img_size", 224)
+        self.classes = meta.get("classes", ["ProfA", "Room1"])
+        self.raw_input = meta.get("input") == RAW_INPUT_FORMAT
+
+    def decode(self, image_b64, fit=None):
+        """Base64 photo -> HWC uint8 BGR image, or None if undecodable.
+        fit=True resizes to the model size (needed to stack a batch), False keeps full
+        resolution, None resizes only when the export cannot (legacy models)."""
+        img_bytes = base64.b64decode(image_b64)
+        img = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return None
+        if fit or (fit is None and not self.raw_input):
+            img = self.fit(img)
+        return img
+
+    def prepare(self, img, fit=False):
+        """Full-resolution image -> model-ready image, see decode for fit."""
+        return self.fit(img) if fit or not self.raw_input else img
+
+    def fit(self, img):
+        """Resize to the model size. INTER_AREA is cv2's antialiased downscale, closest to
+        the PIL resize used in training."""
+        return cv2.resize(img, (self.img_size, self.img_size), interpolation=cv2.INTER_AREA)
+
+    def to_batch(self, imgs):
+        """Decoded images -> model input tensor."""
+        if self.raw_input:
+            # Zero-copy view of the decoded pixels; the graph does the rest.
+            if len(imgs) == 1:
+                return torch.from_numpy(imgs[0]).unsqueeze(0)
+            return torch.from_numpy(np.stack(imgs))
+        batch = np.stack(imgs).transpose(0, 3, 1, 2)
+        return torch.from_numpy(batch).float() / 255.0
+
+    def predict(self, imgs):
+        """One forward pass -> [(label, confidence)]."""
+        with torch.no_grad():
+            conf, pred = torch.softmax(self.module(self.to_batch(imgs)), dim=1).max(dim=1)
+        return [(self.classes[int(p)], float(c)) for p, c in zip(pred.tolist(), conf.tolist(), strict=True)]
+
+    def embed(self, imgs):
+        """One backbone pass -> (N, D) float32 embeddings with unit L2 norm."""
+        with torch.no_grad():
+            features = torch.nn.functional.normalize(self.backbone(self.to_batch(imgs)), dim=1)
+        return features.numpy()
+
+    def warmup(self, runs):
+        # The JIT profiles and specializes over the first couple of calls; pay that
+        # before the version takes traffic.
+        if self.raw_input:
+            dummy = torch.zeros((1, self.img_size, self.img_size, 3), dtype=torch.uint8)
+        else:
+            dummy = torch.zeros((1, 3, self.img_size, self.img_size))
+        with torch.no_grad():
+            for _ in range(runs):
+                self.module(dummy)
+                if self.backbone is not None:
+                    self.backbone(dummy)
+
+
+def _load_module(path, optimize):
+    """Load a TorchScript file for CPU inference. Optimized exports are saved frozen and
+    optimized here: the MKLDNN constants optimize_for_inference bakes in do not survive
+    torch.jit.save."""
+    module = torch.jit.load(str(path), map_location="cpu")
+    module.eval()
+    return torch.jit.optimize_for_inference(module) if optimize else module
+
+
+class ModelRegistry:
+    # A version that failed to load is not retried on every request.
+    RETRY_LOAD_S = 30.0
+
+    def __init__(self, root, legacy_dir=None, capacity=2, warmup_runs=2, poll_s=5.0):
+        self.root = Path(root)
+        self.legacy_dir = Path(legacy_dir) if legacy_dir else None
+        self.capacity = max(1, capacity)
+        self.warmup_runs = warmup_runs
+        self.poll_s = poll_s
+        self.active_version = None
+        self.load_errors = {}
+        self._failed_at = {}
+        self._resident = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._pointer_mtime = None
+        self._next_poll = 0.0
+
+    def available(self):
+        """version -> directory for every loadable version on disk."""
+        versions = {}
+        if self.root.is_dir():
+            for path in sorted(self.root.iterdir()):
+                # Hidden entries are exports still being staged.
+                if not path.name.startswith(".") and (path / MODEL_FILE).exists():
+                    versions[path.name] = path
+        if not versions and self.legacy_dir and (self.legacy_dir / MODEL_FILE).exists():
+            versions["default"] = self.legacy_dir
+        return versions
+
+    def _read_pointer(self):
+        pointer = self.root / POINTER_FILE
+        try:
+            mtime = pointer.stat().st_mtime_ns
+        except OSError:
+            return None, None
+        return pointer.read_text().strip() or None, mtime
+
+    def _resolve_active(self):
+        version, self._pointer_mtime = self._read_pointer()
+        version = version or os.getenv("MODEL_VERSION")
+        if not version:
+            versions = self.available()
+            version = next(reversed(versions), None) if versions else None
+        return version
+
+    def _poll_pointer(self):
+        """Follow ACTIVE when an operator rewrites it; checked at most every poll_s."""
+        self._next_poll = time.monotonic() + self.poll_s
+        version, mtime = self._read_pointer()
+        if mtime == self._pointer_mtime or not version:
+            return
+        self._pointer_mtime = mtime
+        if version != self.active_version:
+            try:
+                self.activate(version, persist=False)
+            except (KeyError, RuntimeError) as e:
+                print(f"Model pointer names unusable version {version}: {e}", flush=True)
+
+    def _load(self, version):
+        path = self.available().get(version)
+        if path is None:
+            raise KeyError(version)
+        meta_path = path / "metadata.json"
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        optimize = meta.get("export", {}).get("optimize_for_inference", False)
+        module = _load_module(path / MODEL_FILE, optimize)
+        backbone = None
+        backbone_file = meta.get("backbone", {}).get("file")
+        if backbone_file and (path / backbone_file).exists():
+            backbone = _load_module(path / backbone_file, optimize)
+        loaded = LoadedModel(version, path, module, meta, backbone)
+        loaded.warmup(self.warmup_runs)
+        return loaded
+
+    def get(self, version):
+        """Resident model for a version, loading and warming it on first use."""
+        with self._lock:
+            loaded = self._resident.get(version)
+            if loaded is not None:
+                self._resident.move_to_end(version)
+                return loaded
+        with self._load_lock:
+            with self._lock:
+                loaded = self._resident.get(version)
+            if loaded is None:
+                failed_at = self._failed_at.get(version)
+                if failed_at is not None and time.monotonic() - failed_at < self.RETRY_LOAD_S:
+                    raise RuntimeError(f"failed to load model {version}: {self.load_errors[version]}")
+                started = time.perf_counter()
+                try:
+                    loaded = self._load(version)
+                except KeyError:
+                    raise
+                except Exception as e:
+                    self.load_errors[version] = str(e)
+                    self._failed_at[version] = time.monotonic()
+                    raise RuntimeError(f"failed to load model {version}: {e}") from e
+                self.load_errors.pop(version, None)
+                self._failed_at.pop(version, None)
+                print(f"Loaded model {version} in {(time.perf_counter() - started) * 1000:.0f} ms", flush=True)
+            with self._lock:
+                self._resident[version] = loaded
+                self._resident.move_to_end(version)
+                while len(self._resident) > self.capacity:
+                    evicted, _ = self._resident.popitem(last=False)
+                    print(f"Evicted model {evicted}", flush=True)
+        return loaded
+
+    def current(self):
+        """Active model, or None when no version is usable. Callers should hold on to the
+        returned object for the whole request so a switch cannot change it midway."""
+        if time.monotonic() >= self._next_poll:
+            self._poll_pointer()
+        if self.active_version is None:
+            self.active_version = self._resolve_active()
+            if self.active_version is None:
+                return None
+        try:
+            return self.get(self.active_version)
+        except (KeyError, RuntimeError) as e:
+            print(f"Active model {self.active_version} unavailable: {e}", flush=True)
+            return None
+
+    def activate(self, version, persist=True):
+        """Load and warm a version, then make it active. With persist, ACTIVE is rewritten
+        atomically so other workers and restarts follow."""
+        self.get(version)
+        self.active_version = version
+        if persist:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.root / f".{POINTER_FILE}.tmp"
+            tmp.write_text(version + "\n")
+            os.replace(tmp, self.root / POINTER_FILE)
+            self._pointer_mtime = (self.root / POINTER_FILE).stat().st_mtime_ns
+        return version
+
+    def preload(self):
+        """Load the active version in the background so the first request finds it warm."""
+        threading.Thread(target=self.current, name="model-preload", daemon=True).start()
+
+    def active_name(self):
+        """Architecture name of the active version if it is resident; never triggers a load."""
+        with self._lock:
+            loaded = self._resident.get(self.active_version)
+        return loaded.meta.get("model") if loaded else None
+
+    def snapshot(self):
+        with self._lock:
+            resident = list(self._resident)
+        return {
+            "active": self.active_version,
+            "resident": resident,
+            "available": list(self.available()),
+            "capacity": self.capacity,
+            "load_errors": dict(self.load_errors),
+        }
+
+
+REGISTRY = ModelRegistry(
+    MODEL_ROOT,
+    legacy_dir=LEGACY_MODEL_DIR,
+    capacity=int(os.getenv("MODEL_CACHE_SIZE", "2")),
+    warmup_runs=int(os.getenv("MODEL_WARMUP_RUNS", "2")),
+    poll_s=float(os.getenv("MODEL_POINTER_POLL_S", "5")),
+)
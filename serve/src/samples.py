@@ -0,0 +1,103 @@
+"""
+Sampled capture of /verify responses, kept off the request path.
+
+Every response lands in an in-memory ring buffer (served by /debug/samples). A
+configurable fraction is also queued for a background thread that appends JSON lines
+to a size-rotated file; request threads never touch the disk.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+
+SAMPLE_DIR = Path(os.getenv("SAMPLE_DIR", "/app/artifacts/samples"))
+
+
+class _JSONLines(logging.Formatter):
+    def format(self, record):
+        return json.dumps(record.msg)
+
+
+class ResponseSampler:
+    def __init__(self, path: Path, ring_size: int = 200, sample_rate: float = 0.01,
+                 max_bytes: int = 5_000_000, backups: int = 3, max_pending: int = 10_000):
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.recent = deque(maxlen=ring_size)
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.recorded = 0
+        self.sampled = 0
+        self.dropped = 0
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def record(self, response: dict):
+        """O(1) and lock-free for the caller: a deque append plus, when sampled, a queue put."""
+        entry = {"ts": time.time(), **response}
+        self.recent.append(entry)
+        self.recorded += 1
+        if random.random() >= self.sample_rate:
+            return
+        try:
+            self.pending.put_nowait(logging.makeLogRecord({"msg": entry}))
+            self.sampled += 1
+        except queue.Full:
+            # Writer fell behind; losing samples beats blocking requests.
+            self.dropped += 1
+
+    def latest(self, limit: int | None = None) -> list:
+        items = list(self.recent)
+        return items[-limit:] if limit else items
+
+    def start(self):
+        """Start the background writer; a no-op when already running or the disk is unusable."""
+        with self._lock:
+            if self._listener is not None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            except (OSError, PermissionError):
+                # Running outside Docker or on a read-only filesystem: keep the ring buffer only.
+                return
+            handler = RotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backups, delay=True
+            )
+            handler.setFormatter(_JSONLines())
+            self._listener = QueueListener(self.pending, handler)
+            self._listener.start()
+
+    def stop(self):
+        """Flush queued samples and stop the writer."""
+        with self._lock:
+            if self._listener is None:
+                return
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+    def stats(self) -> dict:
+        return {
+            "recorded": self.recorded,
+            "sampled": self.sampled,
+            "dropped": self.dropped,
+            "sample_rate": self.sample_rate,
+            "file": str(self.path),
+        }
+
+
+VERIFY_SAMPLES = ResponseSampler(
+    SAMPLE_DIR / "verify_responses.jsonl",
+    ring_size=int(os.getenv("SAMPLE_RING_SIZE", "200")),
+    sample_rate=float(os.getenv("SAMPLE_RATE", "0.01")),
+    max_bytes=int(os.getenv("SAMPLE_MAX_BYTES", "5000000")),
+    backups=int(os.getenv("SAMPLE_BACKUPS", "3")),
+)
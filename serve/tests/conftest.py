@@ -0,0 +1,15 @@
+"""Shared setup for serve tests.
+
+The serve modules read their environment at import, so file-backed state is pointed at
+a scratch directory here, before any test imports them.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+
+_SCRATCH = tempfile.mkdtemp(prefix="harv-serve-tests-")
+os.environ.setdefault("DB_PATH", os.path.join(_SCRATCH, "db"))
+os.environ.setdefault("MODEL_ROOT", os.path.join(_SCRATCH, "models"))
+os.environ.setdefault("SAMPLE_DIR", os.path.join(_SCRATCH, "samples"))
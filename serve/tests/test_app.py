@@ -0,0 +1,194 @@
+"""Serve app tests cover check-in ordering of geolocation and vision work, shedding
+under load, and how /verify/batch reports failures."""
+
+from __future__ import annotations
+
+import base64
+import threading
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("torch")
+pytest.importorskip("requests")
+
+import numpy as np  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from serve.src import app as serve_app  # noqa: E402
+from serve.src import database as db  # noqa: E402
+from serve.src.admission import AdmissionController  # noqa: E402
+
+CLASS = {
+    "name": "CS50",
+    "code": "CS50",
+    "lat": 42.3770,
+    "lon": -71.1167,
+    "epsilon_m": 50.0,
+    "secret_word": "harvard",
+    "room_photos": [],
+}
+
+
+class FakeModel:
+    """Stands in for a LoadedModel: a blank frame per photo, a fixed prediction.
+    Photos "blank" and "boom" decode to None and raise a server-side error."""
+
+    version = "test"
+    backbone = None
+
+    def __init__(self, decode_delay_s: float = 0.0):
+        self.decode_delay_s = decode_delay_s
+        self.decoded = 0
+        self.predicted = 0
+        self.decoding = threading.Event()
+
+    def decode(self, image_b64, fit=None):
+        raw = base64.b64decode(image_b64)
+        self.decoded += 1
+        self.decoding.set()
+        threading.Event().wait(self.decode_delay_s)
+        if raw == b"boom":
+            raise RuntimeError("decoder crashed")
+        if raw == b"blank":
+            return None
+        return np.zeros((32, 32, 3), dtype=np.uint8)
+
+    def prepare(self, img, fit=False):
+        return img
+
+    def fit(self, img):
+        return img
+
+    def predict(self, imgs):
+        self.predicted += 1
+        return [("Room1", 0.9)] * len(imgs)
+
+
+@pytest.fixture(name="client")
+def fixture_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "CLASSES_FILE", tmp_path / "classes.json")
+    monkeypatch.setattr(db, "ENROLLMENTS_FILE", tmp_path / "enrollments.json")
+    monkeypatch.setattr(db, "CHECKINS_FILE", tmp_path / "checkins.json")
+    monkeypatch.setattr(db, "ROOM_PHOTOS_DIR", tmp_path / "room_photos")
+    monkeypatch.setattr(serve_app, "face_crops", lambda img: [])
+    db.create_class(CLASS)
+    db.enroll_student("CS50", "student")
+    # No context manager: startup and shutdown hooks would start and stop the shared pools.
+    return TestClient(serve_app.app)
+
+
+def use_model(monkeypatch, model: FakeModel) -> FakeModel:
+    monkeypatch.setattr(serve_app.REGISTRY, "current", lambda: model)
+    return model
+
+
+def b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode()
+
+
+def checkin(client: TestClient, **position) -> dict:
+    body = {"class_code": "CS50", "student_id": "student", "image_b64": "aGFydg==", **position}
+    return client.post("/student/checkin", json=body).json()
+
+
+def test_rejected_client_gps_never_starts_vision_work(client, monkeypatch):
+    model = use_model(monkeypatch, FakeModel())
+
+    for _ in range(5):
+        result = checkin(client, lat=42.40, lon=-71.1167)
+        assert result["reason"] == "location_failed"
+
+    assert model.decoded == 0
+    assert model.predicted == 0
+    assert [c["reason"] for c in db.get_class_checkins("CS50")] == ["location_failed"] * 5
+
+
+def test_accepted_client_gps_runs_vision(client, monkeypatch):
+    model = use_model(monkeypatch, FakeModel())
+
+    result = checkin(client, lat=CLASS["lat"], lon=CLASS["lon"])
+
+    assert result["ok"] is True
+    assert result["label"] == "Room1"
+    assert model.predicted == 1
+
+
+def test_failed_ip_lookup_skips_inference_of_the_started_vision_job(client, monkeypatch):
+    model = use_model(monkeypatch, FakeModel(decode_delay_s=0.2))
+    # The lookup fails only once the vision job is decoding on a worker thread.
+    monkeypatch.setattr(serve_app.PROVIDER, "locate", lambda ip: model.decoding.wait(5) and None)
+    finished = threading.Event()
+    outcomes = []
+    verify_room = serve_app.verify_room
+
+    def observed_verify_room(*args):
+        try:
+            outcomes.append(verify_room(*args))
+        finally:
+            finished.set()
+
+    monkeypatch.setattr(serve_app, "verify_room", observed_verify_room)
+    admitted = serve_app.VISION_ADMISSION.snapshot()["admitted"]
+
+    result = checkin(client)
+
+    assert result["reason"] == "location_failed"
+    assert finished.wait(5)
+    assert outcomes == [None]
+    assert model.decoded == 1
+    assert model.predicted == 0
+    assert serve_app.VISION_ADMISSION.snapshot()["admitted"] == admitted
+
+
+def test_batch_reports_only_undecodable_photos_as_bad_images(client, monkeypatch):
+    use_model(monkeypatch, FakeModel())
+    images = [b64(b"photo"), "not base64!", b64(b"blank")]
+
+    result = client.post("/verify/batch", json={"images_b64": images}).json()
+
+    assert [r["ok"] for r in result["results"]] == [True, False, False]
+    assert [r.get("reason") for r in result["results"]] == [None, "bad_image", "bad_image"]
+
+
+def test_batch_server_errors_are_not_reported_as_bad_images(client, monkeypatch, caplog):
+    use_model(monkeypatch, FakeModel())
+    images = [b64(b"photo"), b64(b"boom")]
+
+    response = client.post("/verify/batch", json={"images_b64": images})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["ok"] is True
+    assert results[1] == {"index": 1, "ok": False, "reason": "server_error"}
+    assert "verify/batch: image 1 failed" in caplog.text
+
+
+@pytest.mark.parametrize(
+    ("max_queue", "status", "reason"),
+    [(0, 429, "inference_queue_full"), (1, 503, "inference_wait_timeout")],
+)
+def test_saturated_inference_sheds_with_retry_after(client, monkeypatch, max_queue, status, reason):
+    use_model(monkeypatch, FakeModel())
+    saturated = AdmissionController(max_in_flight=1, max_queue=max_queue, max_wait_s=0.05)
+    monkeypatch.setattr(serve_app, "VISION_ADMISSION", saturated)
+
+    with saturated.admit():
+        response = client.post("/verify", json={"image_b64": b64(b"photo")})
+
+    assert response.status_code == status
+    assert response.json() == {"ok": False, "reason": reason}
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_debug_samples_need_the_admin_token(client, monkeypatch):
+    monkeypatch.setattr(serve_app, "ADMIN_TOKEN", None)
+    assert client.get("/debug/samples").status_code == 403
+
+    monkeypatch.setattr(serve_app, "ADMIN_TOKEN", "secret")
+    assert client.get("/debug/samples").status_code == 401
+    assert client.get("/debug/samples", headers={"X-Admin-Token": "wrong"}).status_code == 401
+
+    response = client.get("/debug/samples", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert set(response.json()) == {"stats", "samples"}
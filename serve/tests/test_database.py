@@ -0,0 +1,57 @@
+"""JSON database tests cover concurrent writers, unreadable files and stored embeddings."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from serve.src import database as db
+
+
+@pytest.fixture(autouse=True)
+def scratch_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "CLASSES_FILE", tmp_path / "classes.json")
+    monkeypatch.setattr(db, "ENROLLMENTS_FILE", tmp_path / "enrollments.json")
+    monkeypatch.setattr(db, "CHECKINS_FILE", tmp_path / "checkins.json")
+    monkeypatch.setattr(db, "ROOM_PHOTOS_DIR", tmp_path / "room_photos")
+    monkeypatch.setattr(db, "EMBEDDINGS_DIR", tmp_path / "embeddings")
+
+
+def checkin(index: int) -> dict:
+    return {"class_code": "CS50", "student_id": f"student-{index}", "success": True}
+
+
+def test_concurrent_checkins_are_all_kept():
+    db.save_json(db.CHECKINS_FILE, [checkin(index) for index in range(300)])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(db.record_checkin, (checkin(300 + index) for index in range(200))))
+
+    assert len(db.get_class_checkins("CS50")) == 500
+    assert not list(db.CHECKINS_FILE.parent.glob("*.tmp"))
+
+
+def test_unreadable_file_raises_instead_of_reading_as_empty():
+    db.record_checkin(checkin(0))
+    db.CHECKINS_FILE.write_text('[{"class_code": "CS50"')
+
+    with pytest.raises(json.JSONDecodeError):
+        db.record_checkin(checkin(1))
+
+    assert db.CHECKINS_FILE.read_text() == '[{"class_code": "CS50"'
+
+
+def test_concurrent_embedding_writers_each_leave_a_whole_file():
+    matrices = [np.full((3, 8), value, dtype=np.float32) for value in range(16)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda matrix: db.save_room_embeddings("class", "v1", matrix), matrices))
+
+    stored = db.load_room_embeddings("class", "v1")
+    assert stored.dtype == np.float16
+    assert stored.shape == (3, 8)
+    assert len(np.unique(stored)) == 1
+    assert not list(db.EMBEDDINGS_DIR.glob("*.tmp"))
@@ -0,0 +1,64 @@
+"""Face cropping tests cover the per-thread cascade and mapping detector boxes back to
+the full-resolution frame."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("cv2")
+
+import numpy as np  # noqa: E402
+
+from serve.src import faces  # noqa: E402
+
+
+class FixedCascade:
+    """Reports the given boxes on whatever (downscaled) image it is shown."""
+
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.seen = None
+
+    def detectMultiScale(self, gray, scale_factor, min_neighbors):  # noqa: N802
+        self.seen = gray.shape
+        return np.array(self.boxes)
+
+
+def test_each_thread_builds_and_keeps_its_own_cascade():
+    with ThreadPoolExecutor(max_workers=1) as first, ThreadPoolExecutor(max_workers=1) as second:
+        a1, a2 = first.submit(faces._cascade).result(), first.submit(faces._cascade).result()
+        b = second.submit(faces._cascade).result()
+
+    assert a1 is a2
+    assert a1 is not b
+    assert faces.detect_faces(np.zeros((48, 64, 3), dtype=np.uint8)) == []
+
+
+def test_boxes_are_scaled_back_to_the_full_frame_largest_first(monkeypatch):
+    cascade = FixedCascade([(10, 10, 20, 20), (100, 50, 40, 40)])
+    monkeypatch.setattr(faces, "_cascade", lambda: cascade)
+    monkeypatch.setattr(faces, "DETECT_MAX_SIDE", 320)
+
+    boxes = faces.detect_faces(np.zeros((480, 640, 3), dtype=np.uint8))
+
+    assert cascade.seen == (240, 320)
+    assert boxes == [(200, 100, 80, 80), (20, 20, 40, 40)]
+
+
+def test_crops_are_views_of_the_frame(monkeypatch):
+    monkeypatch.setattr(faces, "_cascade", lambda: FixedCascade([(4, 2, 8, 6)]))
+    monkeypatch.setattr(faces, "FACE_CROP_ENABLED", True)
+    img = np.arange(20 * 30 * 3, dtype=np.uint8).reshape(20, 30, 3)
+
+    (crop,) = faces.face_crops(img)
+
+    assert crop.shape == (6, 8, 3)
+    assert np.shares_memory(crop, img)
+
+
+def test_disabled_cropping_finds_nothing(monkeypatch):
+    monkeypatch.setattr(faces, "FACE_CROP_ENABLED", False)
+
+    assert faces.face_crops(np.zeros((20, 30, 3), dtype=np.uint8)) == []
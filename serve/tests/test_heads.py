@@ -0,0 +1,87 @@
+"""Room-prototype cache tests cover keying by model version, LRU bounds and stored embeddings."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from serve.src import database as db
+from serve.src.heads import HeadCache, RoomPrototypes
+
+PHOTOS = ["photo-a", "photo-b"]
+
+
+class FakeModel:
+    """Embeds photo i as the unit vector e_i, and counts backbone passes."""
+
+    backbone = object()
+
+    def __init__(self, version="v1"):
+        self.version = version
+        self.embedded = 0
+
+    def decode(self, image_b64, fit=None):
+        return None if image_b64 == "broken" else PHOTOS.index(image_b64)
+
+    def embed(self, imgs):
+        self.embedded += 1
+        return np.eye(4, dtype=np.float32)[imgs]
+
+
+@pytest.fixture(autouse=True)
+def scratch_embeddings(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "EMBEDDINGS_DIR", tmp_path / "embeddings")
+
+
+def room(class_id="c1", photos=PHOTOS):
+    return {"id": class_id, "code": "CS50", "room_photos": photos}
+
+
+def test_prototypes_score_the_closest_room_photo():
+    head = RoomPrototypes(np.eye(4, dtype=np.float16)[:2])
+
+    assert head.score(np.array([0.0, 1.0, 0.0, 0.0], dtype=np.float32)) == pytest.approx(1.0)
+    assert head.score(np.array([0.0, 0.0, 1.0, 0.0], dtype=np.float32)) == pytest.approx(0.0)
+
+
+def test_heads_are_cached_per_class_and_model_version():
+    cache = HeadCache()
+    v1, v2 = FakeModel("v1"), FakeModel("v2")
+
+    first = cache.get(room(), v1)
+    assert cache.get(room(), v1) is first
+    assert cache.get(room(), v2) is not first
+
+    assert cache.snapshot() == {"resident": 2, "capacity": 512, "hits": 1, "misses": 2}
+    assert (v1.embedded, v2.embedded) == (1, 1)
+
+
+def test_stored_embeddings_are_reused_instead_of_embedding_again():
+    m = FakeModel()
+    HeadCache().precompute(room(), PHOTOS, m)
+
+    head = HeadCache().get(room(), m)
+
+    assert m.embedded == 1
+    assert head.matrix.shape == (2, 4)
+
+
+def test_least_recently_used_head_is_evicted():
+    cache = HeadCache(capacity=2)
+    m = FakeModel()
+
+    for class_id in ("c1", "c2", "c1", "c3"):
+        cache.get(room(class_id), m)
+    cache.get(room("c1"), m)
+
+    # c2 went when c3 arrived, so c1 was still resident.
+    assert cache.snapshot() == {"resident": 2, "capacity": 2, "hits": 2, "misses": 3}
+
+
+def test_no_head_without_a_backbone_or_usable_photos():
+    cache = HeadCache()
+    no_backbone = FakeModel()
+    no_backbone.backbone = None
+
+    assert cache.get(room(), no_backbone) is None
+    assert cache.get(room("c2", photos=["broken"]), FakeModel()) is None
@@ -0,0 +1,40 @@
+"""Admission tests cover shedding with 429 on a full queue and 503 on a timed-out wait."""
+
+from __future__ import annotations
+
+import pytest
+
+from serve.src.admission import AdmissionController, Overloaded
+
+
+def test_full_queue_sheds_with_429():
+    controller = AdmissionController(max_in_flight=1, max_queue=0, max_wait_s=1.0)
+
+    with controller.admit(), pytest.raises(Overloaded) as excinfo, controller.admit():
+        pass
+
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.reason == "inference_queue_full"
+    assert excinfo.value.retry_after >= 1
+    assert controller.snapshot()["shed_queue_full"] == 1
+
+
+def test_exhausted_wait_sheds_with_503():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, max_wait_s=0.05)
+
+    with controller.admit(), pytest.raises(Overloaded) as excinfo, controller.admit():
+        pass
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.reason == "inference_wait_timeout"
+    assert excinfo.value.retry_after >= 1
+    assert controller.snapshot()["waiting"] == 0
+
+
+def test_retry_after_scales_with_backlog_and_service_time():
+    controller = AdmissionController(max_in_flight=2, max_queue=16, max_wait_s=1.0)
+    controller.service_s = 0.5
+
+    # Two slots draining every half second: four per second.
+    assert controller.retry_after(1) == 1
+    assert controller.retry_after(12) == 3
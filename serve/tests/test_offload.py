@@ -0,0 +1,79 @@
+"""Offload tests cover executor shedding and pending accounting across shutdown."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from serve.src.admission import Overloaded
+from serve.src.offload import Offload
+
+
+def test_calls_beyond_max_pending_are_shed_with_429():
+    pool = Offload("test", workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as excinfo:
+            await pool.run(lambda: None)
+        release.set()
+        await first
+        return excinfo.value
+
+    try:
+        shed = asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.executor.shutdown(wait=True)
+
+    assert shed.status_code == 429
+    assert shed.retry_after >= 1
+    assert pool.snapshot() == {"workers": 1, "pending": 0, "max_pending": 1, "shed": 1}
+
+
+def test_pending_is_held_until_a_cancelled_call_finishes():
+    pool = Offload("test", workers=1, max_pending=4)
+    release = threading.Event()
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0.01)
+        # The caller gave up, but the worker thread is still busy.
+        held = pool.pending
+        release.set()
+        while pool.pending:
+            await asyncio.sleep(0.01)
+        return held
+
+    try:
+        assert asyncio.run(scenario()) == 1
+    finally:
+        release.set()
+        pool.executor.shutdown(wait=True)
+
+
+def test_calls_finishing_after_the_loop_closed_are_silent(caplog):
+    pool = Offload("test", workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def abandon():
+        task = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(abandon())
+    loop.close()
+
+    with caplog.at_level(logging.ERROR, logger="concurrent.futures"):
+        release.set()
+        pool.executor.shutdown(wait=True)
+
+    assert not caplog.records
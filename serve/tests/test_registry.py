@@ -0,0 +1,116 @@
+"""Registry tests cover activation, LRU eviction, unknown versions and loading exports."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+pytest.importorskip("cv2")
+torch = pytest.importorskip("torch")
+
+import numpy as np  # noqa: E402
+from torch import nn  # noqa: E402
+
+from serve.src.registry import MODEL_FILE, POINTER_FILE, RAW_INPUT_FORMAT, ModelRegistry  # noqa: E402
+
+IMG_SIZE = 8
+
+
+class RawInputNet(nn.Module):
+    """uint8 BGR HWC batch -> two logits, with a conv and BatchNorm to optimize."""
+
+    def __init__(self):
+        super().__init__()
+        self.features = nn.Sequential(nn.Conv2d(3, 4, 3, padding=1), nn.BatchNorm2d(4), nn.ReLU())
+        self.head = nn.Linear(4, 2)
+
+    def forward(self, images: torch.Tensor) -> torch.Tensor:
+        x = images.permute(0, 3, 1, 2).float() / 255.0
+        return self.head(self.features(x).mean(dim=[2, 3]))
+
+
+def write_version(root, version, optimized=False):
+    """Save a version directory the way export does: frozen when optimized."""
+    path = root / version
+    path.mkdir(parents=True)
+    module = torch.jit.script(RawInputNet().eval())
+    if optimized:
+        module = torch.jit.freeze(module)
+    module.save(str(path / MODEL_FILE))
+    meta = {
+        "img_size": IMG_SIZE,
+        "classes": ["ProfA", "Room1"],
+        "input": RAW_INPUT_FORMAT,
+        "export": {"frozen": optimized, "optimize_for_inference": optimized},
+    }
+    (path / "metadata.json").write_text(json.dumps(meta))
+    return path
+
+
+@pytest.fixture(name="root")
+def fixture_root(tmp_path):
+    for version in ("v1", "v2", "v3"):
+        write_version(tmp_path, version)
+    return tmp_path
+
+
+def test_defaults_to_the_last_version_by_name(root):
+    registry = ModelRegistry(root, warmup_runs=0)
+
+    assert registry.current().version == "v3"
+
+
+def test_activate_switches_and_persists_the_pointer(root):
+    registry = ModelRegistry(root, warmup_runs=0)
+
+    registry.activate("v1")
+
+    assert registry.current().version == "v1"
+    assert (root / POINTER_FILE).read_text().strip() == "v1"
+    # A fresh registry (another worker, a restart) follows the pointer.
+    assert ModelRegistry(root, warmup_runs=0).current().version == "v1"
+
+
+def test_least_recently_used_version_is_evicted(root):
+    registry = ModelRegistry(root, capacity=2, warmup_runs=0)
+
+    first = registry.get("v1")
+    registry.get("v2")
+    assert registry.get("v1") is first
+    registry.get("v3")
+
+    assert registry.snapshot()["resident"] == ["v1", "v3"]
+    assert registry.get("v1") is first
+
+
+def test_unknown_version_is_rejected_without_switching(root):
+    registry = ModelRegistry(root, warmup_runs=0)
+    registry.activate("v2")
+
+    with pytest.raises(KeyError):
+        registry.activate("v9")
+
+    assert registry.active_version == "v2"
+    assert (root / POINTER_FILE).read_text().strip() == "v2"
+    assert "v9" not in registry.load_errors
+
+
+def test_frozen_export_is_optimized_on_load_and_predicts(tmp_path):
+    write_version(tmp_path, "v1", optimized=True)
+    registry = ModelRegistry(tmp_path, warmup_runs=2)
+
+    loaded = registry.get("v1")
+    images = list(
+        np.random.default_rng(0).integers(0, 256, (4, IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8)
+    )
+
+    predictions = loaded.predict(images)
+    assert len(predictions) == 4
+    assert {label for label, _ in predictions} <= {"ProfA", "Room1"}
+
+
+def test_exports_still_being_staged_are_not_versions(root):
+    write_version(root, ".v4.partial")
+
+    assert list(ModelRegistry(root).available()) == ["v1", "v2", "v3"]
@@ -0,0 +1,43 @@
+"""Response sampler tests cover the ring buffer, the background writer and dropping."""
+
+from __future__ import annotations
+
+import json
+import logging
+
+from serve.src.samples import ResponseSampler
+
+
+def test_ring_buffer_keeps_the_latest_responses(tmp_path):
+    sampler = ResponseSampler(tmp_path / "samples.jsonl", ring_size=3, sample_rate=0.0)
+
+    for i in range(5):
+        sampler.record({"index": i})
+
+    assert [entry["index"] for entry in sampler.latest()] == [2, 3, 4]
+    assert [entry["index"] for entry in sampler.latest(2)] == [3, 4]
+    assert sampler.stats()["recorded"] == 5
+    assert sampler.stats()["sampled"] == 0
+
+
+def test_sampled_responses_are_written_as_json_lines(tmp_path):
+    path = tmp_path / "samples" / "samples.jsonl"
+    sampler = ResponseSampler(path, sample_rate=1.0)
+    sampler.start()
+
+    for i in range(3):
+        sampler.record({"index": i})
+    sampler.stop()
+
+    assert [json.loads(line)["index"] for line in path.read_text().splitlines()] == [0, 1, 2]
+
+
+def test_samples_are_dropped_when_the_writer_falls_behind(tmp_path):
+    sampler = ResponseSampler(tmp_path / "samples.jsonl", sample_rate=1.0, max_pending=2)
+
+    for i in range(5):
+        sampler.record({"index": i})
+
+    assert sampler.stats()["sampled"] == 2
+    assert sampler.stats()["dropped"] == 3
+    assert isinstance(sampler.pending.get_nowait(), logging.LogRecord)